@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+"""
+aggregates.py
+페이지별 집계(통계표, value_counts, 병합, 추세선 등)를 미리 계산하는 워밍업 작업
+
+데이터 버전이 바뀌면 모든 페이지의 집계를 한 번에 만들어 공유 캐시에 넣어 두므로
+새로고침 후 처음 페이지를 여는 사용자도 계산을 기다리지 않습니다.
+
+사용법:
+    python aggregates.py                  # 현재 데이터 버전의 집계를 디스크 캐시에 생성
+    python aggregates.py --watch 60       # 60초마다 데이터 버전을 확인해 바뀌면 재생성
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import chart_data
+import data_registry
+import rollup
+import shared_data
+
+CACHE_DIR = Path("data") / ".cache" / "aggregates"
+logger = logging.getLogger(__name__)
+WEEKDAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+# ------------------------------------------------------------------
+# 페이지별 집계 함수 (frames: 데이터셋 이름 -> DataFrame)
+# ------------------------------------------------------------------
+DERIVED = {
+    "sales_cube": lambda frames: rollup.build_sales_cube(frames["data_preprocessed"]),
+    "daily_cube": lambda frames: rollup.rollup(frames["sales_cube"]),
+}
+
+
+def add_derived(frames):
+    """여러 페이지가 공유하는 파생 테이블(매출 큐브, 일별 집계)을 추가합니다. 실제 계산은 처음 접근할 때 합니다."""
+    return data_registry.LazyFrames(frames.__getitem__, list(frames), derived=DERIVED)
+
+
+def executive_summary(frames):
+    orders = frames["data_preprocessed"]
+    prod_eff = frames["analysis_product_efficiency"]
+    event = frames["data_eventstats"]
+    click = frames["data_sales_click"]
+    return {
+        "daily_sales": frames["daily_cube"][["주문일", "결제금액(상품별)"]],
+        "total_revenue": orders["결제금액(상품별)"].sum(),
+        "order_count": len(orders),
+        "avg_rpc": prod_eff["RPC"].mean(),
+        "avg_ctr": prod_eff["CTR"].mean(),
+        "total_visitors": event["DAU 전체(회원)"].sum(),
+        "current_pv": event["PV"].sum(),
+        "current_ctr": (click["클릭수"].sum() / click["조회수"].sum()) * 100,
+        # 단순 전환율 추정 (판매건수 / 클릭수)
+        "current_cvr": (len(orders) / click["클릭수"].sum()) * 100,
+        "avg_order_value": orders["결제금액(상품별)"].mean(),
+        "low_rpc_prods": prod_eff[prod_eff["RPC"] < prod_eff["RPC"].median()].head(3)["상품명"].tolist(),
+        "high_ctr_prods": prod_eff[prod_eff["CTR"] > prod_eff["CTR"].median()].sort_values("RPC").head(2)["상품명"].tolist(),
+        "top_channel": rollup.totals(frames["sales_cube"], "주문경로", "주문건수").idxmax(),
+    }
+
+
+def overview(frames):
+    orders = frames["data_preprocessed"]
+    daily_orders = frames["daily_cube"][["주문일", "주문건수", "결제금액(상품별)"]].copy()
+    daily_orders.columns = ["날짜", "주문건수", "매출액"]
+    return {
+        "total_orders": len(orders),
+        "total_revenue": orders["결제금액(상품별)"].sum(),
+        "avg_order": orders["결제금액(상품별)"].mean(),
+        "avg_quantity": orders["주문수량"].mean(),
+        "daily_orders": daily_orders,
+        "channel_dist": rollup.totals(frames["sales_cube"], "주문경로", "주문건수"),
+        "payment_dist": rollup.totals(frames["sales_cube"], "결제방법", "주문건수"),
+    }
+
+
+def eda(frames):
+    orders = frames["data_preprocessed"]
+    null_counts = orders.isnull().sum()
+    numeric_cols = orders.select_dtypes(include="number").columns
+    return {
+        "missing_data": pd.DataFrame({
+            "컬럼명": orders.columns,
+            "결측치 수": null_counts.values,
+            "결측치 비율(%)": (null_counts / len(orders) * 100).values,
+        }).sort_values("결측치 수", ascending=False),
+        "stats_df": orders[numeric_cols].describe().T,
+        "weekday_counts": orders["주문일"].dt.day_name().value_counts().reindex(WEEKDAY_ORDER),
+        "channel_revenue": rollup.totals(frames["sales_cube"], "주문경로", "결제금액(상품별)"),
+        "payment_hist": chart_data.bin_counts(orders["결제금액(상품별)"]),
+        "quantity_box": chart_data.box_stats(orders, "주문수량"),
+    }
+
+
+def clustering(frames):
+    clustered = frames["data_clustered"]
+    cluster_stats = clustered.groupby("cluster").agg({
+        "주문번호": "count",
+        "주문수량": ["mean", "sum"],
+        "결제금액(상품별)": ["mean", "median", "sum"]
+    }).round(2)
+    cluster_stats.columns = ["주문건수", "평균수량", "총수량", "평균금액", "중앙금액", "총매출"]
+    return {
+        "cluster_stats": cluster_stats,
+        "cluster_avg": clustered.groupby("cluster")["결제금액(상품별)"].mean().sort_values(ascending=False),
+        "cluster_counts": clustered["cluster"].value_counts(),
+        "scatter_bins": chart_data.bin_2d(clustered, "주문수량", "결제금액(상품별)", by="cluster"),
+        "scatter_extent": (
+            (float(clustered["주문수량"].min()), float(clustered["주문수량"].max())),
+            (float(clustered["결제금액(상품별)"].min()), float(clustered["결제금액(상품별)"].max())),
+        ),
+        "amount_box": chart_data.box_stats(clustered, "결제금액(상품별)", by="cluster"),
+    }
+
+
+def marketing(frames):
+    click = frames["data_sales_click"]
+    event = frames["data_eventstats"]
+
+    df_click_agg = click.groupby("상품명_정제").agg({
+        "조회수": "sum",
+        "클릭수": "sum"
+    }).reset_index()
+    df_click_agg["CTR(%)"] = (df_click_agg["클릭수"] / df_click_agg["조회수"] * 100).fillna(0)
+
+    # 일별 매출과 일별 PV 결합
+    daily_sales = frames["daily_cube"][["주문일", "결제금액(상품별)"]].copy()
+    daily_sales.columns = ["날짜", "매출액"]
+    df_marketing_sales = pd.merge(daily_sales, event[["일자", "PV", "DAU 전체(회원)"]],
+                                  left_on="날짜", right_on="일자", how="inner")
+
+    # PV -> 매출액 OLS 추세선 (차트 생성 시 statsmodels 적합을 반복하지 않도록 미리 계산)
+    trendline, r_squared, correlation = None, np.nan, np.nan
+    valid = df_marketing_sales[["PV", "매출액"]].dropna()
+    if len(valid) >= 2 and valid["PV"].nunique() > 1:
+        slope, intercept = np.polyfit(valid["PV"], valid["매출액"], 1)
+        x_line = np.array([valid["PV"].min(), valid["PV"].max()])
+        trendline = pd.DataFrame({"PV": x_line, "매출액": slope * x_line + intercept})
+        correlation = valid["PV"].corr(valid["매출액"])
+        r_squared = correlation ** 2
+
+    return {
+        "total_pv": event["PV"].sum(),
+        "avg_dau": event["DAU 전체(회원)"].mean(),
+        "avg_revisit": event["재방문율(월)"].mean(),
+        "df_click_agg": df_click_agg,
+        "df_marketing_sales": df_marketing_sales,
+        "trendline": trendline,
+        "r_squared": r_squared,
+        "correlation": correlation,
+    }
+
+
+def attributes(frames):
+    orders = frames["data_preprocessed"]
+    df_set = orders.groupby("세트여부")["결제금액(상품별)"].mean().reset_index()
+    df_set["세트여부"] = df_set["세트여부"].map({1: "세트/구성상품", 0: "단품"})
+    df_evt = orders.groupby("이벤트여부").agg({
+        "결제금액(상품별)": "sum",
+        "주문번호": "count"
+    }).reset_index()
+    df_evt["이벤트여부"] = df_evt["이벤트여부"].map({1: "이벤트 포함", 0: "일반"})
+    return {
+        "df_grade": orders.groupby("등급")["결제금액(상품별)"].sum().reset_index(),
+        "df_weight": orders.groupby("중량")["주문수량"].sum().reset_index(),
+        "df_set": df_set,
+        "df_evt": df_evt,
+    }
+
+
+def customer_value(frames):
+    ltv = frames["analysis_ltv"]
+    if ltv.empty:
+        return {}
+    return {
+        "avg_ltv": ltv["LTV_Score"].mean(),
+        "avg_frequency": ltv["Frequency"].mean(),
+        "top20_share": len(ltv[ltv["LTV_Score"] > ltv["LTV_Score"].quantile(0.8)]) / len(ltv) * 100,
+        # Recency가 30일 이상인 고객 필터링
+        "df_churn": ltv[ltv["Recency"] > 30].sort_values("Monetary", ascending=False),
+    }
+
+
+# 페이지 ID -> 집계에 필요한 데이터셋 (페이지별 데이터 버전 키)
+PAGE_DATASETS = {
+    "executive": ["data_preprocessed", "analysis_product_efficiency", "data_eventstats", "data_sales_click"],
+    "customer_value": ["analysis_ltv"],
+    "overview": ["data_preprocessed"],
+    "eda": ["data_preprocessed"],
+    "clustering": ["data_clustered"],
+    "marketing": ["data_sales_click", "data_eventstats", "data_preprocessed"],
+    "attributes": ["data_preprocessed"],
+}
+
+# 페이지 ID -> (사이드바 라벨, 집계 함수)
+PAGES = {
+    "executive": ("👑 경영 요약", executive_summary),
+    "customer_value": ("🏆 고객 가치 분석", customer_value),
+    "overview": ("📈 개요", overview),
+    "eda": ("📊 EDA 분석", eda),
+    "clustering": ("🎯 클러스터링", clustering),
+    "marketing": ("📈 마케팅 분석", marketing),
+    "attributes": ("💎 속성 분석", attributes),
+}
+
+
+def page_version(registry, page_id):
+    """페이지가 쓰는 데이터셋만으로 만든 버전 키. 다른 파일이 바뀌어도 이 페이지 집계는 유지됩니다."""
+    return registry.version(*PAGE_DATASETS[page_id])
+
+
+# ------------------------------------------------------------------
+# 공유 캐시 (메모리 + 디스크)
+# ------------------------------------------------------------------
+class AggregateCache:
+    """(데이터 버전, 페이지 ID) -> 집계 결과. 디스크 캐시는 CLI 워밍업과 앱 프로세스가 공유합니다."""
+
+    def __init__(self, disk_dir=CACHE_DIR):
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._memory = {}
+        self._lock = threading.Lock()
+        self.timings = {}  # 페이지 ID -> 마지막 계산 소요 시간(초)
+        self.versions = {}  # 페이지 ID -> 마지막으로 워밍업한 데이터 버전
+        self.hits = {}  # 페이지 ID -> get_or_build 캐시 적중 수
+        self.misses = {}  # 페이지 ID -> get_or_build 에서 직접 계산한 수
+
+    def _disk_path(self, version, page_id):
+        return self.disk_dir / version / f"{page_id}.pkl"
+
+    def get(self, version, page_id):
+        with self._lock:
+            if (version, page_id) in self._memory:
+                return self._memory[(version, page_id)]
+        if self.disk_dir is not None:
+            path = self._disk_path(version, page_id)
+            if path.exists():
+                with open(path, "rb") as f:
+                    result = pickle.load(f)
+                self._remember(version, page_id, result)
+                return result
+        return None
+
+    def _remember(self, version, page_id, result):
+        with self._lock:
+            # 같은 페이지의 이전 데이터 버전 항목은 메모리에서 제거
+            for key in [k for k in self._memory if k[1] == page_id and k[0] != version]:
+                del self._memory[key]
+            self._memory[(version, page_id)] = result
+
+    def put(self, version, page_id, result, persist=False):
+        self._remember(version, page_id, result)
+        if persist and self.disk_dir is not None:
+            path = self._disk_path(version, page_id)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 임시 파일에 다 쓴 뒤 교체하므로 다른 프로세스가 쓰다 만 파일을 읽지 않습니다.
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            self._prune(version, page_id)
+
+    def _prune(self, version, page_id):
+        """같은 페이지의 이전 데이터 버전 파일을 지우고, 비게 된 버전 디렉터리를 정리합니다."""
+        for old in self.disk_dir.iterdir():
+            if not old.is_dir() or old.name == version:
+                continue
+            try:
+                (old / f"{page_id}.pkl").unlink(missing_ok=True)
+                if not any(old.iterdir()):
+                    shutil.rmtree(old)
+            except OSError:
+                pass  # 다른 프로세스가 동시에 정리 중
+
+    def get_or_build(self, version, page_id, frames):
+        result = self.get(version, page_id)
+        if result is None:
+            start = time.perf_counter()
+            result = PAGES[page_id][1](add_derived(frames))
+            self.timings[page_id] = time.perf_counter() - start
+            self.put(version, page_id, result)
+            self.misses[page_id] = self.misses.get(page_id, 0) + 1
+        else:
+            self.hits[page_id] = self.hits.get(page_id, 0) + 1
+        return result
+
+    def stats(self):
+        """페이지 ID -> (적중, 미스)"""
+        pages = sorted(set(self.hits) | set(self.misses))
+        return {page_id: (self.hits.get(page_id, 0), self.misses.get(page_id, 0)) for page_id in pages}
+
+
+def warm_up(cache, frames, versions, persist=False):
+    """
+    versions(페이지 ID -> 데이터 버전)의 페이지 집계를 계산해 캐시에 넣고
+    페이지별 소요 시간(초)을 반환합니다. 이미 캐시(디스크 포함)에 있는 페이지는 None 입니다.
+    데이터셋은 해당 페이지가 접근할 때만 읽힙니다. 실패한 페이지는 버전을 기록하지 않아 다음에 다시 시도합니다.
+    """
+    frames = add_derived(frames)
+    report = {}
+    for page_id, version in versions.items():
+        if cache.get(version, page_id) is not None:  # CLI 가 미리 만든 디스크 캐시 재사용
+            cache.versions[page_id] = version
+            report[page_id] = None
+            continue
+        start = time.perf_counter()
+        try:
+            result = PAGES[page_id][1](frames)
+            elapsed = time.perf_counter() - start
+            cache.put(version, page_id, result, persist=persist)
+        except Exception as exc:  # 데이터 누락 페이지는 건너뛰고 보고만 합니다
+            report[page_id] = exc
+            continue
+        report[page_id] = cache.timings[page_id] = elapsed
+        cache.versions[page_id] = version
+    return report
+
+
+def stale_pages(cache, registry):
+    """데이터 버전이 바뀐(또는 아직 워밍업하지 않은) 페이지 ID -> 새 버전."""
+    versions = {page_id: page_version(registry, page_id) for page_id in PAGES}
+    return {page_id: version for page_id, version in versions.items() if cache.versions.get(page_id) != version}
+
+
+def load_frames(registry, shared=None):
+    """
+    데이터셋을 필요할 때 읽는 프레임 묶음. shared(SharedDatasets)를 주면 호스트 공유 파일을
+    memory-map 해서 붙이므로 대시보드 워커와 같은 페이지 캐시를 쓰고 별도 복사본을 만들지 않습니다.
+    """
+    if shared is None:
+        return data_registry.LazyFrames(registry.read, registry.datasets)
+    return data_registry.LazyFrames(
+        lambda name: shared.get(name, registry.fingerprint(name), lambda: registry.read(name)),
+        registry.datasets)
+
+
+def start_warmup_thread(cache, registry=None, shared=None, interval=60):
+    """
+    데이터 버전을 주기적으로 확인해 바뀌면 백그라운드에서 워밍업하는 데몬 스레드를 시작합니다.
+    대시보드는 자신의 registry 와 shared 를 넘겨 지문 메모와 공유 데이터셋을 함께 씁니다.
+    실패한 (페이지, 데이터 버전) 은 한 번만 기록하고, 데이터 버전이 바뀔 때까지 다시 시도하지 않습니다.
+    """
+    registry = registry or data_registry.DatasetRegistry()
+    failed = {}  # 페이지 ID -> 실패한 데이터 버전
+
+    def loop():
+        last_error = None
+        while True:
+            try:
+                stale = {page_id: version for page_id, version in stale_pages(cache, registry).items()
+                         if failed.get(page_id) != version}
+                if stale:
+                    report = warm_up(cache, load_frames(registry, shared), stale)
+                    for page_id, result in report.items():
+                        if isinstance(result, Exception):
+                            failed[page_id] = stale[page_id]
+                            logger.warning("집계 워밍업 실패: %s [%s]: %r", page_id, stale[page_id], result)
+                        else:
+                            failed.pop(page_id, None)
+                last_error = None
+            except Exception as exc:
+                if repr(exc) != last_error:  # 같은 오류가 반복되면 처음 한 번만 기록
+                    logger.exception("집계 워밍업 주기 실패 (다음 주기에 다시 시도)")
+                last_error = repr(exc)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="aggregate-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def print_report(report, versions):
+    for page_id, result in report.items():
+        label = f"{PAGES[page_id][0]} [{versions[page_id]}]"
+        if result is None:
+            print(f"  ✅ {label}: 캐시 재사용")
+        elif isinstance(result, FileNotFoundError):
+            print(f"  🚨 {label}: 데이터 파일 누락 ({result})")
+        elif isinstance(result, Exception):
+            print(f"  ⚠️ {label}: 실패 ({result!r})")
+        else:
+            print(f"  ✅ {label}: {result * 1000:,.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="페이지별 집계를 미리 계산해 공유 캐시에 저장합니다.")
+    parser.add_argument("--watch", type=int, default=0, help="N초마다 데이터 버전을 확인 (0이면 1회 실행)")
+    args = parser.parse_args()
+
+    registry = data_registry.DatasetRegistry()
+    shared = shared_data.SharedDatasets()  # 워커들이 붙일 공유 파일도 함께 생성
+    cache = AggregateCache()
+    while True:
+        stale = stale_pages(cache, registry)
+        if stale:
+            print_report(warm_up(cache, load_frames(registry, shared), stale, persist=True), stale)
+        if not args.watch:
+            break
+        time.sleep(args.watch)
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+anomaly.py
+일별 지표용 스트리밍 이상 징후 탐지기 (요일별 중앙값/MAD 기반 robust z-score)
+
+- 지표/키(전체, 채널, 상품 등)마다 요일별 최근 N주 값과 최근 28일 값을 고정 길이 버퍼로 유지합니다.
+- 새 날짜 하나가 들어올 때 버퍼 크기만큼만 계산하므로 이력 길이와 무관하게 O(1) 입니다.
+- 점수는 기존 기준선으로 먼저 계산한 뒤 값을 버퍼에 넣어, 이상값이 자기 기준선을 부풀리지 않습니다.
+- 마지막 날짜는 같은 날 데이터가 갱신되면(당일 주문 추가) 그 값으로 다시 채점합니다.
+- 경보는 (지표, 키, 일자, 값, 기준값, 점수) 로 기록되어 조건별로 조회할 수 있습니다.
+
+사용법:
+    python anomaly.py                        # 전체 이력을 재생해 경보 목록 출력
+    python anomaly.py --since 2025-09-15 --metric 매출
+    python anomaly.py --check                # 판매 중단 채널 급감 / 당일 재채점 점검
+"""
+
+import argparse
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import rollup
+
+THRESHOLD = 3.5        # |modified z-score| 경보 기준
+WEEKS = 8              # 요일별 기준선에 쓰는 최근 주 수
+RECENT_DAYS = 28       # 요일별 이력이 부족할 때 쓰는 최근 일 수
+MIN_HISTORY = 3        # 기준선 계산에 필요한 최소 관측치
+MAD_SCALE = 0.6745     # 정규분포에서 MAD -> 표준편차 환산 계수
+MEAN_AD_SCALE = 1.2533  # MAD 가 0일 때 쓰는 평균절대편차 환산 계수
+
+
+@dataclass(frozen=True)
+class Alert:
+    metric: str
+    key: str
+    timestamp: pd.Timestamp
+    value: float
+    baseline: float
+    score: float
+
+    @property
+    def direction(self):
+        return "급증" if self.score > 0 else "급감"
+
+
+class RobustDetector:
+    """단일 시계열용 요일별 중앙값/MAD 탐지기."""
+
+    def __init__(self, weeks=WEEKS, recent_days=RECENT_DAYS, min_history=MIN_HISTORY):
+        self.by_weekday = [deque(maxlen=weeks) for _ in range(7)]
+        self.recent = deque(maxlen=recent_days)
+        self.min_history = min_history
+        self.last_timestamp = None
+        self._undo = None  # 마지막 관측을 되돌리는 정보 (요일, 밀려난 요일 값, 밀려난 최근 값)
+
+    def _baseline(self, weekday):
+        """(중앙값, 표준편차 환산 산포). 이력이 부족하거나 산포가 0이면 (None, None)."""
+        values = self.by_weekday[weekday]
+        if len(values) < self.min_history:
+            values = self.recent
+        if len(values) < self.min_history:
+            return None, None
+        values = np.fromiter(values, dtype=float, count=len(values))
+        median = float(np.median(values))
+        deviations = np.abs(values - median)
+        mad = float(np.median(deviations))
+        # 판매가 드문 시계열은 MAD 가 0이 되므로 평균절대편차로 대체 (Iglewicz-Hoaglin)
+        scale = mad / MAD_SCALE if mad > 0 else MEAN_AD_SCALE * float(deviations.mean())
+        # 값이 모두 같으면 중앙값의 1%를 산포 하한으로 사용 (꾸준히 팔리던 채널이 끊긴 경우도 탐지)
+        scale = max(scale, abs(median) * 0.01)
+        if scale <= 0:
+            return None, None  # 값이 모두 0이라 기준 산포를 정할 수 없음
+        return median, scale
+
+    @staticmethod
+    def _push(buffer, value):
+        """버퍼에 값을 넣고, 가득 차 있어 밀려난 값을 반환합니다 (없으면 None)."""
+        evicted = buffer[0] if len(buffer) == buffer.maxlen else None
+        buffer.append(value)
+        return evicted
+
+    @staticmethod
+    def _pop(buffer, evicted):
+        buffer.pop()
+        if evicted is not None:
+            buffer.appendleft(evicted)
+
+    def _rollback(self):
+        """마지막 관측을 버퍼에서 빼고 그 이전 상태로 되돌립니다."""
+        weekday, evicted_day, evicted_recent = self._undo
+        self._pop(self.by_weekday[weekday], evicted_day)
+        self._pop(self.recent, evicted_recent)
+        self._undo = None
+
+    def update(self, timestamp, value):
+        """
+        새 관측치를 반영하고 (점수, 기준값) 을 반환합니다. 기준선이 아직 없으면 둘 다 None.
+        마지막 날짜와 같으면 이전 값을 빼고 새 값으로 다시 채점하고, 그보다 이전 날짜면 무시하고 None 을 반환합니다.
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if self.last_timestamp is not None:
+            if timestamp < self.last_timestamp:
+                return None
+            if timestamp == self.last_timestamp:
+                self._rollback()
+        weekday = timestamp.weekday()
+        median, scale = self._baseline(weekday)
+        score = None if median is None else (value - median) / scale
+        self._undo = (weekday, self._push(self.by_weekday[weekday], value), self._push(self.recent, value))
+        self.last_timestamp = timestamp
+        return score, median
+
+
+class AnomalyMonitor:
+    """(지표, 키) 별 탐지기 묶음과 경보 기록."""
+
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.version = None
+        self._detectors = {}
+        self._latest = {}  # (지표, 키) -> 마지막 관측 (일자, 값, 기준값, 점수)
+        self._latest_alert = {}  # (지표, 키) -> 마지막 일자의 경보 (재채점 시 교체)
+        self._alerts = []
+        self._lock = threading.Lock()
+
+    def observe(self, metric, key, timestamp, value):
+        """
+        관측치 하나를 반영하고 기준을 넘으면 Alert 를 반환합니다.
+        마지막 일자를 다시 관측하면 그 일자의 이전 경보를 새 점수 기준으로 교체합니다.
+        """
+        detector = self._detectors.setdefault((metric, key), RobustDetector())
+        timestamp, value = pd.Timestamp(timestamp), float(value)
+        result = detector.update(timestamp, value)
+        if result is None:
+            return None  # 이미 지난 날짜
+        stale = self._latest_alert.pop((metric, key), None)
+        if stale is not None and stale.timestamp == timestamp:
+            self._alerts.remove(stale)
+        score, baseline = result
+        self._latest[(metric, key)] = (timestamp, value, baseline, score)
+        if score is None or abs(score) < self.threshold:
+            return None
+        alert = Alert(metric, key, timestamp, value, baseline, score)
+        self._alerts.append(alert)
+        self._latest_alert[(metric, key)] = alert
+        return alert
+
+    def observe_series(self, metric, key, series):
+        """시계열에서 새 날짜와, 값이 바뀐 마지막 날짜를 순서대로 반영합니다."""
+        latest = self._latest.get((metric, key))
+        if latest is not None:
+            last_timestamp, last_value = latest[0], latest[1]
+            series = series[series.index >= last_timestamp]
+            if len(series) and series.index[0] == last_timestamp and float(series.iloc[0]) == last_value:
+                series = series.iloc[1:]  # 마지막 날짜 값이 그대로면 다시 채점하지 않음
+        return [alert for ts, value in series.items()
+                if (alert := self.observe(metric, key, ts, value)) is not None]
+
+    def sync(self, version, build_feeds):
+        """
+        데이터 버전이 바뀌었을 때만 build_feeds() ({(지표, 키): 일별 Series}) 를 호출해 새 날짜를 반영합니다.
+        """
+        with self._lock:
+            if version == self.version:
+                return []
+            new_alerts = []
+            for (metric, key), series in build_feeds().items():
+                new_alerts.extend(self.observe_series(metric, key, series))
+            self.version = version
+            return new_alerts
+
+    # --------------------------------------------------------------
+    # 조회
+    # --------------------------------------------------------------
+    def latest(self, metric, key="전체"):
+        """마지막 관측의 dict (timestamp, value, baseline, score). 관측이 없으면 None."""
+        entry = self._latest.get((metric, key))
+        if entry is None:
+            return None
+        return dict(zip(["timestamp", "value", "baseline", "score"], entry))
+
+    def alerts(self, metric=None, key=None, since=None, until=None, min_score=None):
+        """조건에 맞는 경보 목록 (DataFrame, 최신순)."""
+        rows = [
+            alert for alert in self._alerts
+            if (metric is None or alert.metric in ([metric] if isinstance(metric, str) else metric))
+            and (key is None or alert.key == key)
+            and (since is None or alert.timestamp >= pd.Timestamp(since))
+            and (until is None or alert.timestamp <= pd.Timestamp(until))
+            and (min_score is None or abs(alert.score) >= min_score)
+        ]
+        columns = ["지표", "키", "일자", "값", "기준값", "점수", "구분"]
+        if not rows:
+            return pd.DataFrame(columns=columns)
+        return pd.DataFrame(
+            [(a.metric, a.key, a.timestamp, a.value, a.baseline, a.score, a.direction) for a in rows],
+            columns=columns,
+        ).sort_values(["일자", "점수"], ascending=[False, False]).reset_index(drop=True)
+
+
+# ------------------------------------------------------------------
+# 대시보드 데이터 -> 탐지 대상 시계열
+# ------------------------------------------------------------------
+def _daily(values, dates=None):
+    """
+    일 단위로 빈 날을 0으로 채웁니다. dates 를 주면 그 전체 기간으로 맞춰,
+    채널/상품의 마지막 판매 이후 판매가 끊긴 날도 0으로 관측되게 합니다 (급감 탐지).
+    """
+    values = values.astype(float)
+    if dates is not None:
+        return values.reindex(dates, fill_value=0.0)
+    return values.asfreq("D", fill_value=0.0) if not values.empty else values
+
+
+def build_feeds(frames, by=("주문경로", "상품코드")):
+    """
+    {(지표, 키): 일별 Series}
+    매출/주문건수(전체 + by 차원별)는 매출 큐브에서, DAU/PV는 이벤트 통계에서 만듭니다.
+    차원별 시계열은 모두 전체 매출의 기간(첫 주문일 ~ 마지막 주문일)으로 맞춥니다.
+    """
+    cube = frames["sales_cube"]
+    daily = frames["daily_cube"].set_index(rollup.DATE_KEY)
+    dates = pd.date_range(daily.index.min(), daily.index.max(), freq="D") if not daily.empty else None
+    feeds = {
+        ("매출", "전체"): _daily(daily["결제금액(상품별)"], dates),
+        ("주문건수", "전체"): _daily(daily["주문건수"], dates),
+    }
+    for dim in by:
+        table = cube.groupby([dim, rollup.DATE_KEY], observed=True)[["결제금액(상품별)", "주문건수"]].sum()
+        for value, group in table.groupby(level=0, observed=True):
+            group = group.droplevel(0)
+            feeds[("매출", f"{dim}={value}")] = _daily(group["결제금액(상품별)"], dates)
+            feeds[("주문건수", f"{dim}={value}")] = _daily(group["주문건수"], dates)
+
+    event = frames["data_eventstats"].set_index("일자").sort_index()
+    feeds[("DAU", "전체")] = _daily(event["DAU 전체(회원)"])
+    feeds[("PV", "전체")] = _daily(event["PV"])
+    return feeds
+
+
+def check_silent_channel(days=70, stop_after=56):
+    """
+    점검용 합성 데이터: 매일 팔리던 채널 B 가 stop_after 일 뒤 판매가 끊기면
+    그다음 날 "주문경로=B" 매출 급감 경보가 나와야 합니다. 경보(Alert)를 반환하고, 없으면 AssertionError.
+    """
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2025-01-01", periods=days, freq="D")
+    rows = [(day, "A", 100_000 + rng.integers(-5_000, 5_000), 10) for day in dates]
+    rows += [(day, "B", 50_000 + rng.integers(-3_000, 3_000), 5) for day in dates[:stop_after]]
+    cube = pd.DataFrame(rows, columns=[rollup.DATE_KEY, "주문경로", "결제금액(상품별)", "주문건수"])
+    frames = {
+        "sales_cube": cube,
+        "daily_cube": cube.groupby(rollup.DATE_KEY, as_index=False)[["결제금액(상품별)", "주문건수"]].sum(),
+        "data_eventstats": pd.DataFrame({"일자": dates, "DAU 전체(회원)": 100, "PV": 1_000}),
+    }
+    monitor = AnomalyMonitor()
+    monitor.sync("check", lambda: build_feeds(frames, by=("주문경로",)))
+    alerts = monitor.alerts("매출", "주문경로=B", since=dates[stop_after], until=dates[stop_after])
+    assert not alerts.empty and alerts.loc[0, "구분"] == "급감", "판매가 끊긴 채널의 급감 경보가 없습니다."
+    return alerts.iloc[0]
+
+
+def check_same_day_refresh(days=70):
+    """
+    점검용 합성 데이터: 마지막 날을 집계 중간값(낮은 값)으로 먼저 관측한 뒤 같은 날짜를 완성된 값으로 다시 관측하면
+    급감 경보가 사라지고 latest() 가 새 값/점수를 보고해야 하며, 기준선 버퍼에는 새 값만 남아야 합니다.
+    (중간 점수, 갱신 후 점수) 를 반환하고, 어긋나면 AssertionError.
+    """
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2025-01-01", periods=days, freq="D")
+    values = pd.Series(100_000 + rng.integers(-5_000, 5_000, days).astype(float), index=dates)
+    partial = values.copy()
+    partial.iloc[-1] = 20_000.0  # 오전까지만 집계된 마지막 날
+
+    monitor = AnomalyMonitor()
+    monitor.observe_series("매출", "전체", partial)
+    before = monitor.latest("매출")
+    assert before["value"] == 20_000.0 and len(monitor.alerts("매출", since=dates[-1])) == 1, "중간 집계 값이 급감으로 잡히지 않았습니다."
+
+    monitor.observe_series("매출", "전체", values)
+    after = monitor.latest("매출")
+    assert after["timestamp"] == dates[-1] and after["value"] == values.iloc[-1], "같은 날짜의 갱신 값이 반영되지 않았습니다."
+    assert abs(after["score"]) < monitor.threshold and monitor.alerts("매출", since=dates[-1]).empty, "이전 급감 경보가 남아 있습니다."
+
+    reference = AnomalyMonitor()
+    reference.observe_series("매출", "전체", values)
+    assert np.isclose(after["score"], reference.latest("매출")["score"]), "재채점 점수가 처음부터 계산한 값과 다릅니다."
+    detector, expected = monitor._detectors[("매출", "전체")], reference._detectors[("매출", "전체")]
+    assert list(detector.recent) == list(expected.recent) and all(
+        list(a) == list(b) for a, b in zip(detector.by_weekday, expected.by_weekday)), "기준선 버퍼가 다릅니다."
+    return before["score"], after["score"]
+
+
+if __name__ == "__main__":
+    import aggregates
+    import data_registry
+
+    parser = argparse.ArgumentParser(description="일별 지표 이력을 재생해 이상 징후 경보를 출력합니다.")
+    parser.add_argument("--since", help="이 날짜 이후 경보만 출력 (YYYY-MM-DD)")
+    parser.add_argument("--metric", help="지표 이름 (매출, 주문건수, DAU, PV)")
+    parser.add_argument("--key", help="키 (전체, 주문경로=카카오톡 등)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--check", action="store_true", help="판매 중단 채널 급감 탐지 / 당일 재채점만 점검")
+    args = parser.parse_args()
+
+    if args.check:
+        alert = check_silent_channel()
+        print(f"✅ 판매 중단 채널 급감 경보 확인 ({alert['일자']:%Y-%m-%d}, 점수 {alert['점수']:+.1f})")
+        before, after = check_same_day_refresh()
+        print(f"✅ 같은 날짜 갱신 시 재채점 확인 (점수 {before:+.1f} -> {after:+.1f}, 급감 경보 해제)")
+        raise SystemExit(0)
+
+    registry = data_registry.DatasetRegistry()
+    frames = aggregates.add_derived(aggregates.load_frames(registry))
+    monitor = AnomalyMonitor(args.threshold)
+    monitor.sync(registry.version("data_preprocessed", "data_eventstats"), lambda: build_feeds(frames))
+    alerts = monitor.alerts(args.metric, args.key, since=args.since)
+    print(alerts.to_string(index=False) if not alerts.empty else "경보 없음")
+    print(f"✅ 경보 {len(alerts):,}건")
@@ -12,6 +12,21 @@ import plotly.graph_objects as go
 from pathlib import Path
 from datetime import datetime
 
+import data_registry
+import rollup
+import aggregates
+import anomaly
+import chart_data
+import figure_cache
+import forecasting
+import filter_engine
+import order_store
+import pricing
+import product_matrix
+import profiling
+import report_export
+import shared_data
+
 # ------------------------------------------------------------------
 # 페이지 설정
 # ------------------------------------------------------------------
@@ -22,6 +37,16 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# 실행 단위 구간 계측 (?admin=1: 관리자 패널 표시, ?profile=1: cProfile 수집 + 다운로드)
+@st.cache_resource
+def get_profiler():
+    return profiling.Profiler()
+
+PROFILER = get_profiler()
+ADMIN_MODE = st.query_params.get("admin") == "1"
+RUN = PROFILER.start(cprofile=st.query_params.get("profile") == "1")
+RUN.lap("페이지 설정")
+
 # ------------------------------------------------------------------
 # 프리미엄 CSS 스타일링 (Premium UI/UX)
 # ------------------------------------------------------------------
@@ -93,68 +118,186 @@ st.markdown("""
 # ------------------------------------------------------------------
 # 데이터 로딩 (캐싱)
 # ------------------------------------------------------------------
-try:
-    last_mod = Path("data/analysis_product_efficiency.csv").stat().st_mtime
-except:
-    last_mod = datetime.now().timestamp()
-
-@st.cache_data(ttl=3600, show_spinner="데이터를 분석 중입니다...")
-def load_all_data(mod_time):
-    data_dir = Path("data")
-    
-    # 필수 파일 확인
-    required = ["data_preprocessed.csv", "data_clustered.csv", "data_eventstats.csv", "data_pagestats.csv", 
-                "data_sales_click.csv", "analysis_cluster_channel.csv", "analysis_product_efficiency.csv"]
-    
-    missing = [f for f in required if not (data_dir / f).exists()]
-    if missing:
-        st.error(f"🚨 필수 데이터 파일이 누락되었습니다: {', '.join(missing)}")
-        st.stop()
-            
-    df_preprocessed = pd.read_csv(data_dir / "data_preprocessed.csv", encoding="utf-8-sig")
-    df_clustered = pd.read_csv(data_dir / "data_clustered.csv", encoding="utf-8-sig")
-    df_event = pd.read_csv(data_dir / "data_eventstats.csv", encoding="utf-8-sig")
-    df_page = pd.read_csv(data_dir / "data_pagestats.csv", encoding="utf-8-sig")
-    df_click = pd.read_csv(data_dir / "data_sales_click.csv", encoding="utf-8-sig")
-    df_cluster_channel = pd.read_csv(data_dir / "analysis_cluster_channel.csv", encoding="utf-8-sig", index_col=0)
-    df_prod_eff = pd.read_csv(data_dir / "analysis_product_efficiency.csv", encoding="utf-8-sig")
-    
-    try:
-        df_ltv = pd.read_csv(data_dir / "analysis_ltv.csv", encoding="utf-8-sig")
-        df_interval = pd.read_csv(data_dir / "analysis_order_interval.csv", encoding="utf-8-sig")
-        df_attr = pd.read_csv(data_dir / "analysis_attribution.csv", encoding="utf-8-sig")
-    except:
-        df_ltv, df_interval, df_attr = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-    
-    # 날짜 처리
-    for df_item in [df_preprocessed, df_clustered, df_event, df_click]:
-        for col in ["주문일", "일자", "날짜"]:
-            if col in df_item.columns:
-                df_item[col] = pd.to_datetime(df_item[col], errors="coerce")
-    
-    # 수치 안정화
-    if not df_prod_eff.empty:
-        df_prod_eff.replace([np.inf, -np.inf], 0, inplace=True)
-        df_prod_eff.fillna(0, inplace=True)
-    if '공급가' not in df_prod_eff.columns: df_prod_eff['공급가'] = 0
-
-    return df_preprocessed, df_clustered, df_event, df_page, df_click, df_cluster_channel, df_prod_eff, df_ltv, df_interval, df_attr
-
-df_preprocessed, df_clustered, df_event, df_page, df_click, df_cluster_channel, df_prod_eff, df_ltv, df_interval, df_attr = load_all_data(last_mod)
+# 데이터셋마다 (mtime, 크기, 내용 해시) 지문을 키로 개별 캐싱하므로
+# 바뀐 파일만 다시 파싱됩니다.
+@st.cache_resource
+def get_registry():
+    return data_registry.DatasetRegistry()
+
+REGISTRY = get_registry()
+REGISTRY.begin_run()
+
+# 호스트 공유 데이터셋: 처음 읽은 워커가 Arrow IPC 파일로 쓰고, 모든 워커 프로세스가 memory-map 으로 붙입니다.
+# 매핑된 읽기 전용 버퍼를 세션 간에 그대로 공유하므로(cache_resource) 세션/워커별 복사본이 없습니다.
+@st.cache_resource
+def get_shared_datasets():
+    return shared_data.SharedDatasets()
+
+SHARED = get_shared_datasets()
+
+@st.cache_resource(max_entries=50, show_spinner="데이터를 분석 중입니다...")
+def load_dataset(name, fingerprint):
+    # data_store가 날짜/범주형/금액 타입을 적용한 상태로 반환합니다.
+    return SHARED.get(name, fingerprint, lambda: REGISTRY.read(name))
+
+def dataset(name):
+    with RUN.section(f"데이터 로딩: {name}", "데이터"):
+        return load_dataset(name, REGISTRY.fingerprint(name))
+
+# 일자 x 채널 x 결제방법 x 상품 x 클러스터 매출 큐브 (데이터 버전당 1회 집계, 전 페이지 공유)
+@st.cache_resource(max_entries=10, show_spinner=False)
+def get_sales_cube(fingerprint, _df_orders):
+    return rollup.build_sales_cube(_df_orders)
+
+# 페이지가 실제로 접근하는 데이터셋/파생 테이블만 읽습니다.
+# 공유 캐시 프레임은 세션별 Copy-on-Write 뷰로 받으므로 복사 없이 한 인스턴스를 공유합니다.
+FRAMES = data_registry.LazyFrames(dataset, data_registry.DATASETS, derived={
+    "sales_cube": lambda frames: RUN.call("매출 큐브", get_sales_cube, REGISTRY.fingerprint("data_preprocessed"),
+                                          frames["data_preprocessed"], kind="파생"),
+    "daily_cube": lambda frames: RUN.call("일별 큐브", rollup.rollup, frames["sales_cube"], kind="파생"),
+})
+
+# 상품별 가격 제안 (데이터 버전 x 규칙 설정별 캐시)
+@st.cache_resource(max_entries=20, show_spinner=False)
+def get_pricing(version, rules, _df_prod_eff, _df_orders):
+    df_pricing = pricing.build_pricing_table(_df_prod_eff, _df_orders)
+    return pricing.suggest_prices(df_pricing, rules)
+
+# 상품 전략 4분면 분류 (데이터 버전 x 분할 기준별, 원본 테이블은 수정하지 않음)
+@st.cache_resource(max_entries=20, show_spinner=False)
+def get_product_matrix(version, settings, _df_prod_eff):
+    return product_matrix.classify_products(_df_prod_eff, settings)
+
+# 매출 예측 모델 (데이터 버전별 결과 캐시, 새 날짜만 추가되면 재적합 없이 갱신)
+@st.cache_resource
+def get_forecast_cache():
+    return forecasting.ForecastCache()
+
+# 일별 지표 이상 징후 탐지기 (세션 간 공유, 데이터 버전이 바뀌면 새 날짜만 반영)
+@st.cache_resource
+def get_anomaly_monitor():
+    return anomaly.AnomalyMonitor()
+
+# 경영 분석 엑셀 리포트 (데이터 버전 x 가격 규칙별 파일 캐시, 다운로드 클릭 시에만 생성)
+@st.cache_resource
+def get_report_cache():
+    return report_export.ReportCache()
+
+# 주문월 파티션 저장소 (파티션 단위 지문/캐시, 바뀐 달만 다시 읽음)
+@st.cache_resource
+def get_order_store():
+    return order_store.OrderStore(REGISTRY)
+
+ORDER_STORE = get_order_store()
+
+@st.cache_resource(max_entries=60, show_spinner="데이터를 분석 중입니다...")
+def load_order_partition(month, fingerprint):
+    return SHARED.get(ORDER_STORE.dataset_name(month), fingerprint, lambda: ORDER_STORE.read_partition(month))
+
+def order_partition(month):
+    with RUN.section(f"파티션 로딩: {month or 'data_preprocessed'}", "데이터"):
+        return load_order_partition(month, ORDER_STORE.fingerprint(month))
+
+# 주문일 정렬 + 범주 비트맵 색인 (월 파티션 데이터 버전당 1회 구성, 세션 간 공유, 복사 없음)
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_order_index(version):
+    return filter_engine.OrderIndex(ORDER_STORE.load(reader=order_partition))
+
+# 페이지별 집계 공유 캐시 + 데이터 버전 변경 시 백그라운드 워밍업 (프로세스당 1회 시작)
+# 워밍업 스레드도 REGISTRY 지문과 SHARED 공유 파일을 거쳐 읽으므로 워커별 별도 복사본이 생기지 않습니다.
+@st.cache_resource
+def get_aggregate_cache():
+    cache = aggregates.AggregateCache()
+    aggregates.start_warmup_thread(cache, REGISTRY, SHARED)
+    return cache
+
+AGG_CACHE = get_aggregate_cache()
+
+def page_aggregates(page_id):
+    with RUN.section(f"집계: {page_id}", "집계"):
+        result = AGG_CACHE.get_or_build(aggregates.page_version(REGISTRY, page_id), page_id, FRAMES)
+    return {key: data_registry.shared_view(value) for key, value in result.items()}
+
+# 완성된 Figure 캐시 (데이터 버전 x 페이지 x 차트 x 파라미터, 세션 간 공유, 적중 시 생성 생략)
+@st.cache_resource
+def get_figure_cache():
+    return figure_cache.FigureCache()
+
+FIG_CACHE = get_figure_cache()
+FIGURE_PAGE_LABELS = {**{page_id: label for page_id, (label, _) in aggregates.PAGES.items()}, "matrix": "🎯 전략적 상품 매트릭스"}
+
+def cached_figure(page_id, name, build, **params):
+    with RUN.section(f"차트: {page_id}/{name}", "차트"):
+        return FIG_CACHE.get_or_build(PAGE_VERSION, page_id, name, build, **params)
+
+def subheader(title):
+    """페이지 구간 제목 (실행 계측 구간 경계를 겸함)"""
+    RUN.lap(title)
+    st.subheader(title)
 
 # ------------------------------------------------------------------
 # 사이드바 메뉴
 # ------------------------------------------------------------------
+# 페이지 -> 사용하는 데이터셋 (선택한 페이지의 데이터만 읽고, 누락 시 해당 페이지만 중단)
+PAGE_DATASETS = {
+    "👑 경영 요약": ["data_preprocessed", "data_clustered", "data_eventstats", "data_sales_click",
+                "analysis_product_efficiency", "analysis_forecast"],
+    "📄 최종 전략 보고서": [],
+    "📋 전략/분석 보고서": [],
+    "🧪 A/B 테스트 제안": [],
+    "🎯 전략적 상품 매트릭스": ["analysis_product_efficiency"],
+    "🏆 고객 가치 분석": ["analysis_ltv", "analysis_order_interval"],
+    "📊 마케팅 기여도": ["analysis_attribution"],
+    "📈 개요": ["data_preprocessed"],
+    "📊 EDA 분석": ["data_preprocessed"],
+    "🎯 클러스터링": ["data_clustered"],
+    "📈 마케팅 분석": ["data_preprocessed", "data_eventstats", "data_pagestats", "data_sales_click",
+                  "analysis_cluster_channel", "analysis_product_efficiency"],
+    "💎 속성 분석": ["data_preprocessed"],
+    "🔍 상세 분석": ["data_preprocessed"],
+}
+
+RUN.lap("사이드바")
 st.sidebar.title("📊 메뉴")
 page = st.sidebar.radio(
     "페이지 선택",
-    ["👑 경영 요약", "📄 최종 전략 보고서", "📋 전략/분석 보고서", "🧪 A/B 테스트 제안", "🎯 전략적 상품 매트릭스", "🏆 고객 가치 분석", "📊 마케팅 기여도", "📈 개요", "📊 EDA 분석", "🎯 클러스터링", "📈 마케팅 분석", "💎 속성 분석", "🔍 상세 분석"]
+    list(PAGE_DATASETS)
 )
+PAGE_VERSION = REGISTRY.version(*PAGE_DATASETS[page])
+RUN.page = page
 
 st.sidebar.divider()
 st.sidebar.subheader("📡 시스템 상태 (Health)")
-st.sidebar.caption("✅ 데이터 엔진 정상 작동 중")
+missing_all = REGISTRY.missing_required()
+if missing_all:
+    st.sidebar.caption(f"⚠️ 누락된 필수 데이터: {', '.join(missing_all)}")
+else:
+    st.sidebar.caption(f"✅ 필수 데이터셋 {sum(spec.required for spec in REGISTRY.datasets.values())}개 정상")
+last_run = PROFILER.last(page)
+if last_run:
+    st.sidebar.caption(f"⏱️ 이 페이지 직전 실행: {last_run['total_ms']:,.0f} ms")
+if REGISTRY.reloaded():
+    st.sidebar.caption(f"🔄 갱신된 데이터: {', '.join(REGISTRY.reloaded())}")
 st.sidebar.caption(f"📅 최종 동기화: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+if AGG_CACHE.timings:
+    with st.sidebar.expander("⏱️ 사전 집계 현황"):
+        for page_id, elapsed in AGG_CACHE.timings.items():
+            st.caption(f"{aggregates.PAGES[page_id][0]}: {elapsed * 1000:,.1f} ms")
+if FIG_CACHE.stats():
+    with st.sidebar.expander("🖼️ 차트 캐시 현황"):
+        for page_id, (hits, misses) in FIG_CACHE.stats().items():
+            st.caption(f"{FIGURE_PAGE_LABELS.get(page_id, page_id)}: 적중 {hits:,} / 미스 {misses:,}")
+
+# 필수 파일 확인 (Parquet 사본이 최신이면 CSV 원본이 없어도 됩니다)
+missing = [f"{name}.csv" for name in REGISTRY.missing_required(PAGE_DATASETS[page])]
+if missing:
+    st.error(f"🚨 이 페이지에 필요한 데이터 파일이 누락되었습니다: {', '.join(missing)}")
+    if "data_preprocessed.csv" in missing:
+        st.info("주문 내보내기 파일을 data/raw/ 에 두고 `python preprocess.py`를 실행해 주세요.")
+    PROFILER.finish(RUN, missing=missing)
+    st.stop()
+
+RUN.lap("페이지 상단")
 
 # ------------------------------------------------------------------
 # 페이지: 👑 경영 요약 (Management View)
@@ -167,87 +310,94 @@ if page == "👑 경영 요약":
         </div>
     """, unsafe_allow_html=True)
     
+    agg = page_aggregates("executive")
+    
     # 0. 이상 징후 감지 (Anomaly Detection)
-    st.subheader("🚨 실시간 성과 경보 (Anomaly Detection)")
-    
-    # 최근 7일 매출 변동성 분석
-    daily_sales = df_preprocessed.groupby('주문일')['결제금액(상품별)'].sum().reset_index()
-    last_7_days = daily_sales.tail(7)
-    if not last_7_days.empty:
-        mean_sales = daily_sales['결제금액(상품별)'].mean()
-        std_sales = daily_sales['결제금액(상품별)'].std()
-        latest_sales = last_7_days.iloc[-1]['결제금액(상품별)']
-        
-        if latest_sales > mean_sales + 2 * std_sales:
-            st.success(f"🔥 **성과 급증 감지**: 최근 매출이 평균 대비 2배 이상 높습니다! 현재 마케팅 소재의 효율이 극대화된 상태입니다.")
-        elif latest_sales < mean_sales - 1.5 * std_sales:
-            st.warning(f"⚠️ **성과 하락 주의**: 최근 매출이 정상 범위보다 낮습니다. 유입 경로의 이탈이나 결제 오류 여부를 확인하세요.")
+    subheader("🚨 실시간 성과 경보 (Anomaly Detection)")
+    
+    # 요일별 중앙값/MAD 기준선 대비 최신 일자 점수 (전체 매출/주문/DAU/PV + 채널/상품별)
+    daily_sales = agg["daily_sales"]
+    monitor = get_anomaly_monitor()
+    monitor.sync(REGISTRY.version("data_preprocessed", "data_eventstats"), lambda: anomaly.build_feeds(FRAMES))
+    latest = monitor.latest("매출")
+    if latest is not None:
+        score = latest["score"]
+        latest_day = latest["timestamp"].strftime("%Y-%m-%d")
+        if score is not None and score >= monitor.threshold:
+            st.success(f"🔥 **성과 급증 감지** ({latest_day}, 점수 {score:+.1f}): 매출이 같은 요일 기준선({latest['baseline']:,.0f}원)보다 크게 높습니다! 현재 마케팅 소재의 효율이 극대화된 상태입니다.")
+        elif score is not None and score <= -monitor.threshold:
+            st.warning(f"⚠️ **성과 하락 주의** ({latest_day}, 점수 {score:+.1f}): 매출이 같은 요일 기준선({latest['baseline']:,.0f}원)보다 낮습니다. 유입 경로의 이탈이나 결제 오류 여부를 확인하세요.")
         else:
             st.info("✅ 현재 매출 및 운영 지표가 정상 범위 내에서 안정적으로 유지되고 있습니다.")
+
+    with st.expander("🔎 이상 징후 경보 이력"):
+        a1, a2, a3 = st.columns(3)
+        with a1:
+            alert_metrics = st.multiselect("지표", ["매출", "주문건수", "DAU", "PV"], default=["매출", "주문건수", "DAU", "PV"])
+        with a2:
+            alert_scope = st.radio("범위", ["전체", "채널/상품별"], horizontal=True)
+        with a3:
+            alert_min_score = st.slider("최소 |점수|", float(monitor.threshold), 20.0, float(monitor.threshold), 0.5)
+        df_alerts = monitor.alerts(alert_metrics, min_score=alert_min_score)
+        df_alerts = df_alerts[(df_alerts["키"] == "전체") == (alert_scope == "전체")]
+        st.dataframe(df_alerts.head(200), use_container_width=True, hide_index=True)
     
     st.divider()
-    st.subheader("📍 핵심 성과 지표 (KPI)")
+    subheader("📍 핵심 성과 지표 (KPI)")
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_revenue = df_preprocessed["결제금액(상품별)"].sum()
+        total_revenue = agg["total_revenue"]
         st.metric("총 매출액", f"{total_revenue:,.0f}원")
     
     with col2:
         # 최근 마케팅 데이터를 통한 RPC 추출
-        avg_rpc = df_prod_eff["RPC"].mean()
+        avg_rpc = agg["avg_rpc"]
         st.metric("평균 클릭당 매출 (RPC)", f"{avg_rpc:,.1f}원")
         
     with col3:
-        avg_ctr = df_prod_eff["CTR"].mean()
+        avg_ctr = agg["avg_ctr"]
         st.metric("평균 마케팅 클릭률 (CTR)", f"{avg_ctr:.2f}%")
         
     with col4:
-        total_vistors = df_event['DAU 전체(회원)'].sum()
+        total_vistors = agg["total_visitors"]
         st.metric("총 방문자 수 (DAU)", f"{total_vistors:,.0f}명")
 
     st.divider()
 
-    # 1.5. 매출 예측 (Revenue Forecasting - Simple Trend)
-    st.subheader("🔮 향후 7일 매출 예측 (Forecasting)")
-    
-    # 일별 매출 집계
-    daily_sales = df_preprocessed.groupby('주문일')['결제금액(상품별)'].sum().reset_index()
-    daily_sales = daily_sales.sort_values('주문일')
-    
-    # 최근 30일 데이터로 7일 예측 (이동평균 + 추세 기반 단순 모델)
-    recent_sales = daily_sales.tail(30)
-    last_date = recent_sales['주문일'].max()
-    forecast_dates = pd.date_range(start=last_date + pd.Timedelta(days=1), periods=7)
-    
-    # 간단한 선형 추세 계산
-    x = np.arange(len(recent_sales))
-    y = recent_sales['결제금액(상품별)'].values
-    slope, intercept = np.polyfit(x, y, 1)
-    
-    forecast_values = slope * (np.arange(len(recent_sales), len(recent_sales) + 7)) + intercept
-    forecast_values = np.maximum(forecast_values, 0) # 음수 방지
-    
-    df_forecast = pd.DataFrame({'날짜': forecast_dates, '예상매출': forecast_values})
-    
-    fig_forecast = go.Figure()
-    fig_forecast.add_trace(go.Scatter(x=recent_sales['주문일'], y=y, name='실제 매출', line=dict(color='royalblue', width=2)))
-    fig_forecast.add_trace(go.Scatter(x=df_forecast['날짜'], y=forecast_values, name='예측 매출', line=dict(color='firebrick', width=2, dash='dot')))
-    
-    fig_forecast.update_layout(
-        title="최근 매출 추이 및 향후 7일 예측",
-        xaxis_title="날짜",
-        yaxis_title="매출액 (원)",
-        template="plotly_white",
-        hovermode="x unified"
-    )
-    st.plotly_chart(fig_forecast, use_container_width=True)
-    st.caption("최근 30일간의 매출 추세를 기반으로 산출된 통계적 예측치입니다.")
+    # 1.5. 매출 예측 (Revenue Forecasting - ETS / SARIMAX)
+    subheader("🔮 향후 7일 매출 예측 (Forecasting)")
+    
+    # 전체 일별 매출로 주간 계절성 모델을 적합하고, 최근 30일 실적과 함께 표시
+    forecast_label = st.radio("예측 모델", ["ETS (Holt-Winters)", "SARIMAX"], horizontal=True)
+    forecast_method = {"ETS (Holt-Winters)": "ets", "SARIMAX": "sarimax"}[forecast_label]
+    sales_series = forecasting.daily_series(daily_sales)
+    df_forecast = get_forecast_cache().get(PAGE_VERSION, "total", sales_series, method=forecast_method)
+    recent_sales = sales_series.tail(30)
+
+    def build_forecast():
+        return forecasting.forecast_figure(recent_sales, df_forecast)
+
+    st.plotly_chart(cached_figure("executive", "fig_forecast", build_forecast, method=forecast_method), use_container_width=True)
+    st.caption(f"전체 일별 매출에 {forecast_label} 모델(주간 계절성)을 적합한 예측치이며, 음영은 예측 구간입니다.")
+
+    with st.expander("📦 채널/상품별 향후 7일 예측 (배치)"):
+        df_forecast_batch = FRAMES["analysis_forecast"]
+        if df_forecast_batch.empty:
+            st.info("배치 예측 결과가 없습니다. `python forecast_batch.py`를 실행해 주세요.")
+        else:
+            forecast_dim = st.radio("예측 기준", ["주문경로", "상품코드"], horizontal=True)
+            forecast_summary = (
+                df_forecast_batch[df_forecast_batch["차원"] == forecast_dim]
+                .groupby("키")[["예측", "하한", "상한"]].sum()
+                .sort_values("예측", ascending=False)
+            )
+            st.dataframe(forecast_summary.style.format("{:,.0f}"), use_container_width=True)
 
     st.divider()
 
     # 2. 매출 시뮬레이터
-    st.subheader("📊 매출 성장 시뮬레이터 (Simulator)")
+    subheader("📊 매출 성장 시뮬레이터 (Simulator)")
     st.write("마케팅 유입 및 효율 변화에 따른 예상 매출액을 시뮬레이션합니다.")
     
     col_sim1, col_sim2 = st.columns([1, 2])
@@ -260,11 +410,11 @@ if page == "👑 경영 요약":
         
     with col_sim2:
         # 기본값 로직
-        current_pv = df_event['PV'].sum()
-        current_ctr = (df_click['클릭수'].sum() / df_click['조회수'].sum()) * 100
+        current_pv = agg["current_pv"]
+        current_ctr = agg["current_ctr"]
         # 단순 전환율 추정 (판매건수 / 클릭수)
-        current_cvr = (len(df_preprocessed) / df_click['클릭수'].sum()) * 100
-        avg_order_value = df_preprocessed["결제금액(상품별)"].mean()
+        current_cvr = agg["current_cvr"]
+        avg_order_value = agg["avg_order_value"]
         
         # 시뮬레이션 계산
         sim_pv = current_pv * (1 + target_pv / 100)
@@ -278,7 +428,7 @@ if page == "👑 경영 요약":
         st.write("### 예상 성과")
         res_col1, res_col2 = st.columns(2)
         res_col1.metric("예상 총 매출", f"{sim_revenue:,.0f}원", f"{rev_diff:,.0f}원")
-        res_col2.metric("예상 주문 건수", f"{sim_order:,.0f}건", f"{sim_order - len(df_preprocessed):,.0f}건")
+        res_col2.metric("예상 주문 건수", f"{sim_order:,.0f}건", f"{sim_order - agg['order_count']:,.0f}건")
         
         # 차트 표시
         fig_sim = go.Figure(go.Indicator(
@@ -301,22 +451,22 @@ if page == "👑 경영 요약":
     st.divider()
 
     # 3. 데이터 기반 자동 전략 제안 (Auto-Insights)
-    st.subheader("💡 인공지능 기반 마케팅 진단")
+    subheader("💡 인공지능 기반 마케팅 진단")
     
     insights = []
     
     # RPCInsight
-    low_rpc_prods = df_prod_eff[df_prod_eff['RPC'] < df_prod_eff['RPC'].median()].head(3)
-    if not low_rpc_prods.empty:
-        insights.append(f"⚠️ **수익성 주의**: `{', '.join(low_rpc_prods['상품명'].tolist())}` 상품은 클릭 대비 매출(RPC)이 낮습니다. 상세 페이지의 가격 제안 혹은 구매 전환 요소를 점검하세요.")
+    low_rpc_prods = agg["low_rpc_prods"]
+    if low_rpc_prods:
+        insights.append(f"⚠️ **수익성 주의**: `{', '.join(low_rpc_prods)}` 상품은 클릭 대비 매출(RPC)이 낮습니다. 상세 페이지의 가격 제안 혹은 구매 전환 요소를 점검하세요.")
         
     # High CTR, Low Conversion Insight
-    high_ctr_prods = df_prod_eff[df_prod_eff['CTR'] > df_prod_eff['CTR'].median()].sort_values('RPC').head(2)
-    if not high_ctr_prods.empty:
-        insights.append(f"✨ **기회 포착**: `{', '.join(high_ctr_prods['상품명'].tolist())}` 상품은 유입량은 많으나 결제로의 연결이 부족합니다. '한정 수량' 혹은 '타임 세일' 등의 장치를 추가해 보세요.")
+    high_ctr_prods = agg["high_ctr_prods"]
+    if high_ctr_prods:
+        insights.append(f"✨ **기회 포착**: `{', '.join(high_ctr_prods)}` 상품은 유입량은 많으나 결제로의 연결이 부족합니다. '한정 수량' 혹은 '타임 세일' 등의 장치를 추가해 보세요.")
         
     # Channel Insight
-    top_channel = df_preprocessed['주문경로'].value_counts().idxmax()
+    top_channel = agg["top_channel"]
     insights.append(f"📈 **채널 성과**: 현재 가장 강력한 유입 채널은 **{top_channel}**입니다. 해당 채널의 예산을 15% 증액하여 규모의 경제를 달성할 것을 권장합니다.")
 
     for insight in insights:
@@ -325,25 +475,24 @@ if page == "👑 경영 요약":
     st.divider()
 
     # 4. 상품별 적정 판매가 제안 (Pricing Suggestion)
-    st.subheader("💰 상품별 수익 최적화 제안 (Pricing)")
+    subheader("💰 상품별 수익 최적화 제안 (Pricing)")
     st.write("공급가와 현재 판매 성과를 분석하여 수익 극대화를 위한 적정 판매가를 제안합니다.")
     
-    # 마진율 계산을 위해 판매수량 정보 결합
-    prod_qty = df_clustered.groupby('상품코드')['주문수량'].sum().reset_index()
-    df_pricing = pd.merge(df_prod_eff, prod_qty, on='상품코드')
-    
-    df_pricing['마진액'] = df_pricing['결제금액(상품별)'] - (df_pricing['공급가'] * df_pricing['주문수량'])
-    df_pricing['현재마진율'] = (df_pricing['마진액'] / df_pricing['결제금액(상품별)']) * 100
-    
     # 제안 로직: CTR이 높고 마진율이 낮은 상품은 가격 인상 고려, CTR이 낮고 마진이 높은 상품은 할인 이벤트 고려
-    def suggest_price(row):
-        if row['CTR'] > df_pricing['CTR'].median() and row['현재마진율'] < 20:
-            return f"{row['결제금액(상품별)']/row['주문수량'] * 1.1:,.0f}원 (인상 권고)", "인기 대비 저마진"
-        elif row['CTR'] < df_pricing['CTR'].median() and row['현재마진율'] > 40:
-            return f"{row['결제금액(상품별)']/row['주문수량'] * 0.9:,.0f}원 (할인 권고)", "고마진 대비 저조한 유입"
-        return "현재가 유지", "안정적 성과"
-
-    df_pricing[['제안가격', '판단근거']] = df_pricing.apply(lambda r: pd.Series(suggest_price(r)), axis=1)
+    with st.expander("⚙️ 가격 제안 규칙 설정"):
+        rule_col1, rule_col2, rule_col3 = st.columns(3)
+        low_margin = rule_col1.number_input("저마진 기준 (%)", value=20.0, step=5.0)
+        high_margin = rule_col2.number_input("고마진 기준 (%)", value=40.0, step=5.0)
+        adjust_rate = rule_col3.number_input("인상/할인 폭 (%)", value=10.0, step=1.0) / 100
+    pricing_rules = pricing.PricingRules(
+        low_margin=low_margin, high_margin=high_margin,
+        raise_rate=adjust_rate, discount_rate=adjust_rate,
+    )
+    df_prod_eff, df_clustered = FRAMES["analysis_product_efficiency"], FRAMES["data_clustered"]
+    df_pricing = data_registry.shared_view(get_pricing(
+        REGISTRY.version("analysis_product_efficiency", "data_clustered"),
+        pricing_rules, df_prod_eff, df_clustered,
+    ))
     
     st.dataframe(
         df_pricing[['상품명', '공급가', '현재마진율', 'CTR', '제안가격', '판단근거']].head(10),
@@ -353,20 +502,21 @@ if page == "👑 경영 요약":
     st.divider()
     
     # 5. 엑셀 리포트 출력
-    st.subheader("📥 경영 분석 리포트 다운로드")
-    
-    import io
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df_pricing.to_excel(writer, sheet_name='상품효율및가격제안', index=False)
-        daily_sales.to_excel(writer, sheet_name='일별매출현황', index=False)
-        df_prod_eff.to_excel(writer, sheet_name='마케팅효율지표', index=False)
+    subheader("📥 경영 분석 리포트 다운로드")
+    
+    # 시트 구성은 report_export.default_sheets 공용 (가격 제안표/클러스터 통계는 캐시된 값 사용)
+    report_version = report_export.report_version(REGISTRY, pricing_rules)
+    report_sheets = report_export.default_sheets(
+        FRAMES, pricing_rules,
+        pricing_table=lambda: df_pricing,
+        cluster_stats=lambda: page_aggregates("clustering")["cluster_stats"],
+    )
     
     st.download_button(
         label="📊 전문가용 경영 분석 엑셀 다운로드",
-        data=output.getvalue(),
+        data=lambda: get_report_cache().read_bytes(report_version, report_sheets),
         file_name=f"Management_Report_{pd.Timestamp.now().strftime('%Y%m%d')}.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        mime=report_export.XLSX_MIME
     )
 
 # ------------------------------------------------------------------
@@ -438,54 +588,49 @@ elif page == "🎯 전략적 상품 매트릭스":
     """, unsafe_allow_html=True)
 
     # 매트릭스 분석용 데이터 준비
-    median_ctr = df_prod_eff['CTR'].median()
-    median_rpc = df_prod_eff['RPC'].median()
-
-    def classify_product(row):
-        if row['CTR'] >= median_ctr and row['RPC'] >= median_rpc:
-            return "🌟 Star (주력 모델)"
-        elif row['CTR'] >= median_ctr and row['RPC'] < median_rpc:
-            return "💡 Opportunity (기회 상품)"
-        elif row['CTR'] < median_ctr and row['RPC'] >= median_rpc:
-            return "💰 Cash Cow (수익 상품)"
-        else:
-            return "⚠️ Underperform (개선 필요)"
-
-    df_prod_eff['전략분류'] = df_prod_eff.apply(classify_product, axis=1)
+    df_prod_eff = FRAMES["analysis_product_efficiency"]
+    split_label = st.radio("분할 기준", ["중앙값", "분위수", "조회수 가중 중앙값"], horizontal=True)
+    split_q = 0.5
+    if split_label == "분위수":
+        split_q = st.slider("분할 분위수", 0.1, 0.9, 0.5, step=0.05)
+    split_settings = product_matrix.SplitSettings(
+        method={"중앙값": "median", "분위수": "quantile", "조회수 가중 중앙값": "weighted_median"}[split_label],
+        quantile=split_q,
+    )
+    matrix = get_product_matrix(REGISTRY.version("analysis_product_efficiency"), split_settings, df_prod_eff)
+    line_label = "중앙값" if split_label == "중앙값" else "기준선"
 
     # 시각화
-    fig_matrix = px.scatter(
-        df_prod_eff,
-        x="CTR",
-        y="RPC",
-        color="전략분류",
-        size="조회수",
-        hover_name="상품명",
-        text="상품명",
-        title="상품 전략 매트릭스 (CTR vs RPC)",
-        labels={"CTR": "클릭률 (%)", "RPC": "클릭당 매출 (원)"},
-        color_discrete_map={
-            "🌟 Star (주력 모델)": "#2ecc71",
-            "💡 Opportunity (기회 상품)": "#3498db",
-            "💰 Cash Cow (수익 상품)": "#f1c40f",
-            "⚠️ Underperform (개선 필요)": "#e74c3c"
-        }
-    )
-    
-    # 구분선 (중앙값) 추가
-    fig_matrix.add_hline(y=median_rpc, line_dash="dot", line_color="gray", annotation_text="RPC 중앙값")
-    fig_matrix.add_vline(x=median_ctr, line_dash="dot", line_color="gray", annotation_text="CTR 중앙값")
-    
-    fig_matrix.update_traces(textposition='top center')
-    st.plotly_chart(fig_matrix, use_container_width=True)
+    def build_matrix():
+        fig_matrix = px.scatter(
+            df_prod_eff.assign(전략분류=matrix.labels),
+            x="CTR",
+            y="RPC",
+            color="전략분류",
+            size="조회수",
+            hover_name="상품명",
+            text="상품명",
+            title="상품 전략 매트릭스 (CTR vs RPC)",
+            labels={"CTR": "클릭률 (%)", "RPC": "클릭당 매출 (원)"},
+            color_discrete_map=product_matrix.CLASS_COLORS
+        )
+
+        # 구분선 (분할 기준) 추가
+        fig_matrix.add_hline(y=matrix.rpc_split, line_dash="dot", line_color="gray", annotation_text=f"RPC {line_label}")
+        fig_matrix.add_vline(x=matrix.ctr_split, line_dash="dot", line_color="gray", annotation_text=f"CTR {line_label}")
+
+        fig_matrix.update_traces(textposition='top center')
+        return fig_matrix
+
+    st.plotly_chart(cached_figure("matrix", "fig_matrix", build_matrix, settings=split_settings), use_container_width=True)
 
     st.divider()
     
-    # 상세 테이블
-    st.subheader("📋 분류별 상품 리스트")
-    selected_class = st.selectbox("전략 분류 선택", df_prod_eff['전략분류'].unique())
+    # 상세 테이블 (미리 계산된 분류 색인으로 필터링)
+    subheader("📋 분류별 상품 리스트")
+    selected_class = st.selectbox("전략 분류 선택", list(matrix.members))
     st.dataframe(
-        df_prod_eff[df_prod_eff['전략분류'] == selected_class][['상품명', 'CTR', 'RPC', 'RPV', '조회수', '결제금액(상품별)']].sort_values('결제금액(상품별)', ascending=False),
+        matrix.rows(df_prod_eff, selected_class)[['상품명', 'CTR', 'RPC', 'RPV', '조회수', '결제금액(상품별)']].sort_values('결제금액(상품별)', ascending=False),
         use_container_width=True
     )
 
@@ -500,7 +645,7 @@ elif page == "🧪 A/B 테스트 제안":
         </div>
     """, unsafe_allow_html=True)
 
-    st.subheader("🎯 전략적 실험 시나리오")
+    subheader("🎯 전략적 실험 시나리오")
     st.write("분석된 클러스터 특성과 상품 효율 지표를 바탕으로 다음의 A/B 테스트를 제안합니다.")
 
     col1, col2 = st.columns(2)
@@ -534,7 +679,7 @@ elif page == "🧪 A/B 테스트 제안":
         """, unsafe_allow_html=True)
 
     st.divider()
-    st.subheader("📊 실험 기대 효과 (Simulation)")
+    subheader("📊 실험 기대 효과 (Simulation)")
     st.info("A/B 테스트 실시 시 예상되는 비즈니스 임팩트")
 
     sim_col1, sim_col2, sim_col3 = st.columns(3)
@@ -551,17 +696,20 @@ elif page == "🏆 고객 가치 분석":
     st.title("🏆 고객 생애 가치 및 이탈 분석 (LTV & Churn)")
     st.write("고객별 구매 패턴을 분석하여 미래 가치가 높은 VIP 고객과 이탈 위험 고객을 식별합니다.")
     
+    df_ltv, df_interval = FRAMES["analysis_ltv"], FRAMES["analysis_order_interval"]
     if df_ltv.empty:
-        st.warning("분석 데이터가 부족합니다. `analyze_phase5.py`를 실행해 주세요.")
+        st.warning("분석 데이터가 부족합니다. `python ltv_pipeline.py`를 실행해 주세요.")
     else:
+        agg = page_aggregates("customer_value")
+        
         # KPI 요약
         col_ltv1, col_ltv2, col_ltv3 = st.columns(3)
         with col_ltv1:
-            st.metric("평균 LTV 점수", f"{df_ltv['LTV_Score'].mean():.1f}")
+            st.metric("평균 LTV 점수", f"{agg['avg_ltv']:.1f}")
         with col_ltv2:
-            st.metric("평균 재구매 횟수", f"{df_ltv['Frequency'].mean():.1f}회")
+            st.metric("평균 재구매 횟수", f"{agg['avg_frequency']:.1f}회")
         with col_ltv3:
-            st.metric("고가치 고객 비중 (Top 20%)", f"{len(df_ltv[df_ltv['LTV_Score'] > df_ltv['LTV_Score'].quantile(0.8)]) / len(df_ltv) * 100:.1f}%")
+            st.metric("고가치 고객 비중 (Top 20%)", f"{agg['top20_share']:.1f}%")
             
         st.divider()
         
@@ -577,7 +725,7 @@ elif page == "🏆 고객 가치 분석":
         with col_ltv_chart2:
             st.subheader("📉 재구매 지연 고객 (이탈 위험)")
             # Recency가 30일 이상인 고객 필터링
-            df_churn = df_ltv[df_ltv['Recency'] > 30].sort_values('Monetary', ascending=False)
+            df_churn = agg["df_churn"]
             st.write(f"최근 30일간 구매가 없는 고가치 고객 ({len(df_churn)}명)")
             st.dataframe(df_churn[['고객ID', 'Recency', 'Monetary', 'Frequency']].head(10), use_container_width=True)
             
@@ -598,8 +746,9 @@ elif page == "📊 마케팅 기여도":
     st.title("📊 마케팅 채널별 ROI 및 기여도 분석")
     st.write("각 마케팅 채널의 광고비 대비 매출 성과(ROAS) 및 주문 기여도를 정밀하게 분석합니다.")
     
+    df_attr = FRAMES["analysis_attribution"]
     if df_attr.empty:
-        st.warning("분석 데이터가 부족합니다. `analyze_attribution.py`를 실행해 주세요.")
+        st.warning("분석 데이터가 부족합니다. `python attribution.py`를 실행해 주세요.")
     else:
         # 채널 성과 매트릭스
         st.subheader("🚀 채널별 ROAS 및 효율성")
@@ -611,7 +760,9 @@ elif page == "📊 마케팅 기여도":
         col_attr_1, col_attr_2 = st.columns(2)
         with col_attr_1:
             st.subheader("💰 채널별 매출 기여 비중")
-            fig_attr_pie = px.pie(df_attr, values="매출액", names="채널", hole=0.3)
+            # time_decay 결과면 최근 주문 가중 기여 몫(합계는 실제 매출과 같음)으로 표시
+            share_col = "가중매출액" if "가중매출액" in df_attr.columns else "매출액"
+            fig_attr_pie = px.pie(df_attr, values=share_col, names="채널", hole=0.3)
             st.plotly_chart(fig_attr_pie, use_container_width=True)
             
         with col_attr_2:
@@ -628,34 +779,32 @@ elif page == "📊 마케팅 기여도":
 elif page == "📈 개요":
     st.title("📈 판매 데이터 개요")
     
+    agg = page_aggregates("overview")
+    
     # KPI 카드
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_orders = len(df_preprocessed)
+        total_orders = agg["total_orders"]
         st.metric("총 주문 건수", f"{total_orders:,}건")
     
     with col2:
-        total_revenue = df_preprocessed["결제금액(상품별)"].sum()
+        total_revenue = agg["total_revenue"]
         st.metric("총 매출액", f"{total_revenue:,.0f}원")
     
     with col3:
-        avg_order = df_preprocessed["결제금액(상품별)"].mean()
+        avg_order = agg["avg_order"]
         st.metric("평균 주문 금액", f"{avg_order:,.0f}원")
     
     with col4:
-        avg_quantity = df_preprocessed["주문수량"].mean()
+        avg_quantity = agg["avg_quantity"]
         st.metric("평균 주문 수량", f"{avg_quantity:.2f}개")
     
     st.divider()
     
     # 일별 주문 추이
-    st.subheader("📅 일별 주문 추이")
-    daily_orders = df_preprocessed.groupby(df_preprocessed["주문일"].dt.date).agg({
-        "주문번호": "count",
-        "결제금액(상품별)": "sum"
-    }).reset_index()
-    daily_orders.columns = ["날짜", "주문건수", "매출액"]
+    subheader("📅 일별 주문 추이")
+    daily_orders = agg["daily_orders"]
     
     fig_daily = go.Figure()
     fig_daily.add_trace(go.Scatter(
@@ -679,7 +828,7 @@ elif page == "📈 개요":
     
     with col1:
         st.subheader("📱 주문 경로별 분포")
-        channel_dist = df_preprocessed["주문경로"].value_counts()
+        channel_dist = agg["channel_dist"]
         fig_channel = px.pie(
             values=channel_dist.values,
             names=channel_dist.index,
@@ -689,7 +838,7 @@ elif page == "📈 개요":
     
     with col2:
         st.subheader("💳 결제 방법별 분포")
-        payment_dist = df_preprocessed["결제방법"].value_counts()
+        payment_dist = agg["payment_dist"]
         fig_payment = px.pie(
             values=payment_dist.values,
             names=payment_dist.index,
@@ -702,22 +851,18 @@ elif page == "📈 개요":
 # ------------------------------------------------------------------
 elif page == "📊 EDA 분석":
     st.title("📊 EDA 분석")
+    agg = page_aggregates("eda")
     
     # 결측치 현황
-    st.subheader("🔍 결측치 현황")
-    missing_data = pd.DataFrame({
-        "컬럼명": df_preprocessed.columns,
-        "결측치 수": df_preprocessed.isnull().sum().values,
-        "결측치 비율(%)": (df_preprocessed.isnull().sum() / len(df_preprocessed) * 100).values
-    }).sort_values("결측치 수", ascending=False)
+    subheader("🔍 결측치 현황")
+    missing_data = agg["missing_data"]
     st.dataframe(missing_data, use_container_width=True)
     
     st.divider()
     
     # 수치형 컬럼 통계
-    st.subheader("📈 수치형 컬럼 기본 통계")
-    numeric_cols = df_preprocessed.select_dtypes(include="number").columns
-    stats_df = df_preprocessed[numeric_cols].describe().T
+    subheader("📈 수치형 컬럼 기본 통계")
+    stats_df = agg["stats_df"]
     st.dataframe(stats_df, use_container_width=True)
     
     st.divider()
@@ -727,9 +872,7 @@ elif page == "📊 EDA 분석":
     
     with col1:
         st.subheader("📅 요일별 주문 분포")
-        df_preprocessed["주문요일"] = df_preprocessed["주문일"].dt.day_name()
-        weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        weekday_counts = df_preprocessed["주문요일"].value_counts().reindex(weekday_order)
+        weekday_counts = agg["weekday_counts"]
         
         fig_weekday = px.bar(
             x=weekday_counts.index,
@@ -741,12 +884,10 @@ elif page == "📊 EDA 분석":
     
     with col2:
         st.subheader("💰 결제금액 분포")
-        fig_payment_dist = px.histogram(
-            df_preprocessed,
-            x="결제금액(상품별)",
-            nbins=50,
+        fig_payment_dist = chart_data.histogram_figure(
+            agg["payment_hist"],
             title="결제금액 분포",
-            labels={"결제금액(상품별)": "결제금액"}
+            x_title="결제금액"
         )
         st.plotly_chart(fig_payment_dist, use_container_width=True)
     
@@ -755,16 +896,16 @@ elif page == "📊 EDA 분석":
     
     with col1:
         st.subheader("📦 주문수량 분포")
-        fig_quantity = px.box(
-            df_preprocessed,
-            y="주문수량",
-            title="주문수량 Box Plot"
+        fig_quantity = chart_data.box_figure(
+            agg["quantity_box"],
+            title="주문수량 Box Plot",
+            y_title="주문수량"
         )
         st.plotly_chart(fig_quantity, use_container_width=True)
     
     with col2:
         st.subheader("📱 주문 경로별 매출 비교")
-        channel_revenue = df_preprocessed.groupby("주문경로")["결제금액(상품별)"].sum().sort_values(ascending=False)
+        channel_revenue = agg["channel_revenue"]
         fig_channel_revenue = px.bar(
             x=channel_revenue.index,
             y=channel_revenue.values,
@@ -778,15 +919,11 @@ elif page == "📊 EDA 분석":
 # ------------------------------------------------------------------
 elif page == "🎯 클러스터링":
     st.title("🎯 구매 패턴 클러스터링")
+    agg = page_aggregates("clustering")
     
     # 클러스터 통계
-    st.subheader("📊 클러스터별 통계 요약")
-    cluster_stats = df_clustered.groupby("cluster").agg({
-        "주문번호": "count",
-        "주문수량": ["mean", "sum"],
-        "결제금액(상품별)": ["mean", "median", "sum"]
-    }).round(2)
-    cluster_stats.columns = ["주문건수", "평균수량", "총수량", "평균금액", "중앙금액", "총매출"]
+    subheader("📊 클러스터별 통계 요약")
+    cluster_stats = agg["cluster_stats"]
     st.dataframe(cluster_stats, use_container_width=True)
     
     st.divider()
@@ -796,20 +933,33 @@ elif page == "🎯 클러스터링":
     
     with col1:
         st.subheader("🎯 클러스터 산점도 (결제금액 vs 주문수량)")
-        fig_scatter = px.scatter(
-            df_clustered,
-            x="주문수량",
-            y="결제금액(상품별)",
-            color="cluster",
-            title="클러스터별 결제금액 vs 주문수량",
-            labels={"cluster": "클러스터"},
-            color_continuous_scale="viridis"
-        )
+        scatter_labels = {"cluster": "클러스터", "주문수량": "주문수량", "결제금액(상품별)": "결제금액"}
+        qty_full, amt_full = ((lo, max(hi, lo + 1)) for lo, hi in agg["scatter_extent"])
+        with st.expander("🔍 확대 범위"):
+            qty_range = st.slider("주문수량", *qty_full, qty_full)
+            amt_range = st.slider("결제금액", *amt_full, amt_full)
+
+        zoomed = qty_range != qty_full or amt_range != amt_full
+        points = chart_data.points_in_range(FRAMES["data_clustered"], "주문수량", "결제금액(상품별)", qty_range, amt_range) if zoomed else None
+        if points is not None:
+            # 확대 범위 안의 점이 적으면 원본 점으로 표시
+            fig_scatter = chart_data.raw_scatter_figure(
+                points, "주문수량", "결제금액(상품별)", "cluster",
+                title=f"클러스터별 결제금액 vs 주문수량 (원본 {len(points):,}건)", labels=scatter_labels
+            )
+        else:
+            scatter_bins = chart_data.bin_2d(
+                FRAMES["data_clustered"], "주문수량", "결제금액(상품별)", by="cluster", x_range=qty_range, y_range=amt_range
+            ) if zoomed else agg["scatter_bins"]
+            fig_scatter = chart_data.binned_scatter_figure(
+                scatter_bins, "주문수량", "결제금액(상품별)", "cluster",
+                title="클러스터별 결제금액 vs 주문수량 (구간 집계)", labels=scatter_labels
+            )
         st.plotly_chart(fig_scatter, use_container_width=True)
     
     with col2:
         st.subheader("📊 클러스터별 평균 금액 비교")
-        cluster_avg = df_clustered.groupby("cluster")["결제금액(상품별)"].mean().sort_values(ascending=False)
+        cluster_avg = agg["cluster_avg"]
         fig_cluster_avg = px.bar(
             x=cluster_avg.index.astype(str),
             y=cluster_avg.values,
@@ -823,7 +973,7 @@ elif page == "🎯 클러스터링":
     
     with col1:
         st.subheader("🥧 클러스터별 건수 분포")
-        cluster_counts = df_clustered["cluster"].value_counts()
+        cluster_counts = agg["cluster_counts"]
         fig_cluster_pie = px.pie(
             values=cluster_counts.values,
             names=cluster_counts.index.astype(str),
@@ -833,12 +983,11 @@ elif page == "🎯 클러스터링":
     
     with col2:
         st.subheader("📦 클러스터별 결제금액 분포")
-        fig_cluster_box = px.box(
-            df_clustered,
-            x="cluster",
-            y="결제금액(상품별)",
+        fig_cluster_box = chart_data.box_figure(
+            agg["amount_box"],
             title="클러스터별 결제금액 Box Plot",
-            labels={"cluster": "클러스터", "결제금액(상품별)": "결제금액"}
+            x_title="클러스터",
+            y_title="결제금액"
         )
         st.plotly_chart(fig_cluster_box, use_container_width=True)
 
@@ -847,61 +996,66 @@ elif page == "🎯 클러스터링":
 # ------------------------------------------------------------------
 elif page == "📈 마케팅 분석":
     st.title("📈 마케팅 유입 및 클릭 분석")
+    agg = page_aggregates("marketing")
+    df_event, df_page = FRAMES["data_eventstats"], FRAMES["data_pagestats"]
+    df_cluster_channel, df_prod_eff = FRAMES["analysis_cluster_channel"], FRAMES["analysis_product_efficiency"]
     
     # 상단 지표
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("총 PV (조회수)", f"{df_event['PV'].sum():,.0f}")
+        st.metric("총 PV (조회수)", f"{agg['total_pv']:,.0f}")
     with col2:
-        st.metric("평균 DAU", f"{df_event['DAU 전체(회원)'].mean():,.1f}명")
+        st.metric("평균 DAU", f"{agg['avg_dau']:,.1f}명")
     with col3:
-        st.metric("평균 재방문율", f"{df_event['재방문율(월)'].mean():.1f}%")
+        st.metric("평균 재방문율", f"{agg['avg_revisit']:.1f}%")
     with col4:
         st.metric("최고 조회 페이지", df_page.iloc[0]['페이지제목'])
 
     st.divider()
 
     # 유입 추이 차트
-    st.subheader("📅 일별 방문자 및 페이지뷰 추이")
-    fig_visit = go.Figure()
-    fig_visit.add_trace(go.Scatter(x=df_event['일자'], y=df_event['DAU 전체(회원)'], name="DAU(회원)", line=dict(color="#1f77b4")))
-    fig_visit.add_trace(go.Scatter(x=df_event['일자'], y=df_event['PV'], name="PV (페이지뷰)", line=dict(color="#ff7f0e"), yaxis="y2"))
-    
-    fig_visit.update_layout(
-        title="방문자(DAU) 및 조회수(PV) 추이",
-        yaxis=dict(title="방문자 수"),
-        yaxis2=dict(title="페이지뷰(PV)", overlaying="y", side="right"),
-        hovermode="x unified",
-        height=450
-    )
-    st.plotly_chart(fig_visit, use_container_width=True)
+    subheader("📅 일별 방문자 및 페이지뷰 추이")
+    def build_visit():
+        fig_visit = go.Figure()
+        fig_visit.add_trace(go.Scatter(x=df_event['일자'], y=df_event['DAU 전체(회원)'], name="DAU(회원)", line=dict(color="#1f77b4")))
+        fig_visit.add_trace(go.Scatter(x=df_event['일자'], y=df_event['PV'], name="PV (페이지뷰)", line=dict(color="#ff7f0e"), yaxis="y2"))
+
+        fig_visit.update_layout(
+            title="방문자(DAU) 및 조회수(PV) 추이",
+            yaxis=dict(title="방문자 수"),
+            yaxis2=dict(title="페이지뷰(PV)", overlaying="y", side="right"),
+            hovermode="x unified",
+            height=450
+        )
+        return fig_visit
+
+    st.plotly_chart(cached_figure("marketing", "fig_visit", build_visit), use_container_width=True)
 
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("🔝 인기 페이지 (조회수 기준)")
-        fig_top_pages = px.bar(
-            df_page.head(10),
-            x="조회수",
-            y="페이지제목",
-            orientation="h",
-            title="상위 10개 인기 페이지",
-            color="조회수",
-            color_continuous_scale="Viridis"
-        )
-        fig_top_pages.update_layout(yaxis={'categoryorder':'total ascending'})
-        st.plotly_chart(fig_top_pages, use_container_width=True)
+        def build_top_pages():
+            fig_top_pages = px.bar(
+                df_page.head(10),
+                x="조회수",
+                y="페이지제목",
+                orientation="h",
+                title="상위 10개 인기 페이지",
+                color="조회수",
+                color_continuous_scale="Viridis"
+            )
+            fig_top_pages.update_layout(yaxis={'categoryorder':'total ascending'})
+            return fig_top_pages
+
+        st.plotly_chart(cached_figure("marketing", "fig_top_pages", build_top_pages), use_container_width=True)
 
     with col2:
         st.subheader("🎯 상품별 클릭 분석")
         # 최근 날짜 기준 상품별 클릭 합계
-        df_click_agg = df_click.groupby("상품명_정제").agg({
-            "조회수": "sum",
-            "클릭수": "sum"
-        }).reset_index()
-        df_click_agg["CTR(%)"] = (df_click_agg["클릭수"] / df_click_agg["조회수"] * 100).fillna(0)
+        df_click_agg = agg["df_click_agg"]
         
-        fig_ctr = px.scatter(
+        fig_ctr = cached_figure("marketing", "fig_ctr", lambda: px.scatter(
             df_click_agg,
             x="조회수",
             y="클릭수",
@@ -910,46 +1064,49 @@ elif page == "📈 마케팅 분석":
             title="상품별 조회수 대비 클릭수 (원 크기: CTR)",
             color="CTR(%)",
             color_continuous_scale="Plasma"
-        )
+        ))
         st.plotly_chart(fig_ctr, use_container_width=True)
 
     st.divider()
     
     # 전환 분석 (판매 데이터와 결합)
-    st.subheader("🔄 마케팅 유입과 매출의 상관관계")
-    
-    # 일별 매출과 일별 PV 결합
-    daily_sales = df_preprocessed.groupby(df_preprocessed["주문일"].dt.date)["결제금액(상품별)"].sum().reset_index()
-    daily_sales.columns = ["날짜", "매출액"]
-    daily_sales["날짜"] = pd.to_datetime(daily_sales["날짜"])
-    
-    df_marketing_sales = pd.merge(daily_sales, df_event[["일자", "PV", "DAU 전체(회원)"]], left_on="날짜", right_on="일자", how="inner")
-    
-    fig_corr = px.scatter(
-        df_marketing_sales,
-        x="PV",
-        y="매출액",
-        trendline="ols",
-        title="페이지뷰(PV)와 매출액의 상관관계",
-        labels={"PV": "페이지뷰", "매출액": "총 매출액 (원)"},
-        hover_data=["날짜"]
-    )
-    st.plotly_chart(fig_corr, use_container_width=True)
+    subheader("🔄 마케팅 유입과 매출의 상관관계")
+    
+    # 일별 매출과 일별 PV 결합 (OLS 추세선은 사전 집계에서 계산됨)
+    df_marketing_sales = agg["df_marketing_sales"]
+    
+    def build_corr():
+        fig_corr = px.scatter(
+            df_marketing_sales,
+            x="PV",
+            y="매출액",
+            title="페이지뷰(PV)와 매출액의 상관관계",
+            labels={"PV": "페이지뷰", "매출액": "총 매출액 (원)"},
+            hover_data=["날짜"]
+        )
+        if agg["trendline"] is not None:
+            fig_corr.add_trace(go.Scatter(
+                x=agg["trendline"]["PV"], y=agg["trendline"]["매출액"], mode="lines",
+                name=f"OLS 추세선 (R²={agg['r_squared']:.3f})", showlegend=False
+            ))
+        return fig_corr
+
+    st.plotly_chart(cached_figure("marketing", "fig_corr", build_corr), use_container_width=True)
     
     if not df_marketing_sales.empty:
-        correlation = df_marketing_sales["PV"].corr(df_marketing_sales["매출액"])
+        correlation = agg["correlation"]
         st.info(f"💡 분석 결과: 페이지뷰와 매출액의 상관계수는 **{correlation:.2f}**입니다. " + 
                 ("강한 양의 상관관계가 있습니다." if correlation > 0.7 else "어느 정도 연관성이 있습니다." if correlation > 0.4 else "상관관계가 낮습니다."))
 
     st.divider()
 
     # 심화 분석 섹션
-    st.subheader("💡 비즈니스 고도화 분석")
+    subheader("💡 비즈니스 고도화 분석")
     col3, col4 = st.columns(2)
     
     with col3:
         st.write("**🎯 클러스터별 유입 채널 분포 (Heatmap)**")
-        fig_heat = px.imshow(
+        fig_heat = cached_figure("marketing", "fig_heat", lambda: px.imshow(
             df_cluster_channel,
             labels=dict(x="유입 채널", y="클러스터", color="비중 (%)"),
             x=df_cluster_channel.columns,
@@ -957,13 +1114,13 @@ elif page == "📈 마케팅 분석":
             text_auto=".1f",
             aspect="auto",
             color_continuous_scale="YlGnBu"
-        )
+        ))
         st.plotly_chart(fig_heat, use_container_width=True)
         st.caption("어떤 채널이 특정 구매 그룹(클러스터)을 더 많이 유입시키는지 파악할 수 있습니다.")
 
     with col4:
         st.write("**💰 상품별 마케팅 효율 매트릭스**")
-        fig_bubble = px.scatter(
+        fig_bubble = cached_figure("marketing", "fig_bubble", lambda: px.scatter(
             df_prod_eff,
             x="CTR",
             y="RPC",
@@ -973,7 +1130,7 @@ elif page == "📈 마케팅 분석":
             labels={"CTR": "클릭률 (%)", "RPC": "클릭당 매출 (RPC)", "RPV": "조회당 매출 (RPV)"},
             title="CTR vs RPC (원 크기: 조회수, 색상: RPV)",
             color_continuous_scale="RdYlGn"
-        )
+        ))
         st.plotly_chart(fig_bubble, use_container_width=True)
         st.caption("우측 상단 상품: 클릭률도 높고 실제 매출 기여도도 높은 고효율 상품군")
 
@@ -983,19 +1140,20 @@ elif page == "📈 마케팅 분석":
 elif page == "💎 속성 분석":
     st.title("💎 상품 속성별 성과 분석")
     st.write("상품명에서 추출한 등급, 중량, 세트여부 등의 속성이 매출 및 마케팅 효율에 미치는 영향을 분석합니다.")
+    agg = page_aggregates("attributes")
     
     col_attr1, col_attr2 = st.columns(2)
     
     with col_attr1:
         st.subheader("📦 등급/유형별 매출 비중")
-        df_grade = df_preprocessed.groupby('등급')['결제금액(상품별)'].sum().reset_index()
+        df_grade = agg["df_grade"]
         fig_grade = px.pie(df_grade, values='결제금액(상품별)', names='등급', hole=0.4,
                            color_discrete_sequence=px.colors.qualitative.Pastel)
         st.plotly_chart(fig_grade, use_container_width=True)
         
     with col_attr2:
         st.subheader("⚖️ 중량별 판매 수량")
-        df_weight = df_preprocessed.groupby('중량')['주문수량'].sum().reset_index()
+        df_weight = agg["df_weight"]
         fig_weight = px.bar(df_weight, x='중량', y='주문수량', color='중량',
                              color_discrete_sequence=px.colors.qualitative.Safe)
         st.plotly_chart(fig_weight, use_container_width=True)
@@ -1006,19 +1164,14 @@ elif page == "💎 속성 분석":
     
     with col_attr3:
         st.subheader("🎁 세트 상품 vs 단품 성과")
-        df_set = df_preprocessed.groupby('세트여부')['결제금액(상품별)'].mean().reset_index()
-        df_set['세트여부'] = df_set['세트여부'].map({1: '세트/구성상품', 0: '단품'})
+        df_set = agg["df_set"]
         fig_set = px.bar(df_set, x='세트여부', y='결제금액(상품별)', text_auto='.0s',
                          title="평균 주문 금액 비교", color='세트여부')
         st.plotly_chart(fig_set, use_container_width=True)
         
     with col_attr4:
         st.subheader("📣 이벤트 상품 성과")
-        df_evt = df_preprocessed.groupby('이벤트여부').agg({
-            '결제금액(상품별)': 'sum',
-            '주문번호': 'count'
-        }).reset_index()
-        df_evt['이벤트여부'] = df_evt['이벤트여부'].map({1: '이벤트 포함', 0: '일반'})
+        df_evt = agg["df_evt"]
         fig_evt = px.bar(df_evt, x='이벤트여부', y='결제금액(상품별)', color='이벤트여부',
                          title="총 매출 기여도")
         st.plotly_chart(fig_evt, use_container_width=True)
@@ -1032,41 +1185,43 @@ elif page == "🔍 상세 분석":
     # 사이드바 필터
     st.sidebar.subheader("🔧 필터 설정")
     
-    # 날짜 범위 필터
-    min_date = df_preprocessed["주문일"].min().date()
-    max_date = df_preprocessed["주문일"].max().date()
+    # 날짜 범위 필터 (첫/마지막 월 파티션만 읽어 범위를 정함)
+    min_ts, max_ts = ORDER_STORE.date_bounds(order_partition)
+    if min_ts is None:
+        st.warning("주문일이 있는 주문 데이터가 없습니다. `python preprocess.py`로 주문 로그를 다시 만들어 주세요.")
+        PROFILER.finish(RUN)
+        st.stop()
+    min_date, max_date = min_ts.date(), max_ts.date()
     date_range = st.sidebar.date_input(
         "날짜 범위",
         value=(min_date, max_date),
         min_value=min_date,
         max_value=max_date
     )
+    start_date, end_date = date_range if len(date_range) == 2 else (None, None)
+    
+    # 색인/큐브는 데이터 버전당 한 번만 만들고, 날짜 범위는 조회 시 잘라냅니다.
+    order_version = ORDER_STORE.version()
+    order_index = get_order_index(order_version)
     
     # 주문 경로 필터
-    channels = ["전체"] + df_preprocessed["주문경로"].unique().tolist()
+    channels = ["전체"] + order_index.categories["주문경로"]
     selected_channel = st.sidebar.selectbox("주문 경로", channels)
     
     # 결제 방법 필터
-    payments = ["전체"] + df_preprocessed["결제방법"].unique().tolist()
+    payments = ["전체"] + order_index.categories["결제방법"]
     selected_payment = st.sidebar.selectbox("결제 방법", payments)
     
-    # 필터 적용
-    df_filtered = df_preprocessed.copy()
-    
-    if len(date_range) == 2:
-        df_filtered = df_filtered[
-            (df_filtered["주문일"].dt.date >= date_range[0]) &
-            (df_filtered["주문일"].dt.date <= date_range[1])
-        ]
-    
-    if selected_channel != "전체":
-        df_filtered = df_filtered[df_filtered["주문경로"] == selected_channel]
-    
-    if selected_payment != "전체":
-        df_filtered = df_filtered[df_filtered["결제방법"] == selected_payment]
+    # 필터 적용 (날짜: 이진 탐색, 경로/결제: 비트맵 AND — 전체 복사 없음)
+    df_filtered = order_index.view(
+        start=start_date,
+        end=end_date,
+        주문경로=None if selected_channel == "전체" else selected_channel,
+        결제방법=None if selected_payment == "전체" else selected_payment,
+    )
     
     # 필터링된 데이터 요약
-    st.subheader("📊 필터링된 데이터 요약")
+    subheader("📊 필터링된 데이터 요약")
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
@@ -1081,25 +1236,19 @@ elif page == "🔍 상세 분석":
     st.divider()
     
     # 시계열 분석
-    st.subheader("📈 시계열 분석")
+    subheader("📈 시계열 분석")
     time_unit = st.radio("시간 단위", ["일별", "주별", "월별"], horizontal=True)
     
-    if time_unit == "일별":
-        time_series = df_filtered.groupby(df_filtered["주문일"].dt.date).agg({
-            "결제금액(상품별)": "sum",
-            "주문번호": "count"
-        }).reset_index()
-    elif time_unit == "주별":
-        time_series = df_filtered.groupby(df_filtered["주문일"].dt.to_period("W")).agg({
-            "결제금액(상품별)": "sum",
-            "주문번호": "count"
-        }).reset_index()
-        time_series["주문일"] = time_series["주문일"].astype(str)
-    else:  # 월별
-        time_series = df_filtered.groupby(df_filtered["주문일"].dt.to_period("M")).agg({
-            "결제금액(상품별)": "sum",
-            "주문번호": "count"
-        }).reset_index()
+    # 필터 조건으로 매출 큐브를 잘라 재집계 (원본 주문 로그를 다시 그룹핑하지 않음)
+    cube_filtered = rollup.slice_cube(
+        RUN.call("매출 큐브", get_sales_cube, order_version, order_index.frame, kind="파생"),
+        start=start_date,
+        end=end_date,
+        주문경로=None if selected_channel == "전체" else selected_channel,
+        결제방법=None if selected_payment == "전체" else selected_payment,
+    )
+    time_series = rollup.rollup(cube_filtered, freq={"일별": "D", "주별": "W", "월별": "M"}[time_unit])
+    if time_unit != "일별":
         time_series["주문일"] = time_series["주문일"].astype(str)
     
     fig_timeseries = go.Figure()
@@ -1138,7 +1287,7 @@ elif page == "🔍 상세 분석":
     
     with col2:
         st.subheader("💳 결제 방법별 매출")
-        payment_revenue = df_filtered.groupby("결제방법")["결제금액(상품별)"].sum()
+        payment_revenue = rollup.totals(cube_filtered, "결제방법", "결제금액(상품별)")
         fig_payment_revenue = px.pie(
             values=payment_revenue.values,
             names=payment_revenue.index,
@@ -1147,7 +1296,7 @@ elif page == "🔍 상세 분석":
         st.plotly_chart(fig_payment_revenue, use_container_width=True)
     
     # 공급가 vs 결제금액 산점도
-    st.subheader("💰 공급가 vs 결제금액")
+    subheader("💰 공급가 vs 결제금액")
     fig_price_scatter = px.scatter(
         df_filtered.sample(min(1000, len(df_filtered))),  # 샘플링으로 성능 개선
         x="공급가",
@@ -1169,3 +1318,44 @@ st.sidebar.info("""
 - 클러스터: 4개
 - 데이터 기간: 2025년 9월
 """)
+
+# ------------------------------------------------------------------
+# 실행 계측 기록 + 관리자 패널 (?admin=1 또는 ?profile=1)
+# ------------------------------------------------------------------
+run_record = PROFILER.finish(RUN, reloaded=REGISTRY.reloaded())
+if ADMIN_MODE or RUN.profiled:
+    with st.sidebar.expander("🛠️ 실행 프로파일 (관리자)", expanded=True):
+        st.caption(f"이번 실행: {run_record['total_ms']:,.1f} ms (구간 시간은 하위 작업 포함)")
+        st.dataframe(RUN.frame().round(1), hide_index=True, use_container_width=True)
+
+        # 캐시 적중률: 데이터셋은 이번 실행, 집계/차트는 프로세스 누적
+        used = [name for name in FRAMES.loaded() if name in data_registry.DATASETS]
+        reread = set(REGISTRY.reloaded()) & set(used)
+        cache_rows = [("데이터셋", "이번 실행", len(used) - len(reread), len(reread))]
+        cache_rows += [("집계", aggregates.PAGES[page_id][0], hits, misses)
+                       for page_id, (hits, misses) in AGG_CACHE.stats().items()]
+        cache_rows += [("차트", FIGURE_PAGE_LABELS.get(page_id, page_id), hits, misses)
+                       for page_id, (hits, misses) in FIG_CACHE.stats().items()]
+        df_cache = pd.DataFrame(cache_rows, columns=["캐시", "대상", "적중", "미스"])
+        df_cache["적중률(%)"] = (df_cache["적중"] / (df_cache["적중"] + df_cache["미스"]).replace(0, np.nan) * 100).round(1)
+        st.dataframe(df_cache, hide_index=True, use_container_width=True)
+        shared_files = SHARED.files()
+        if shared_files:
+            st.caption(f"🔗 워커 공유 데이터셋: {len(shared_files)}개 파일, "
+                       f"{sum(shared_files.values()) / 2**20:,.1f} MB (memory-map)")
+
+        df_history = profiling.summarize(profiling.sections_frame(PROFILER.history(page)))
+        if not df_history.empty:
+            st.caption("최근 실행 구간 통계 (이 페이지)")
+            st.dataframe(df_history.drop(columns="page").round(1), hide_index=True, use_container_width=True)
+
+        if RUN.profiled:
+            st.download_button(
+                "📥 cProfile 결과 다운로드 (.prof)",
+                data=RUN.profile_bytes(),
+                file_name=f"profile_{RUN.started_at.strftime('%Y%m%d_%H%M%S')}.prof",
+                mime="application/octet-stream",
+            )
+            st.code(RUN.profile_text(), language=None)
+        else:
+            st.caption("URL에 `?profile=1`을 붙이면 cProfile 결과를 받을 수 있습니다.")
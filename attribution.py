@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+attribution.py
+주문 로그를 청크 단위로 스트리밍하여 채널(주문경로)별 매출/주문 기여도와
+ROAS, CPA를 계산하고 analysis_attribution.csv 를 생성하는 엔진
+
+- 주문 로그는 한 번만 순차로 읽으며 메모리에는 채널별 누적값만 유지합니다.
+- 기여 모델: last_touch(기본, 주문경로에 100% 귀속) / time_decay(최근 주문일수록 가중)
+- 매출액/주문수/ROAS/CPA 는 모델과 무관하게 실제 값입니다. time_decay 는 가중 기여 몫을
+  가중매출액/가중주문수 컬럼에 따로 씁니다 (합계는 실제 매출액/주문수 합계와 같음).
+- 광고비 테이블은 교체 가능한 공급자(AdSpend)로 결합합니다.
+
+사용법:
+    python attribution.py                                  # last-touch, 기본 예산 배분
+    python attribution.py --model time_decay --half-life 14
+    python attribution.py --ad-spend data/ad_spend.csv     # 채널,광고비 CSV 사용
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_store
+
+SOURCE = "data_clustered"
+OUTPUT = "analysis_attribution"
+CHUNK_SIZE = 200_000
+DEFAULT_BUDGET = 401_000  # 채널별 광고비 자료가 없을 때 주문 비중으로 배분할 총 광고비
+MODELS = ("last_touch", "time_decay")
+
+
+# ------------------------------------------------------------------
+# 채널별 집계 (단일 패스 스트리밍)
+# ------------------------------------------------------------------
+def iter_orders(path, chunksize=CHUNK_SIZE):
+    columns = ["주문일", "주문경로", "결제금액(상품별)"]
+    for chunk in pd.read_csv(path, encoding=data_store.CSV_ENCODING, usecols=columns, chunksize=chunksize):
+        chunk["주문일"] = pd.to_datetime(chunk["주문일"], errors="coerce")
+        yield chunk
+
+
+def aggregate_channels(chunks, model="last_touch", half_life_days=7.0):
+    """
+    청크 이터레이터를 한 번 순회하며 채널별 매출액/주문수(실제 값)를 누적합니다.
+
+    time_decay 모델은 주문마다 0.5 ** (경과일 / 반감기) 가중치를 적용한 가중합도 누적해,
+    채널별 가중 비중으로 전체 매출액/주문수를 나눈 가중매출액/가중주문수를 추가합니다 (반감기와 무관하게 합계 보존).
+    기준일(최신 주문일)은 스트림이 끝나야 알 수 있으므로, 지금까지 본 최신 주문일을 기준으로
+    2 ** ((t - 기준일) / 반감기) (항상 1 이하) 가중합을 누적하고, 기준일이 늦춰지면 누적값을 그만큼 줄입니다.
+    따라서 기간/반감기와 무관하게 overflow 가 없습니다. 주문일이 없는 행은 가중치를 정할 수 없어 가중합에서만
+    제외하며, 제외한 행 수는 result.attrs["주문일 누락"] 에 남깁니다.
+    """
+    if model not in MODELS:
+        raise ValueError(f"지원하지 않는 기여 모델입니다: {model}")
+    if model == "time_decay" and half_life_days <= 0:
+        raise ValueError("반감기는 0보다 커야 합니다.")
+
+    revenue, orders = {}, {}
+    weighted_revenue, weighted_orders = {}, {}
+    latest, dropped = None, 0
+    for chunk in chunks:
+        chunk = chunk.dropna(subset=["주문경로"])
+        if chunk.empty:
+            continue
+        channels = chunk["주문경로"].astype(str).to_numpy()
+        amounts = chunk["결제금액(상품별)"].to_numpy(dtype=float)
+        _accumulate(revenue, orders, channels, amounts, np.ones(len(chunk)))
+        if model == "last_touch":
+            continue
+
+        valid = chunk["주문일"].notna().to_numpy()
+        dropped += int((~valid).sum())
+        if not valid.any():
+            continue
+        dates = chunk["주문일"][valid]
+        if latest is None or dates.max() > latest:
+            if latest is not None:
+                # 기준일을 늦춘 만큼 기존 가중합 감쇠 (아주 오래된 값은 0으로 underflow)
+                shift = np.exp2(-((dates.max() - latest).total_seconds() / 86400) / half_life_days)
+                weighted_revenue = {channel: value * shift for channel, value in weighted_revenue.items()}
+                weighted_orders = {channel: value * shift for channel, value in weighted_orders.items()}
+            latest = dates.max()
+        days = ((dates - latest).dt.total_seconds() / 86400).to_numpy()
+        _accumulate(weighted_revenue, weighted_orders, channels[valid], amounts[valid], np.exp2(days / half_life_days))
+
+    result = pd.DataFrame({"매출액": pd.Series(revenue, dtype=float), "주문수": pd.Series(orders, dtype=float)})
+    result = result.round().astype("int64")
+    if model == "time_decay":
+        # 가중 비중으로 실제 합계를 나눠 가짐 (가중합 자체는 반감기에 따라 규모가 달라지므로 비중만 사용)
+        for column, weighted in (("가중매출액", weighted_revenue), ("가중주문수", weighted_orders)):
+            share = pd.Series(weighted, dtype=float).reindex(result.index, fill_value=0.0)
+            share = share / share.sum() if share.sum() > 0 else share
+            result[column] = share * result[column[2:]].sum()
+    result.index.name = "채널"
+    result = result.sort_index()
+    result.attrs["주문일 누락"] = dropped
+    return result
+
+
+def _accumulate(revenue, orders, channels, amounts, weight):
+    """채널별 (금액 x 가중치) 합과 가중치 합을 누적합니다."""
+    grouped = pd.DataFrame({"주문경로": channels, "매출액": amounts * weight, "주문수": weight}).groupby(
+        "주문경로", sort=False).sum()
+    for channel, row in grouped.iterrows():
+        revenue[channel] = revenue.get(channel, 0.0) + row["매출액"]
+        orders[channel] = orders.get(channel, 0.0) + row["주문수"]
+
+
+# ------------------------------------------------------------------
+# 광고비 공급자
+# ------------------------------------------------------------------
+class AdSpend:
+    """채널별 집계를 받아 채널별 광고비 Series를 돌려주는 공급자 인터페이스."""
+
+    def __call__(self, channels):
+        raise NotImplementedError
+
+
+class BudgetByOrders(AdSpend):
+    """총 광고비를 채널별 주문 비중으로 배분합니다 (채널 광고비 자료가 없을 때의 추정치)."""
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+
+    def __call__(self, channels):
+        return self.budget * channels["주문수"] / channels["주문수"].sum()
+
+
+class AdSpendTable(AdSpend):
+    """채널,광고비 두 컬럼의 CSV(또는 DataFrame)에서 실제 광고비를 읽습니다."""
+
+    def __init__(self, source):
+        if isinstance(source, (str, Path)):
+            source = pd.read_csv(source, encoding=data_store.CSV_ENCODING)
+        self.table = source.groupby("채널")["광고비"].sum()
+
+    def __call__(self, channels):
+        return self.table.reindex(channels.index).fillna(0)
+
+
+def attribute(channels, ad_spend=None):
+    """채널별 집계에 광고비를 결합해 ROAS(%), CPA를 계산합니다 (실제 매출액/주문수 기준)."""
+    ad_spend = ad_spend or BudgetByOrders()
+    out = channels.copy()
+    out["예상광고비"] = ad_spend(channels)
+    spend = out["예상광고비"].replace(0, np.nan)
+    out["ROAS"] = (out["매출액"] / spend * 100).fillna(0)
+    out["CPA"] = (out["예상광고비"] / out["주문수"].replace(0, np.nan)).fillna(0)
+    return out.reset_index()
+
+
+def run(model="last_touch", half_life_days=7.0, ad_spend=None, source=SOURCE,
+        chunksize=CHUNK_SIZE, data_dir=data_store.DATA_DIR):
+    channels = aggregate_channels(
+        iter_orders(data_store.csv_path(source, data_dir), chunksize),
+        model=model, half_life_days=half_life_days,
+    )
+    result = attribute(channels, ad_spend)
+    result.attrs["주문일 누락"] = channels.attrs["주문일 누락"]
+    result.to_csv(data_store.csv_path(OUTPUT, data_dir), index=False, encoding=data_store.CSV_ENCODING)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="채널별 ROAS/CPA 기여도 분석 결과를 analysis_attribution.csv 로 저장합니다.")
+    parser.add_argument("--model", choices=MODELS, default="last_touch")
+    parser.add_argument("--half-life", type=float, default=7.0, help="time_decay 반감기 (일)")
+    parser.add_argument("--ad-spend", help="채널,광고비 컬럼을 가진 광고비 CSV 경로")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="광고비 CSV가 없을 때 배분할 총 광고비")
+    parser.add_argument("--source", default=SOURCE, help="주문 로그 데이터셋 이름 (data/<이름>.csv)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    spend = AdSpendTable(args.ad_spend) if args.ad_spend else BudgetByOrders(args.budget)
+    start = time.perf_counter()
+    result = run(args.model, args.half_life, spend, args.source, args.chunksize)
+    print(result.to_string(index=False))
+    if result.attrs.get("주문일 누락"):
+        print(f"  ⚠️ 주문일이 없는 {result.attrs['주문일 누락']:,}행은 time_decay 가중치를 정할 수 없어 가중 집계에서 제외했습니다.")
+    print(f"✅ {len(result)}개 채널 -> {OUTPUT}.csv ({time.perf_counter() - start:.2f}s)")
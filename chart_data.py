@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+chart_data.py
+대용량 차트용 데이터 축약 계층
+
+원본 행을 그대로 브라우저로 보내는 대신 서버에서 미리 요약한 작은 테이블만 전달합니다.
+    - 히스토그램: 구간별 건수 (bin_counts)
+    - 박스플롯: 그룹별 사분위수/울타리 값 (box_stats)
+    - 산점도: 2차원 격자 구간별 건수 (bin_2d), 확대 범위가 좁으면 원본 점으로 전환 (points_in_range)
+
+요약 테이블 크기는 주문 건수가 아니라 구간/그룹 수에만 비례합니다.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import sample_colorscale
+
+HIST_BINS = 50
+GRID_SIZE = 60
+RAW_POINT_LIMIT = 5_000  # 확대 범위 안의 점이 이보다 적으면 원본 점을 그대로 그림
+
+
+# ------------------------------------------------------------------
+# 요약 테이블
+# ------------------------------------------------------------------
+def bin_counts(values, nbins=HIST_BINS, value_range=None):
+    """1차원 히스토그램 구간별 건수 (left, right, center, count)."""
+    values = pd.Series(values).dropna().to_numpy(dtype=float)
+    if values.size == 0:
+        return pd.DataFrame(columns=["left", "right", "center", "count"])
+    counts, edges = np.histogram(values, bins=nbins, range=value_range)
+    return pd.DataFrame({
+        "left": edges[:-1],
+        "right": edges[1:],
+        "center": (edges[:-1] + edges[1:]) / 2,
+        "count": counts,
+    })
+
+
+def box_stats(df, y, by=None):
+    """
+    그룹별 박스플롯 통계 (q1, median, q3, lowerfence, upperfence, mean, n).
+    울타리는 Tukey 기준(1.5 IQR) 안에 있는 가장 바깥 관측값입니다.
+    """
+    data = df[[y]] if by is None else df[[by, y]]
+    data = data.dropna(subset=[y])
+    keys = np.zeros(len(data), dtype=np.int8) if by is None else data[by].to_numpy()
+    grouped = data[y].groupby(keys, sort=True)
+
+    stats = pd.DataFrame({
+        "q1": grouped.quantile(0.25),
+        "median": grouped.median(),
+        "q3": grouped.quantile(0.75),
+        "mean": grouped.mean(),
+        "n": grouped.size(),
+    })
+    iqr = stats["q3"] - stats["q1"]
+    low_limit = pd.Series(keys, index=data.index).map(stats["q1"] - 1.5 * iqr)
+    high_limit = pd.Series(keys, index=data.index).map(stats["q3"] + 1.5 * iqr)
+    stats["lowerfence"] = data[y].where(data[y] >= low_limit).groupby(keys).min()
+    stats["upperfence"] = data[y].where(data[y] <= high_limit).groupby(keys).max()
+    stats.index.name = by
+    return stats
+
+
+def bin_2d(df, x, y, by=None, grid=GRID_SIZE, x_range=None, y_range=None):
+    """
+    산점도용 2차원 격자 집계. 비어 있지 않은 칸만 (그룹, x중심, y중심, count) 로 반환합니다.
+    """
+    data = df[[x, y]] if by is None else df[[x, y, by]]
+    data = data.dropna(subset=[x, y])
+    xs = data[x].to_numpy(dtype=float)
+    ys = data[y].to_numpy(dtype=float)
+    x_lo, x_hi = x_range or (xs.min(initial=0), xs.max(initial=0))
+    y_lo, y_hi = y_range or (ys.min(initial=0), ys.max(initial=0))
+    inside = (xs >= x_lo) & (xs <= x_hi) & (ys >= y_lo) & (ys <= y_hi)
+
+    x_step = (x_hi - x_lo) / grid or 1.0
+    y_step = (y_hi - y_lo) / grid or 1.0
+    ix = np.minimum(((xs[inside] - x_lo) // x_step).astype(np.int64), grid - 1)
+    iy = np.minimum(((ys[inside] - y_lo) // y_step).astype(np.int64), grid - 1)
+
+    cells = pd.DataFrame({"ix": ix, "iy": iy})
+    if by is not None:
+        cells.insert(0, by, data[by].to_numpy()[inside])
+    binned = cells.groupby(list(cells.columns), sort=True).size().rename("count").reset_index()
+    binned[x] = x_lo + (binned.pop("ix") + 0.5) * x_step
+    binned[y] = y_lo + (binned.pop("iy") + 0.5) * y_step
+    return binned
+
+
+def points_in_range(df, x, y, x_range, y_range, limit=RAW_POINT_LIMIT):
+    """확대 범위 안의 원본 행. 행 수가 limit 를 넘으면 None (격자 집계를 써야 함)."""
+    xs, ys = df[x].to_numpy(), df[y].to_numpy()
+    mask = (xs >= x_range[0]) & (xs <= x_range[1]) & (ys >= y_range[0]) & (ys <= y_range[1])
+    if np.count_nonzero(mask) > limit:
+        return None
+    return df.loc[mask]
+
+
+# ------------------------------------------------------------------
+# 축약 테이블 -> plotly Figure
+# ------------------------------------------------------------------
+def _group_colors(groups, colorscale="Viridis"):
+    groups = list(groups)
+    if len(groups) <= 1:
+        return dict(zip(groups, sample_colorscale(colorscale, [0.5])))
+    return dict(zip(groups, sample_colorscale(colorscale, np.linspace(0, 1, len(groups)).tolist())))
+
+
+def histogram_figure(bins, title, x_title, y_title="count"):
+    fig = go.Figure(go.Bar(
+        x=bins["center"], y=bins["count"], width=bins["right"] - bins["left"],
+        customdata=bins[["left", "right"]].to_numpy(),
+        hovertemplate="%{customdata[0]:,.0f} ~ %{customdata[1]:,.0f}<br>%{y:,}건<extra></extra>",
+    ))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title, bargap=0)
+    return fig
+
+
+def box_figure(stats, title, x_title=None, y_title=None):
+    names = ["" if name is None else str(name) for name in stats.index]
+    fig = go.Figure(go.Box(
+        x=names if stats.index.name else None,
+        q1=stats["q1"], median=stats["median"], q3=stats["q3"], mean=stats["mean"],
+        lowerfence=stats["lowerfence"], upperfence=stats["upperfence"],
+        boxpoints=False, name=y_title or "",
+    ))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title, showlegend=False)
+    return fig
+
+
+def binned_scatter_figure(binned, x, y, by, title, labels=None):
+    """격자 집계를 그룹별 버블(크기 = 건수)로 그립니다."""
+    labels = labels or {}
+    fig = go.Figure()
+    max_count = max(int(binned["count"].max()), 1) if len(binned) else 1
+    colors = _group_colors(sorted(binned[by].unique()))
+    for group, cells in binned.groupby(by, sort=True):
+        fig.add_trace(go.Scatter(
+            x=cells[x], y=cells[y], mode="markers", name=str(group),
+            marker=dict(size=4 + 20 * np.sqrt(cells["count"] / max_count), color=colors[group], opacity=0.7),
+            customdata=cells["count"],
+            hovertemplate=f"{labels.get(by, by)} {group}<br>%{{x:,.1f}}, %{{y:,.0f}}<br>%{{customdata:,}}건<extra></extra>",
+        ))
+    fig.update_layout(title=title, xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y),
+                      legend_title=labels.get(by, by))
+    return fig
+
+
+def raw_scatter_figure(points, x, y, by, title, labels=None):
+    labels = labels or {}
+    fig = go.Figure()
+    colors = _group_colors(sorted(points[by].unique()))
+    for group, rows in points.groupby(by, sort=True):
+        fig.add_trace(go.Scattergl(
+            x=rows[x], y=rows[y], mode="markers", name=str(group),
+            marker=dict(size=5, color=colors[group], opacity=0.7),
+        ))
+    fig.update_layout(title=title, xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y),
+                      legend_title=labels.get(by, by))
+    return fig
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+clustering.py
+미니배치(partial_fit) K-Means 기반 구매 패턴 클러스터링 파이프라인
+
+주문 로그를 청크 단위로 스트리밍하여 주문/고객 특성을 만들고
+StandardScaler / MiniBatchKMeans 를 partial_fit 으로 학습하므로
+주문이 수백만 건이어도 메모리 사용량은 청크 크기 + 고객 수에 비례합니다.
+
+한 번의 쓰기 패스에서 다음 세 파일을 함께 생성합니다.
+    data_clustered.csv            주문 원본 + cluster
+    analysis_cluster_channel.csv  클러스터별 유입 채널 비중(%)
+    analysis_order_interval.csv   클러스터별 평균 재구매 간격(일)
+
+저장된 모델로 새 주문을 재학습 없이 기존 클러스터에 배정할 수 있습니다.
+배정할 때 고객별 주문 이력을 모델에 누적하며, 이미 반영한 주문 행(주문번호+상품코드)은
+다시 세지 않으므로 같은 파일을 다시 배정해도 이력이 부풀지 않습니다.
+
+사용법:
+    python clustering.py fit                                   # 학습 + 세 파일 생성
+    python clustering.py fit --clusters 4 --epochs 3
+    python clustering.py assign new_orders.csv labeled.csv     # 저장된 모델로 배정만 수행
+"""
+
+import argparse
+import os
+import pickle
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+import data_store
+
+SOURCE = "data_clustered"
+MODEL_PATH = data_store.DATA_DIR / "models" / "cluster_model.pkl"
+CHUNK_SIZE = 100_000
+FEATURES = ["주문수량", "결제금액(상품별)", "할인사용액", "이전주문수"]
+
+
+def customer_ids(chunk):
+    return chunk["주문자명"].astype(str) + "_" + chunk["주문자연락처"].astype(str)
+
+
+def _to_number(series):
+    return pd.to_numeric(series, errors="coerce").fillna(0).to_numpy(dtype=float)
+
+
+def row_keys(chunk):
+    """주문 행 키(주문번호+상품코드)의 64비트 해시."""
+    keys = chunk["주문번호"].astype(str) + "|" + chunk["상품코드"].astype(str)
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+class ClusterModel:
+    """스케일러 + 미니배치 K-Means + 고객별 누적 주문 수 상태 (+ 반영한 주문 행 키)."""
+
+    def __init__(self, n_clusters=4, batch_size=4096, random_state=42):
+        self.n_clusters = n_clusters
+        self.scaler = StandardScaler()
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size,
+                                      random_state=random_state, n_init=3)
+        self.label_map = None   # K-Means 내부 라벨 -> 공개 라벨 (평균 결제금액 오름차순)
+        self.reset_history()
+
+    def reset_history(self):
+        self.history = {}       # 고객ID -> 지금까지 본 주문 행 수
+        self.seen = np.empty(0, dtype=np.uint64)  # 이력에 반영한 주문 행 키 해시 (정렬, 행당 8바이트)
+
+    def _unseen(self, keys):
+        """이력에 아직 반영하지 않은 행 (이전 청크/파일과 같은 청크 안의 중복 키 제외)."""
+        pos = np.minimum(np.searchsorted(self.seen, keys), max(len(self.seen) - 1, 0))
+        seen = self.seen[pos] == keys if len(self.seen) else np.zeros(len(keys), dtype=bool)
+        return ~seen & ~pd.Series(keys).duplicated().to_numpy()
+
+    # --------------------------------------------------------------
+    # 특성
+    # --------------------------------------------------------------
+    def features(self, chunk, update_history=True):
+        """주문 특성(수량, 금액, 쿠폰/포인트 사용액)과 고객 특성(이전 주문 수)을 로그 스케일로 만듭니다."""
+        ids = customer_ids(chunk)
+        prior = ids.map(self.history).fillna(0).to_numpy() + ids.groupby(ids, sort=False).cumcount().to_numpy()
+        if update_history:
+            keys = row_keys(chunk)
+            unseen = self._unseen(keys)
+            for cid, count in ids[unseen].value_counts(sort=False).items():
+                self.history[cid] = self.history.get(cid, 0) + int(count)
+            self.seen = np.union1d(self.seen, keys[unseen])
+
+        discount = _to_number(chunk["포인트 사용금액(통합)"]) + _to_number(chunk["쿠폰 사용금액(통합)"])
+        raw = np.column_stack([
+            _to_number(chunk["주문수량"]),
+            _to_number(chunk["결제금액(상품별)"]),
+            discount,
+            prior,
+        ])
+        return np.log1p(np.clip(raw, 0, None))
+
+    # --------------------------------------------------------------
+    # 학습
+    # --------------------------------------------------------------
+    def fit_stream(self, chunk_factory, epochs=1):
+        """
+        chunk_factory() 가 매번 새 청크 이터레이터를 돌려줘야 합니다.
+        1패스: 스케일러 partial_fit, 2패스 이후: K-Means partial_fit (epochs 회).
+        """
+        self.reset_history()
+        for chunk in chunk_factory():
+            self.scaler.partial_fit(self.features(chunk))
+
+        for _ in range(epochs):
+            self.reset_history()
+            for chunk in chunk_factory():
+                X = self.scaler.transform(self.features(chunk))
+                if len(X) >= self.n_clusters or hasattr(self.kmeans, "cluster_centers_"):
+                    self.kmeans.partial_fit(X)
+
+        # 라벨을 평균 결제금액(원 단위 중심값) 오름차순으로 고정해 재학습 간 의미를 유지
+        centers = self.scaler.inverse_transform(self.kmeans.cluster_centers_)
+        order = np.argsort(centers[:, FEATURES.index("결제금액(상품별)")])
+        self.label_map = np.empty(self.n_clusters, dtype=np.int64)
+        self.label_map[order] = np.arange(self.n_clusters)
+        self.reset_history()
+        return self
+
+    def assign(self, chunk, update_history=True):
+        """재학습 없이 주문을 기존 클러스터에 배정합니다."""
+        X = self.scaler.transform(self.features(chunk, update_history))
+        return self.label_map[self.kmeans.predict(X)]
+
+    # --------------------------------------------------------------
+    # 저장 / 로드
+    # --------------------------------------------------------------
+    def save(self, path=MODEL_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path=MODEL_PATH):
+        with open(path, "rb") as f:
+            model = pickle.load(f)
+        if not hasattr(model, "seen"):  # 행 키를 기록하기 전에 저장된 모델
+            model.seen = np.empty(0, dtype=np.uint64)
+        return model
+
+
+# ------------------------------------------------------------------
+# 스트리밍 입출력
+# ------------------------------------------------------------------
+def iter_chunks(path, chunksize=CHUNK_SIZE):
+    """원본 값을 그대로 다시 쓸 수 있도록 문자열로 읽습니다. 기존 cluster 컬럼은 제외합니다."""
+    reader = pd.read_csv(path, encoding=data_store.CSV_ENCODING, dtype=str,
+                         keep_default_na=False, chunksize=chunksize)
+    for chunk in reader:
+        yield chunk.drop(columns=["cluster"], errors="ignore")
+
+
+def label_and_write(model, chunks, output_path):
+    """
+    배정 결과를 output_path 에 쓰면서 채널 비중/재구매 간격 집계를 같은 패스에서 누적합니다.
+    반환: (cluster_channel 비중 테이블, order_interval 테이블)
+    """
+    channel_counts = {}
+    customer_codes = {}  # 고객ID -> 정수 코드
+    events = []          # 청크별 (고객 코드, 주문 시각, cluster) 압축 배열
+
+    tmp_path = Path(str(output_path) + ".tmp")
+    first = True
+    for chunk in chunks:
+        labels = model.assign(chunk)
+        chunk = chunk.assign(cluster=labels)
+        chunk.to_csv(tmp_path, mode="w" if first else "a", header=first, index=False,
+                     encoding=data_store.CSV_ENCODING if first else "utf-8")
+        first = False
+
+        for (cluster, channel), count in chunk.groupby(["cluster", "주문경로"]).size().items():
+            channel_counts[(cluster, channel)] = channel_counts.get((cluster, channel), 0) + count
+
+        codes = np.fromiter((customer_codes.setdefault(cid, len(customer_codes)) for cid in customer_ids(chunk)),
+                            dtype=np.int64, count=len(chunk))
+        dates = pd.to_datetime(chunk["주문일"], errors="coerce").to_numpy(dtype="datetime64[s]")
+        valid = ~np.isnat(dates)
+        events.append((codes[valid], dates[valid].astype(np.int64), labels[valid].astype(np.int8)))
+
+    os.replace(tmp_path, output_path)
+
+    counts = pd.Series(channel_counts).unstack(fill_value=0).reindex(range(model.n_clusters), fill_value=0)
+    counts.index.name = "cluster"
+    cluster_channel = counts.div(counts.sum(axis=1).replace(0, np.nan), axis=0).fillna(0) * 100
+    cluster_channel = cluster_channel[sorted(cluster_channel.columns)]
+
+    order_interval = _order_interval(events, model.n_clusters)
+    return cluster_channel, order_interval
+
+
+def _order_interval(events, n_clusters):
+    """
+    같은 고객의 시간순 직전 주문 대비 간격(일, 내림)을 해당 주문의 클러스터별로 평균냅니다.
+    행당 17바이트 배열만 유지하므로 원본 프레임 없이 입력 정렬 여부와 무관하게 계산됩니다.
+    """
+    avg_interval = np.full(n_clusters, np.nan)
+    if events:
+        codes, seconds, clusters = (np.concatenate(parts) for parts in zip(*events))
+        order = np.lexsort((seconds, codes))
+        codes, seconds, clusters = codes[order], seconds[order], clusters[order]
+        same = codes[1:] == codes[:-1]
+        days = (seconds[1:] - seconds[:-1])[same] // 86400
+        cluster_of = clusters[1:][same]
+        total = np.bincount(cluster_of, weights=days, minlength=n_clusters)
+        count = np.bincount(cluster_of, minlength=n_clusters)
+        np.divide(total, count, out=avg_interval, where=count > 0)
+    return pd.DataFrame({"cluster": range(n_clusters), "avg_order_interval": avg_interval})
+
+
+def fit(n_clusters=4, epochs=1, chunksize=CHUNK_SIZE, source=SOURCE, data_dir=data_store.DATA_DIR,
+        model_path=MODEL_PATH):
+    """모델을 학습하고 세 개의 클러스터 파생 CSV를 생성합니다."""
+    source_path = data_store.csv_path(source, data_dir)
+    model = ClusterModel(n_clusters=n_clusters).fit_stream(lambda: iter_chunks(source_path, chunksize), epochs)
+
+    cluster_channel, order_interval = label_and_write(
+        model, iter_chunks(source_path, chunksize), data_store.csv_path("data_clustered", data_dir))
+    cluster_channel.to_csv(data_store.csv_path("analysis_cluster_channel", data_dir), encoding=data_store.CSV_ENCODING)
+    order_interval.to_csv(data_store.csv_path("analysis_order_interval", data_dir), index=False,
+                          encoding=data_store.CSV_ENCODING)
+    # 이후 assign 이 이어서 쓸 수 있도록 전체 이력을 반영한 상태로 저장
+    model.save(model_path)
+    return model
+
+
+def assign_file(input_path, output_path, chunksize=CHUNK_SIZE, model_path=MODEL_PATH):
+    """저장된 모델로 새 주문 파일에 cluster 컬럼을 붙여 저장합니다 (재학습 없음)."""
+    model = ClusterModel.load(model_path)
+    first = True
+    rows = 0
+    for chunk in iter_chunks(input_path, chunksize):
+        chunk = chunk.assign(cluster=model.assign(chunk))
+        chunk.to_csv(output_path, mode="w" if first else "a", header=first, index=False,
+                     encoding=data_store.CSV_ENCODING if first else "utf-8")
+        first = False
+        rows += len(chunk)
+    model.save(model_path)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="미니배치 K-Means 구매 패턴 클러스터링")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_fit = sub.add_parser("fit", help="학습 후 data_clustered / cluster_channel / order_interval 생성")
+    p_fit.add_argument("--clusters", type=int, default=4)
+    p_fit.add_argument("--epochs", type=int, default=1)
+    p_fit.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    p_fit.add_argument("--source", default=SOURCE, help="주문 로그 데이터셋 이름 (data/<이름>.csv)")
+
+    p_assign = sub.add_parser("assign", help="저장된 모델로 새 주문을 기존 클러스터에 배정")
+    p_assign.add_argument("input")
+    p_assign.add_argument("output")
+    p_assign.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+
+    args = parser.parse_args()
+    start = time.perf_counter()
+    if args.command == "fit":
+        model = fit(args.clusters, args.epochs, args.chunksize, args.source)
+        print(f"✅ 클러스터 {model.n_clusters}개 학습 및 파생 파일 3종 생성 ({time.perf_counter() - start:.2f}s)")
+    else:
+        rows = assign_file(args.input, args.output, args.chunksize)
+        print(f"✅ 주문 {rows:,}건 배정 -> {args.output} ({time.perf_counter() - start:.2f}s)")
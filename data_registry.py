@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+data_registry.py
+데이터셋별 로더 레지스트리 및 파일 단위 캐시 무효화
+
+각 데이터셋은 (mtime, 크기, 내용 해시)로 만든 지문(fingerprint)을 캐시 키로 사용합니다.
+파일 하나가 바뀌면 그 파일만 다시 파싱되며, 이번 실행(rerun)에서 다시 읽힌
+데이터셋 목록을 조회할 수 있습니다.
+"""
+
+import hashlib
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+import data_store
+import product_attributes
+import schema
+
+HASH_CHUNK_SIZE = 1 << 20  # 1MB
+
+# 캐시 공유 프레임은 shared_view 로만 내보내므로 Copy-on-Write 가 필요합니다 (pandas 3.0 부터 기본 동작).
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def shared_view(value):
+    """
+    캐시에 공유된 DataFrame/Series 의 호출자용 뷰 (데이터 복사 없음).
+    Copy-on-Write 로 컬럼 추가, 값 변경, inplace 연산은 이 뷰에만 반영되고 공유 원본은 그대로입니다.
+    그 밖의 값은 그대로 반환합니다.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    return value
+
+
+def _stabilize_prod_eff(df):
+    # 수치 안정화 (CTR 0인 상품의 RPC inf 등)
+    if not df.empty:
+        df = df.replace([np.inf, -np.inf], 0).fillna(0)
+    if '공급가' not in df.columns:
+        df['공급가'] = 0
+    return df
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    name: str
+    required: bool = True
+    postprocess: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+    exclude: tuple = ()  # 대시보드에서 읽지 않을 컬럼 (PII 등)
+
+
+DATASETS = {
+    spec.name: spec for spec in [
+        # 속성 컬럼(등급/중량/세트여부/이벤트여부)이 없는 이전 전처리 결과는 상품명에서 추출해 채움
+        DatasetSpec("data_preprocessed", exclude=schema.DASHBOARD_EXCLUDE,
+                    postprocess=product_attributes.ensure_attributes),
+        DatasetSpec("data_clustered", exclude=schema.DASHBOARD_EXCLUDE),
+        DatasetSpec("data_eventstats"),
+        DatasetSpec("data_pagestats"),
+        DatasetSpec("data_sales_click"),
+        DatasetSpec("analysis_cluster_channel"),
+        DatasetSpec("analysis_product_efficiency", postprocess=_stabilize_prod_eff),
+        DatasetSpec("analysis_ltv", required=False),
+        DatasetSpec("analysis_order_interval", required=False),
+        DatasetSpec("analysis_attribution", required=False),
+        DatasetSpec("analysis_forecast", required=False),  # forecast_batch.py 가 Parquet 으로만 생성
+    ]
+}
+
+
+class DatasetRegistry:
+    """데이터셋 지문 계산, 로딩, 재로딩 기록을 담당합니다."""
+
+    def __init__(self, datasets=None, data_dir=data_store.DATA_DIR):
+        self.datasets = dict(datasets or DATASETS)
+        self.data_dir = Path(data_dir)
+        self._hash_memo = {}  # path -> ((mtime_ns, size), digest)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # --------------------------------------------------------------
+    # 지문 (캐시 키)
+    # --------------------------------------------------------------
+    def _content_hash(self, path, stat_key):
+        with self._lock:
+            memo = self._hash_memo.get(path)
+        if memo and memo[0] == stat_key:
+            return memo[1]
+
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self._hash_memo[path] = (stat_key, digest)
+        return digest
+
+    def fingerprint(self, name):
+        """
+        데이터셋 지문을 반환합니다. 파일이 없으면 None.
+        mtime/크기가 그대로면 저장된 해시를 재사용하고, 바뀌었을 때만 내용을 다시 해시합니다.
+        따라서 내용이 같은 파일을 덮어쓴 경우(touch)에는 키가 바뀌지 않습니다.
+        """
+        path = data_store.source_path(name, self.data_dir)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        digest = self._content_hash(path, (stat.st_mtime_ns, stat.st_size))
+        return f"{path.suffix.lstrip('.')}:{stat.st_size}:{digest}"
+
+    def version(self, *names):
+        """여러 데이터셋 지문을 합친 데이터 버전 키 (파생 테이블 캐시 키로 사용)."""
+        key = "|".join(f"{name}={self.fingerprint(name)}" for name in names)
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+    # --------------------------------------------------------------
+    # 로딩
+    # --------------------------------------------------------------
+    def missing_required(self, names=None):
+        """names(기본: 전체) 중 파일이 없는 필수 데이터셋 이름 목록."""
+        names = self.datasets if names is None else names
+        return [name for name in names
+                if self.datasets[name].required and not data_store.exists(name, self.data_dir)]
+
+    def read(self, name, spec=None):
+        """
+        데이터셋을 실제로 읽습니다 (캐시 미스일 때만 호출되어야 합니다).
+        spec 을 주면 등록되지 않은 이름(월 파티션 등)을 그 설정으로 읽습니다.
+        """
+        spec = spec or self.datasets[name]
+        if not data_store.exists(name, self.data_dir):
+            if spec.required:
+                raise FileNotFoundError(data_store.csv_path(name, self.data_dir))
+            df = pd.DataFrame()
+        else:
+            df = data_store.load_frame(name, self.data_dir, exclude=spec.exclude)
+        if spec.postprocess is not None:
+            df = spec.postprocess(df)
+        self._reloaded_list().append(name)
+        return df
+
+    # --------------------------------------------------------------
+    # 실행(rerun) 단위 재로딩 기록
+    # --------------------------------------------------------------
+    def _reloaded_list(self):
+        if not hasattr(self._local, "reloaded"):
+            self._local.reloaded = []
+        return self._local.reloaded
+
+    def begin_run(self):
+        """새 실행을 시작합니다. 이전 실행의 재로딩 기록을 비웁니다."""
+        self._local.reloaded = []
+
+    def reloaded(self):
+        """이번 실행에서 캐시 미스로 다시 읽힌 데이터셋 이름 목록."""
+        return list(self._reloaded_list())
+
+
+class LazyFrames(Mapping):
+    """
+    데이터셋 이름 -> DataFrame 매핑. 항목에 처음 접근할 때만 loader(name) 로 읽습니다.
+    derived 는 다른 항목으로부터 만드는 파생 테이블 (이름 -> builder(frames)) 입니다.
+    loader/builder 가 돌려준 캐시 공유 프레임은 shared_view 로 감싸 보관하므로,
+    페이지 코드가 컬럼을 추가해도 다른 세션의 프레임에는 영향이 없습니다.
+    파생 컬럼은 원본 프레임에 붙이지 말고 derived 테이블로 분리합니다.
+    """
+
+    def __init__(self, loader, names, derived=None):
+        self._loader = loader
+        self._derived = {name: build for name, build in (derived or {}).items() if name not in names}
+        self._names = list(names) + list(self._derived)
+        self._frames = {}
+
+    def __getitem__(self, name):
+        if name not in self._frames:
+            if name in self._derived:
+                self._frames[name] = shared_view(self._derived[name](self))
+            elif name in self._names:
+                self._frames[name] = shared_view(self._loader(name))
+            else:
+                raise KeyError(name)
+        return self._frames[name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def loaded(self):
+        """지금까지 실제로 읽거나 만든 항목 이름."""
+        return list(self._frames)
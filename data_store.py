@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+data_store.py
+data/*.csv 원본을 타입이 지정된 컬럼 저장소(Parquet)로 변환하고 읽어 들이는 모듈
+
+사용법:
+    python data_store.py              # data/*.csv -> data/columnar/*.parquet 일괄 변환
+    python data_store.py --force      # 최신 상태여도 다시 변환
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import schema
+
+try:
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:  # pyarrow 미설치 시 CSV 경로만 사용
+    HAS_PYARROW = False
+
+DATA_DIR = Path("data")
+COLUMNAR_DIR_NAME = "columnar"
+CSV_ENCODING = "utf-8-sig"
+
+# 파일별 read_csv 옵션 (index_col 등)
+READ_OPTIONS = {
+    "analysis_cluster_channel": {"index_col": 0},
+}
+
+
+def csv_path(name, data_dir=DATA_DIR):
+    return Path(data_dir) / f"{name}.csv"
+
+
+def columnar_path(name, data_dir=DATA_DIR):
+    return Path(data_dir) / COLUMNAR_DIR_NAME / f"{name}.parquet"
+
+
+def apply_schema(df):
+    """schema 모듈의 컬럼 타입 선언(날짜, 범주형, int32/int8 축소)을 적용합니다."""
+    return schema.apply_types(df)
+
+
+def read_csv_typed(name, data_dir=DATA_DIR, exclude=()):
+    """CSV 원본을 읽어 스키마를 적용합니다. exclude 컬럼은 파싱하지 않습니다."""
+    options = dict(READ_OPTIONS.get(name, {}))
+    if exclude:
+        options["usecols"] = lambda col: col not in exclude
+    df = pd.read_csv(csv_path(name, data_dir), encoding=CSV_ENCODING, **options)
+    return apply_schema(df)
+
+
+def is_fresh(name, data_dir=DATA_DIR):
+    """컬럼 저장소 사본이 CSV 원본보다 최신이면 True."""
+    src, dst = csv_path(name, data_dir), columnar_path(name, data_dir)
+    if not HAS_PYARROW or not dst.exists():
+        return False
+    if not src.exists():
+        return True
+    return dst.stat().st_mtime >= src.stat().st_mtime
+
+
+def exists(name, data_dir=DATA_DIR):
+    return csv_path(name, data_dir).exists() or is_fresh(name, data_dir)
+
+
+def source_path(name, data_dir=DATA_DIR):
+    """load_frame이 실제로 읽게 될 파일 경로 (최신 Parquet 사본 또는 CSV 원본)."""
+    if is_fresh(name, data_dir):
+        return columnar_path(name, data_dir)
+    return csv_path(name, data_dir)
+
+
+def load_frame(name, data_dir=DATA_DIR, memory_map=True, exclude=()):
+    """
+    데이터셋을 불러옵니다.
+    최신 Parquet 사본이 있으면 그것을(옵션에 따라 memory-map으로) 읽고,
+    없거나 오래된 경우에만 CSV를 파싱합니다. exclude 컬럼은 아예 읽지 않습니다.
+    """
+    path = source_path(name, data_dir)
+    if path.suffix == ".parquet":
+        columns = None
+        if exclude:
+            columns = [col for col in pq.read_schema(path).names
+                       if col not in exclude and not col.startswith("__index_level_")]
+        return pd.read_parquet(path, engine="pyarrow", columns=columns, memory_map=memory_map)
+    return read_csv_typed(name, data_dir, exclude)
+
+
+def ingest(data_dir=DATA_DIR, force=False):
+    """data/*.csv 를 타입이 지정된 Parquet 파일로 변환합니다. 변환된 이름 목록을 반환합니다."""
+    if not HAS_PYARROW:
+        raise ImportError("Parquet 변환에는 pyarrow가 필요합니다. `pip install pyarrow`")
+
+    data_dir = Path(data_dir)
+    (data_dir / COLUMNAR_DIR_NAME).mkdir(parents=True, exist_ok=True)
+
+    converted = []
+    for src in sorted(data_dir.glob("*.csv")):
+        name = src.stem
+        if not force and is_fresh(name, data_dir):
+            continue
+        df = read_csv_typed(name, data_dir)
+        df.to_parquet(columnar_path(name, data_dir), engine="pyarrow", index=name in READ_OPTIONS)
+        converted.append(name)
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="data/*.csv 를 Parquet 컬럼 저장소로 변환합니다.")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--force", action="store_true", help="최신 상태여도 다시 변환")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    done = ingest(args.data_dir, force=args.force)
+    elapsed = time.perf_counter() - start
+    for name in done:
+        print(f"✅ {name}.csv -> {COLUMNAR_DIR_NAME}/{name}.parquet")
+    print(f"총 {len(done)}개 파일 변환 완료 ({elapsed:.2f}s)")
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+filter_engine.py
+🔍 상세 분석 페이지용 인덱스 기반 주문 필터 엔진
+
+주문 로그를 주문일 기준으로 한 번 정렬해 두고
+- 날짜 범위는 이진 탐색(np.searchsorted)으로 연속 구간을 찾고
+- 주문경로/결제방법은 정수 코드 + 비트맵(np.packbits)으로 미리 색인해
+필터링 결과를 복사 없는 슬라이스 뷰 또는 위치 배열로 돌려줍니다.
+"""
+
+import numpy as np
+import pandas as pd
+
+DATE_COL = "주문일"
+INDEXED_COLUMNS = ("주문경로", "결제방법")
+
+
+class OrderIndex:
+    """주문일로 정렬된 주문 로그와 범주형 비트맵 색인."""
+
+    def __init__(self, df, date_col=DATE_COL, indexed_columns=INDEXED_COLUMNS):
+        self.date_col = date_col
+        # NaT는 정렬 시 맨 뒤로 이동합니다.
+        order = np.argsort(df[date_col].to_numpy(dtype="datetime64[ns]"), kind="stable")
+        self.frame = df.iloc[order].reset_index(drop=True)
+        self.dates = self.frame[date_col].to_numpy(dtype="datetime64[ns]")
+        self.n_valid = int((~np.isnat(self.dates)).sum())
+
+        self.categories = {}
+        self.codes = {}
+        self.bitmaps = {}
+        for col in indexed_columns:
+            cat = pd.Categorical(self.frame[col]).remove_unused_categories()
+            self.categories[col] = list(cat.categories)
+            self.codes[col] = cat.codes.astype(np.int32)
+            self.bitmaps[col] = {
+                value: np.packbits(self.codes[col] == code)
+                for code, value in enumerate(cat.categories)
+            }
+
+    def __len__(self):
+        return len(self.frame)
+
+    def date_bounds(self):
+        """(최소 주문일, 최대 주문일) — NaT 제외."""
+        if self.n_valid == 0:
+            return None, None
+        return pd.Timestamp(self.dates[0]), pd.Timestamp(self.dates[self.n_valid - 1])
+
+    def date_slice(self, start=None, end=None):
+        """start~end (날짜 기준, 양끝 포함) 구간을 이진 탐색으로 찾아 slice로 반환합니다."""
+        lo = 0 if start is None else int(np.searchsorted(
+            self.dates[:self.n_valid], np.datetime64(pd.Timestamp(start).normalize(), "ns"), side="left"))
+        # 날짜 조건이 있으면 주문일이 없는(NaT) 행은 제외합니다.
+        hi_default = len(self.frame) if start is None else self.n_valid
+        hi = hi_default if end is None else int(np.searchsorted(
+            self.dates[:self.n_valid], np.datetime64(pd.Timestamp(end).normalize() + pd.Timedelta(days=1), "ns"), side="left"))
+        return slice(lo, max(lo, hi))
+
+    def select(self, start=None, end=None, **filters):
+        """
+        조건에 맞는 행 위치를 반환합니다.
+        범주 필터가 없으면 연속 구간 slice, 있으면 정렬된 위치 배열(np.ndarray)입니다.
+        예: select(start, end, 주문경로="카카오톡", 결제방법=None)
+        """
+        window = self.date_slice(start, end)
+        active = {col: value for col, value in filters.items() if value is not None}
+        if not active:
+            return window
+
+        lo, hi = window.start, window.stop
+        mask = np.ones(hi - lo, dtype=bool)
+        for col, value in active.items():
+            bitmap = self.bitmaps[col].get(value)
+            if bitmap is None:
+                return np.empty(0, dtype=np.int64)
+            # 구간에 해당하는 바이트만 풀어 비트 단위로 결합
+            bits = np.unpackbits(bitmap[lo // 8:(hi + 7) // 8])
+            offset = lo % 8
+            mask &= bits[offset:offset + (hi - lo)].astype(bool)
+        return np.flatnonzero(mask) + lo
+
+    def view(self, start=None, end=None, **filters):
+        """select 결과에 해당하는 DataFrame (날짜 필터만 있을 때는 복사 없는 슬라이스)."""
+        positions = self.select(start, end, **filters)
+        return self.frame.iloc[positions]
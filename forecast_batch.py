@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+forecast_batch.py
+상품코드별 / 주문경로별 7일 매출 예측 배치 작업
+
+주문 로그를 한 번 집계(매출 큐브)한 뒤 차원 값별 일 단위 시계열을 만들고,
+프로세스 풀에서 청크 단위로 병렬 적합해 data/columnar/analysis_forecast.parquet 에 저장합니다.
+시계열별 입력 해시를 상태 파일에 기록해 두고, 입력이 바뀌지 않은 시계열은 이전 결과를 재사용합니다.
+
+사용법:
+    python forecast_batch.py                        # ETS, CPU 수만큼 프로세스
+    python forecast_batch.py --method sarimax --workers 8 --chunksize 32
+    python forecast_batch.py --full                 # 이전 결과를 무시하고 전체 재적합
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_registry
+import data_store
+import forecasting
+import rollup
+
+SOURCE = "data_preprocessed"
+OUTPUT = "analysis_forecast"
+DIMENSIONS = ["상품코드", "주문경로"]
+STATE_PATH = data_store.DATA_DIR / ".state" / "forecast_manifest.json"
+OUTPUT_COLUMNS = ["차원", "키", "모델"] + forecasting.FORECAST_COLUMNS
+
+
+def _state_key(series_key):
+    dim, key = series_key
+    return f"{dim}|{key}"
+
+
+def series_digest(series, method, horizon):
+    """시계열 값/기간과 모델 설정으로 만든 입력 해시."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{method}|{horizon}|{series.index[0]}|{series.index[-1]}".encode("utf-8"))
+    h.update(np.ascontiguousarray(series.to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+def build_series(orders):
+    """주문 로그를 한 번 집계한 큐브에서 (차원, 키) -> 일 단위 시계열을 만듭니다."""
+    cube = rollup.build_sales_cube(orders)
+    series = {}
+    for dim in DIMENSIONS:
+        for key, values in forecasting.series_by(cube, dim).items():
+            series[(dim, str(key))] = values
+    return series
+
+
+def load_previous(data_dir, state_path):
+    output_path = data_store.columnar_path(OUTPUT, data_dir)
+    state_path = Path(state_path)
+    if not output_path.exists() or not state_path.exists():
+        return pd.DataFrame(columns=OUTPUT_COLUMNS), {}
+    return pd.read_parquet(output_path), json.loads(state_path.read_text(encoding="utf-8"))
+
+
+def run(method="ets", horizon=forecasting.HORIZON, workers=None, chunksize=16, full=False,
+        source=SOURCE, data_dir=data_store.DATA_DIR, state_path=STATE_PATH):
+    """배치 예측을 실행하고 (전체 시계열 수, 적합한 시계열 수, 오류 dict, 적합 소요 시간) 을 반환합니다."""
+    registry = data_registry.DatasetRegistry(data_dir=data_dir)
+    series = build_series(registry.read(source))
+
+    previous, manifest = (pd.DataFrame(columns=OUTPUT_COLUMNS), {}) if full else load_previous(data_dir, state_path)
+    digests = {_state_key(k): series_digest(values, method, horizon) for k, values in series.items()}
+    stale = {k: values for k, values in series.items() if manifest.get(_state_key(k)) != digests[_state_key(k)]}
+
+    start = time.perf_counter()
+    forecasts, errors = forecasting.forecast_many(stale, method, horizon, workers=workers, chunksize=chunksize)
+    elapsed = time.perf_counter() - start
+
+    # 입력이 그대로인 시계열은 이전 결과 유지, 사라진 시계열은 제거
+    parts = [frame.assign(차원=dim, 키=key, 모델=method) for (dim, key), frame in forecasts.items()]
+    if not previous.empty:
+        previous_keys = pd.MultiIndex.from_frame(previous[["차원", "키"]])
+        parts.append(previous[previous_keys.isin(list(series)) & ~previous_keys.isin(list(stale))])
+    result = (
+        pd.concat(parts, ignore_index=True)[OUTPUT_COLUMNS].sort_values(["차원", "키", "날짜"])
+        if parts else pd.DataFrame(columns=OUTPUT_COLUMNS)
+    )
+
+    output_path = data_store.columnar_path(OUTPUT, data_dir)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    result.to_parquet(output_path, index=False)
+
+    state_path = Path(state_path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    failed = {_state_key(k) for k in errors}
+    manifest = {k: v for k, v in digests.items() if k not in failed}
+    state_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    return len(series), len(stale), errors, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="상품코드/주문경로별 7일 매출 예측을 병렬로 계산합니다.")
+    parser.add_argument("--method", choices=forecasting.METHODS, default="ets")
+    parser.add_argument("--horizon", type=int, default=forecasting.HORIZON)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="프로세스 수 (1이면 순차 실행)")
+    parser.add_argument("--chunksize", type=int, default=16, help="프로세스에 한 번에 넘길 시계열 수")
+    parser.add_argument("--full", action="store_true", help="이전 결과를 무시하고 전체 재적합")
+    parser.add_argument("--source", default=SOURCE, help="주문 로그 데이터셋 이름")
+    args = parser.parse_args()
+
+    total, fitted, errors, elapsed = run(args.method, args.horizon, args.workers, args.chunksize,
+                                         args.full, args.source)
+    rate = fitted / elapsed if elapsed > 0 else 0.0
+    print(f"✅ 시계열 {total:,}개 중 {fitted:,}개 적합, {total - fitted:,}개 재사용 "
+          f"({elapsed:.2f}s, {rate:,.1f} series/s) -> {data_store.COLUMNAR_DIR_NAME}/{OUTPUT}.parquet")
+    for (dim, key), error in errors.items():
+        print(f"  ⚠️ {dim}={key}: {error}")
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+forecasting.py
+일별 매출 시계열 예측 엔진 (statsmodels)
+
+- ets:     ETS(Holt-Winters) 가법 오차/감쇠 추세/주간(7일) 계절성
+- sarimax: SARIMAX(1,1,1)x(1,0,1,7)
+
+두 모델 모두 예측 구간(하한/상한)을 함께 반환합니다.
+ForecastCache 는 시계열별로 마지막 적합 모델을 보관하다가 새 날짜가 뒤에 붙기만 한 경우
+재적합 없이 갱신(SARIMAX: 상태 갱신, ETS: 이전 모수로 필터링만 다시 수행)합니다.
+채널/상품별 다수 시계열은 forecast_many 로 프로세스 풀에서 병렬 적합합니다.
+"""
+
+import threading
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+HORIZON = 7
+SEASONAL_PERIODS = 7
+ALPHA = 0.05  # 95% 예측 구간
+MIN_OBSERVATIONS = 8  # 이보다 짧은 시계열은 평균 기반 단순 예측
+METHODS = ("ets", "sarimax")
+FORECAST_COLUMNS = ["날짜", "예측", "하한", "상한"]
+
+
+def daily_series(df, date_col="주문일", value_col="결제금액(상품별)"):
+    """일자별 값을 빈 날짜 0으로 채운 일 단위 시계열로 만듭니다."""
+    values = df.groupby(pd.to_datetime(df[date_col]).dt.normalize())[value_col].sum().astype(float)
+    if values.empty:
+        return values
+    return values.asfreq("D", fill_value=0.0)
+
+
+# ------------------------------------------------------------------
+# 단일 시계열 모델
+# ------------------------------------------------------------------
+def _fallback_forecast(series, horizon, alpha):
+    """관측치가 너무 적을 때: 평균 ± 표준편차 기반 단순 예측."""
+    dates = pd.date_range(series.index[-1] + pd.Timedelta(days=1), periods=horizon, freq="D")
+    mean = float(series.mean()) if len(series) else 0.0
+    spread = float(series.std(ddof=0)) if len(series) > 1 else 0.0
+    z = norm.ppf(1 - alpha / 2)
+    return pd.DataFrame({"날짜": dates, "예측": mean, "하한": mean - z * spread, "상한": mean + z * spread})
+
+
+@dataclass
+class Forecaster:
+    """시계열 하나에 대한 적합 모델. fit -> (update ->) forecast"""
+
+    method: str = "ets"
+    horizon: int = HORIZON
+    alpha: float = ALPHA
+    series: Optional[pd.Series] = None
+    results: object = None
+
+    def _seasonal(self, n):
+        return SEASONAL_PERIODS if n >= 2 * SEASONAL_PERIODS else None
+
+    def _ets_model(self, series):
+        from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+        seasonal = self._seasonal(len(series))
+        return ETSModel(series, error="add", trend="add", damped_trend=True,
+                        seasonal="add" if seasonal else None, seasonal_periods=seasonal)
+
+    def _fit_ets(self, series):
+        return self._ets_model(series).fit(disp=False)
+
+    def _fit_sarimax(self, series):
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
+        seasonal = self._seasonal(len(series))
+        seasonal_order = (1, 0, 1, seasonal) if seasonal else (0, 0, 0, 0)
+        model = SARIMAX(series, order=(1, 1, 1), seasonal_order=seasonal_order,
+                        enforce_stationarity=False, enforce_invertibility=False)
+        return model.fit(disp=False)
+
+    def fit(self, series):
+        if self.method not in METHODS:
+            raise ValueError(f"지원하지 않는 예측 모델입니다: {self.method}")
+        self.series = series
+        self.results = None
+        if len(series) >= MIN_OBSERVATIONS:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                self.results = self._fit_ets(series) if self.method == "ets" else self._fit_sarimax(series)
+        return self
+
+    def update(self, series):
+        """
+        새 시계열로 모델을 갱신합니다.
+        기존 시계열 뒤에 날짜만 추가된 경우 재적합 없이 갱신하고, 과거 값이 바뀌었으면 다시 적합합니다.
+        """
+        old = self.series
+        n_old = 0 if old is None else len(old)
+        appended = (
+            self.results is not None and len(series) > n_old
+            and series.index[n_old - 1] == old.index[-1]
+            and np.array_equal(series.to_numpy()[:n_old], old.to_numpy())
+            and self._seasonal(len(series)) == self._seasonal(n_old)
+        )
+        if not appended:
+            if old is not None and len(series) == n_old and series.equals(old):
+                return self
+            return self.fit(series)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            if self.method == "sarimax":
+                self.results = self.results.append(series.iloc[n_old:])
+            else:
+                # 모수 추정(MLE) 없이 기존 모수로 늘어난 시계열의 상태만 다시 계산합니다.
+                self.results = self._ets_model(series).smooth(self.results.params)
+        self.series = series
+        return self
+
+    def forecast(self):
+        """향후 horizon 일 예측값과 예측 구간 (날짜, 예측, 하한, 상한)."""
+        if self.results is None:
+            return _fallback_forecast(self.series, self.horizon, self.alpha)
+
+        n = len(self.series)
+        if self.method == "sarimax":
+            frame = self.results.get_forecast(self.horizon).summary_frame(alpha=self.alpha)
+            frame = frame.rename(columns={"mean": "예측", "mean_ci_lower": "하한", "mean_ci_upper": "상한"})
+        else:
+            frame = self.results.get_prediction(start=n, end=n + self.horizon - 1).summary_frame(alpha=self.alpha)
+            frame = frame.rename(columns={"mean": "예측", "pi_lower": "하한", "pi_upper": "상한"})
+        frame = frame[["예측", "하한", "상한"]].clip(lower=0)  # 음수 매출 방지
+        return frame.rename_axis(index="날짜", columns=None).reset_index()[FORECAST_COLUMNS]
+
+
+def fit_forecast(series, method="ets", horizon=HORIZON, alpha=ALPHA):
+    return Forecaster(method, horizon, alpha).fit(series).forecast()
+
+
+def forecast_figure(recent_sales, df_forecast, alpha=ALPHA):
+    """최근 실적 + 예측값 + 예측 구간 음영 차트."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=recent_sales.index, y=recent_sales.values, name='실제 매출', line=dict(color='royalblue', width=2)))
+    fig.add_trace(go.Scatter(
+        x=pd.concat([df_forecast['날짜'], df_forecast['날짜'][::-1]]),
+        y=pd.concat([df_forecast['상한'], df_forecast['하한'][::-1]]),
+        fill='toself', fillcolor='rgba(178, 34, 34, 0.15)', line=dict(width=0),
+        name=f'{int((1 - alpha) * 100)}% 예측 구간', hoverinfo='skip'
+    ))
+    fig.add_trace(go.Scatter(x=df_forecast['날짜'], y=df_forecast['예측'], name='예측 매출', line=dict(color='firebrick', width=2, dash='dot')))
+    fig.update_layout(
+        title="최근 매출 추이 및 향후 7일 예측",
+        xaxis_title="날짜",
+        yaxis_title="매출액 (원)",
+        template="plotly_white",
+        hovermode="x unified"
+    )
+    return fig
+
+
+# ------------------------------------------------------------------
+# 캐시 (데이터 버전별 결과 + 시계열별 증분 갱신 모델)
+# ------------------------------------------------------------------
+class ForecastCache:
+    """(데이터 버전, 시계열 키, 모델) -> 예측 결과, (시계열 키, 모델) -> 마지막 적합 모델."""
+
+    def __init__(self):
+        self._results = {}
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def get(self, version, key, series, method="ets", horizon=HORIZON, alpha=ALPHA):
+        cache_key = (version, key, method, horizon, alpha)
+        with self._lock:
+            if cache_key in self._results:
+                return self._results[cache_key]
+            model = self._models.get((key, method, horizon, alpha))
+
+        model = (model or Forecaster(method, horizon, alpha)).update(series)
+        result = model.forecast()
+        with self._lock:
+            self._models[(key, method, horizon, alpha)] = model
+            # 같은 시계열의 이전 데이터 버전 결과는 제거
+            for old in [k for k in self._results if k[1:] == cache_key[1:]]:
+                del self._results[old]
+            self._results[cache_key] = result
+        return result
+
+
+# ------------------------------------------------------------------
+# 다수 시계열 병렬 예측
+# ------------------------------------------------------------------
+def series_by(cube, by, date_col="주문일", value_col="결제금액(상품별)"):
+    """매출 큐브(또는 주문 로그)에서 한 번의 groupby 로 차원 값별 일 단위 시계열을 만듭니다."""
+    table = (
+        cube.groupby([by, pd.to_datetime(cube[date_col]).dt.normalize()], observed=True)[value_col]
+        .sum().astype(float).unstack(by)
+    )
+    if table.empty:
+        return {}
+    table = table.asfreq("D").fillna(0.0)
+    return {key: table[key] for key in table.columns}
+
+
+def _forecast_task(task):
+    key, series, method, horizon, alpha = task
+    try:
+        return key, fit_forecast(series, method, horizon, alpha), None
+    except Exception as exc:  # 개별 시계열 실패는 결과에만 기록
+        return key, None, repr(exc)
+
+
+def forecast_many(series_map, method="ets", horizon=HORIZON, alpha=ALPHA, workers=None, chunksize=16):
+    """
+    {키: 시계열} 을 프로세스 풀에서 병렬 적합해 {키: 예측 테이블} 과 {키: 오류} 를 반환합니다.
+    workers=1 이면 현재 프로세스에서 순차 실행합니다.
+    """
+    tasks = [(key, series, method, horizon, alpha) for key, series in series_map.items()]
+    if workers == 1 or len(tasks) <= 1:
+        outputs = [_forecast_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_forecast_task, tasks, chunksize=chunksize))
+
+    forecasts, errors = {}, {}
+    for key, frame, error in outputs:
+        if error is None:
+            forecasts[key] = frame
+        else:
+            errors[key] = error
+    return forecasts, errors
+
+
+def forecast_table(forecasts, key_name):
+    """forecast_many 결과를 하나의 긴 테이블 (키, 날짜, 예측, 하한, 상한) 로 합칩니다."""
+    if not forecasts:
+        return pd.DataFrame(columns=[key_name] + FORECAST_COLUMNS)
+    return pd.concat(
+        [frame.assign(**{key_name: key}) for key, frame in forecasts.items()], ignore_index=True
+    )[[key_name] + FORECAST_COLUMNS]
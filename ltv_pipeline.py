@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+ltv_pipeline.py
+고객별 RFM / LTV 점수(analysis_ltv.csv)를 증분 방식으로 생성하는 파이프라인
+
+data_clustered.csv 의 주문을 구매자(주문자명_연락처) 단위로 누적 집계한 상태 파일을 유지하고,
+실행할 때마다 마지막 처리 시점(워터마크) 이후의 신규 주문만 상태에 합산합니다.
+늦게 적재된(백필) 주문을 놓치지 않도록 워터마크 이전 LATE_DAYS 일을 다시 읽고,
+그 구간에서 이미 반영한 주문번호+상품코드는 제외합니다 (반영한 키는 상태 파일에 함께 보관).
+
+    Recency   = (최종 주문 시각 기준일 - 고객 최근 주문일).days + 1
+    Frequency = 주문 상품 행 수
+    Monetary  = 결제금액(상품별) 합계
+    cluster   = 첫 구매 주문의 클러스터
+    LTV_Score = Monetary * Frequency / (Recency + 1)
+
+사용법:
+    python ltv_pipeline.py            # 신규 주문만 반영
+    python ltv_pipeline.py --full     # 상태를 초기화하고 전체 재계산
+    python ltv_pipeline.py --late-days 30   # 30일 이전 주문까지 늦은 적재분 확인
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import data_store
+
+STATE_DIR = data_store.DATA_DIR / ".state"
+SOURCE = "data_clustered"
+OUTPUT = "analysis_ltv"
+CHUNK_SIZE = 100_000
+LATE_DAYS = 7  # 워터마크 이전에 다시 확인하는 기간 (늦게 적재된 주문)
+STATE_COLUMNS = ["고객ID", "first_order", "last_order", "Frequency", "Monetary", "cluster"]
+KEY_COLUMNS = ["key", "주문일"]
+
+
+def _state_paths(state_dir):
+    state_dir = Path(state_dir)
+    return state_dir / "ltv_state.parquet", state_dir / "ltv_state.json", state_dir / "ltv_keys.parquet"
+
+
+def load_state(state_dir=STATE_DIR):
+    """
+    (고객별 누적 집계, 워터마크, 최근 반영 주문 키) 를 반환합니다. 상태가 없으면 빈 집계와 None, 빈 키.
+    키 파일이 없는 이전 형식의 상태면 키는 None 입니다.
+    """
+    table_path, meta_path, keys_path = _state_paths(state_dir)
+    if not table_path.exists() or not meta_path.exists():
+        return pd.DataFrame(columns=STATE_COLUMNS), None, pd.DataFrame(columns=KEY_COLUMNS)
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    keys = pd.read_parquet(keys_path) if keys_path.exists() else None
+    return pd.read_parquet(table_path), pd.Timestamp(meta["watermark"]), keys
+
+
+def save_state(state, watermark, keys, state_dir=STATE_DIR):
+    table_path, meta_path, keys_path = _state_paths(state_dir)
+    table_path.parent.mkdir(parents=True, exist_ok=True)
+    state.to_parquet(table_path, index=False)
+    keys.to_parquet(keys_path, index=False)
+    meta_path.write_text(json.dumps({
+        "watermark": watermark.isoformat(),
+        "customers": len(state),
+        "recent_keys": len(keys),
+        "updated_at": pd.Timestamp.now().isoformat(timespec="seconds"),
+    }, ensure_ascii=False), encoding="utf-8")
+
+
+def read_new_orders(since=None, data_dir=data_store.DATA_DIR):
+    """since 이후 주문만 읽습니다 (Parquet 사본은 조건 푸시다운, CSV는 청크 단위 필터)."""
+    columns = ["주문번호", "주문일", "상품코드", "주문자명", "주문자연락처", "결제금액(상품별)", "cluster"]
+    if data_store.is_fresh(SOURCE, data_dir):
+        filters = None if since is None else [("주문일", ">", since)]
+        return pd.read_parquet(data_store.columnar_path(SOURCE, data_dir), columns=columns, filters=filters)
+
+    chunks = []
+    reader = pd.read_csv(data_store.csv_path(SOURCE, data_dir), encoding=data_store.CSV_ENCODING,
+                         usecols=columns, chunksize=CHUNK_SIZE)
+    for chunk in reader:
+        chunk["주문일"] = pd.to_datetime(chunk["주문일"], errors="coerce")
+        if since is not None:
+            chunk = chunk[chunk["주문일"] > since]
+        chunks.append(chunk)
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=columns)
+
+
+def _order_key(orders):
+    return orders["주문번호"].astype(str) + "|" + orders["상품코드"].astype(str)
+
+
+def order_keys(orders):
+    """주문 행의 키 (주문번호+상품코드) 와 주문일. 주문일이 없는 행은 집계에서도 빠지므로 제외합니다."""
+    orders = orders.dropna(subset=["주문일"])
+    return pd.DataFrame({"key": _order_key(orders), "주문일": orders["주문일"]})
+
+
+def drop_processed(orders, keys):
+    """재확인 구간에서 다시 읽은 주문 중 이미 반영한 키를 제외합니다."""
+    if keys.empty or orders.empty:
+        return orders
+    return orders[~_order_key(orders).isin(keys["key"])]
+
+
+def summarize_orders(orders):
+    """주문 행을 고객별 집계 (상태 테이블과 같은 형태)로 변환합니다."""
+    orders = orders.dropna(subset=["주문일"])
+    orders = orders.assign(
+        고객ID=orders["주문자명"].astype(str) + "_" + orders["주문자연락처"].astype(str)
+    ).sort_values("주문일", kind="stable")
+    return orders.groupby("고객ID", sort=False).agg(
+        first_order=("주문일", "min"),
+        last_order=("주문일", "max"),
+        Frequency=("주문번호", "size"),
+        Monetary=("결제금액(상품별)", "sum"),
+        cluster=("cluster", "first"),
+    ).reset_index()
+
+
+def merge_state(state, delta):
+    """기존 누적 집계에 신규 집계를 합칩니다 (고객 수에 비례, 주문 이력 재스캔 없음)."""
+    if state.empty:
+        return delta[STATE_COLUMNS]
+    combined = pd.concat([state, delta], ignore_index=True).sort_values("first_order", kind="stable")
+    return combined.groupby("고객ID", sort=False).agg(
+        first_order=("first_order", "min"),
+        last_order=("last_order", "max"),
+        Frequency=("Frequency", "sum"),
+        Monetary=("Monetary", "sum"),
+        cluster=("cluster", "first"),
+    ).reset_index()[STATE_COLUMNS]
+
+
+def compute_ltv(state, reference):
+    """누적 집계와 기준 시각으로 analysis_ltv 테이블을 만듭니다."""
+    ltv = state[["고객ID", "Frequency", "Monetary", "cluster"]].copy()
+    ltv.insert(1, "Recency", (reference - state["last_order"]).dt.days + 1)
+    ltv["LTV_Score"] = ltv["Monetary"] * ltv["Frequency"] / (ltv["Recency"] + 1)
+    return ltv.sort_values("고객ID").reset_index(drop=True)
+
+
+def run(full=False, data_dir=data_store.DATA_DIR, state_dir=STATE_DIR, late_days=LATE_DAYS):
+    """파이프라인을 실행하고 (신규 주문 행 수, 고객 수) 를 반환합니다."""
+    if full:
+        state, watermark, keys = pd.DataFrame(columns=STATE_COLUMNS), None, pd.DataFrame(columns=KEY_COLUMNS)
+    else:
+        state, watermark, keys = load_state(state_dir)
+    late = pd.Timedelta(days=late_days)
+    orders = read_new_orders(None if watermark is None else watermark - late, data_dir)
+    if keys is None:  # 키 파일이 없는 이전 상태: 워터마크까지는 모두 반영된 것으로 봅니다
+        keys = order_keys(orders[orders["주문일"] <= watermark])
+    new_orders = drop_processed(orders, keys)
+    if not new_orders.empty:
+        state = merge_state(state, summarize_orders(new_orders))
+        watermark = max(watermark, new_orders["주문일"].max()) if watermark is not None else new_orders["주문일"].max()
+        # 다음 실행의 재확인 구간에 들어가는 키만 보관합니다.
+        keys = pd.concat([keys, order_keys(new_orders)], ignore_index=True).drop_duplicates("key")
+        keys = keys[keys["주문일"] > watermark - late].reset_index(drop=True)
+        save_state(state, watermark, keys, state_dir)
+
+    if watermark is not None:
+        ltv = compute_ltv(state, watermark)
+        ltv.to_csv(data_store.csv_path(OUTPUT, data_dir), index=False, encoding=data_store.CSV_ENCODING)
+    return len(new_orders), len(state)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="고객별 RFM/LTV 점수를 증분 계산해 analysis_ltv.csv 로 저장합니다.")
+    parser.add_argument("--full", action="store_true", help="상태를 초기화하고 전체 주문을 다시 집계")
+    parser.add_argument("--late-days", type=int, default=LATE_DAYS, help="늦게 적재된 주문을 다시 확인할 기간(일)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    n_new, n_customers = run(full=args.full, late_days=args.late_days)
+    print(f"✅ 신규 주문 {n_new:,}건 반영, 고객 {n_customers:,}명 -> {OUTPUT}.csv ({time.perf_counter() - start:.2f}s)")
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+order_store.py
+주문월 기준으로 나눈 주문 로그 저장소와 날짜 범위 조회 (파티션 프루닝)
+
+- 파티션: data/preprocessed/YYYY-MM.csv (preprocess.py 가 생성) 와 그 Parquet 사본
+  data/columnar/preprocessed/YYYY-MM.parquet. 파티션 이름 "preprocessed/YYYY-MM" 은
+  data_store / DatasetRegistry 의 데이터셋 이름처럼 쓰이므로 지문/로딩/Parquet 우선 규칙이 그대로 적용됩니다.
+- load(start, end) 는 범위와 겹치는 월 파티션만 읽고, 파티션 단위로 캐시합니다.
+  최근 30일 조회는 한두 개 파티션만 읽습니다.
+- 파티션이 아직 없으면 data_preprocessed 전체를 파티션 하나로 취급합니다.
+- 범위와 겹치는 파티션이 없으면 같은 컬럼/타입의 빈 프레임을 반환합니다.
+
+사용법:
+    python order_store.py                                   # 파티션이 없으면 분할 + Parquet 사본 생성
+    python order_store.py --split                           # data_preprocessed.csv 로 파티션 다시 분할
+    python order_store.py --start 2026-01-01 --end 2026-01-31
+"""
+
+import argparse
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+import data_registry
+import data_store
+
+SOURCE = "data_preprocessed"
+PARTITION_DIR_NAME = "preprocessed"
+DATE_COL = "주문일"
+
+
+def partition_name(month):
+    return f"{PARTITION_DIR_NAME}/{month}"
+
+
+def partition_dir(data_dir=data_store.DATA_DIR):
+    return Path(data_dir) / PARTITION_DIR_NAME
+
+
+def partition_path(month, data_dir=data_store.DATA_DIR):
+    return data_store.csv_path(partition_name(month), data_dir)
+
+
+def month_of(value):
+    return pd.Timestamp(value).strftime("%Y-%m")
+
+
+def concat_partitions(frames):
+    """월 파티션을 이어 붙입니다. 범주형 컬럼은 범주를 합쳐 category 타입을 유지합니다."""
+    if not frames:
+        return pd.DataFrame()
+    frames = [frame for frame in frames if not frame.empty] or frames[:1]
+    if len(frames) == 1:
+        return frames[0]
+    frames = [frame.copy() for frame in frames]
+    for col in frames[0].columns:
+        if not all(col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames):
+            continue
+        categories = union_categoricals([frame[col] for frame in frames]).categories
+        for frame in frames:
+            frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+class OrderStore:
+    """월 파티션 목록, 범위 -> 파티션 프루닝, 파티션 단위 캐시."""
+
+    def __init__(self, registry=None):
+        self.registry = registry or data_registry.DatasetRegistry()
+        self.data_dir = self.registry.data_dir
+        self.spec = self.registry.datasets[SOURCE]
+        self._memo = {}  # 월 -> (지문, DataFrame)
+        self._lock = threading.Lock()
+
+    def months(self):
+        """저장된 월 파티션 목록 (CSV 원본 또는 Parquet 사본 기준, 오름차순)."""
+        months = {path.stem for path in partition_dir(self.data_dir).glob("????-??.csv")}
+        columnar = data_store.columnar_path(partition_name("*"), self.data_dir)
+        months |= {path.stem for path in columnar.parent.glob("????-??.parquet")}
+        return sorted(months)
+
+    def partitions(self, start=None, end=None):
+        """start~end(날짜, 양끝 포함)와 겹치는 월 파티션. 파티션이 없으면 [None] (data_preprocessed 전체)."""
+        months = self.months()
+        if not months:
+            return [None]
+        lo = month_of(start) if start is not None else months[0]
+        hi = month_of(end) if end is not None else months[-1]
+        return [month for month in months if lo <= month <= hi]
+
+    def dataset_name(self, month):
+        return SOURCE if month is None else partition_name(month)
+
+    def fingerprint(self, month):
+        return self.registry.fingerprint(self.dataset_name(month))
+
+    def version(self, start=None, end=None):
+        """범위에 해당하는 파티션 지문만으로 만든 데이터 버전 (다른 달이 바뀌어도 그대로)."""
+        return self.registry.version(*[self.dataset_name(month) for month in self.partitions(start, end)])
+
+    # --------------------------------------------------------------
+    # 로딩
+    # --------------------------------------------------------------
+    def read_partition(self, month):
+        """파티션 하나를 실제로 읽습니다 (data_preprocessed 와 같은 제외 컬럼/후처리 적용)."""
+        if month is None:
+            return self.registry.read(SOURCE)
+        return self.registry.read(partition_name(month), spec=self.spec)
+
+    def cached_partition(self, month):
+        """지문이 그대로면 메모리에 둔 파티션을 재사용합니다."""
+        fingerprint = self.fingerprint(month)
+        with self._lock:
+            memo = self._memo.get(month)
+        if memo and memo[0] == fingerprint:
+            return memo[1]
+        frame = self.read_partition(month)
+        with self._lock:
+            self._memo[month] = (fingerprint, frame)
+        return frame
+
+    def load(self, start=None, end=None, reader=None):
+        """
+        start~end 주문만 반환합니다. 겹치는 월 파티션만 읽고 경계 달은 행 단위로 자릅니다.
+        reader(월) 로 파티션 캐시를 바꿀 수 있습니다 (대시보드는 공유 파일을 붙이는 st.cache_resource 사용).
+        """
+        reader = reader or self.cached_partition
+        parts = self.partitions(start, end)
+        if not parts:  # 범위 밖: 첫 파티션(캐시)의 스키마만 가진 빈 프레임
+            return reader(self.months()[0]).iloc[:0].reset_index(drop=True)
+        frame = concat_partitions([reader(month) for month in parts])
+        if start is None and end is None:
+            return data_registry.shared_view(frame)  # 파티션 하나면 캐시 원본이므로 뷰로 반환
+        dates = frame[DATE_COL]
+        mask = pd.Series(True, index=frame.index)
+        if start is not None:
+            mask &= dates >= pd.Timestamp(start).normalize()
+        if end is not None:
+            mask &= dates < pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+        return frame[mask].reset_index(drop=True)
+
+    def date_bounds(self, reader=None):
+        """(최소 주문일, 최대 주문일). 첫/마지막 파티션만 읽습니다. 주문일이 하나도 없으면 (None, None)."""
+        reader = reader or self.cached_partition
+        parts = self.partitions()
+        first, last = reader(parts[0])[DATE_COL], reader(parts[-1])[DATE_COL]
+        if first.notna().sum() == 0 or last.notna().sum() == 0:
+            return None, None
+        return first.min(), last.max()
+
+
+# ------------------------------------------------------------------
+# 파티션 생성 / Parquet 사본
+# ------------------------------------------------------------------
+def split(data_dir=data_store.DATA_DIR, source=SOURCE):
+    """
+    data_preprocessed.csv 를 주문월 파티션으로 나눕니다 (preprocess.py 를 거치지 않은 기존 파일용).
+    값은 문자열 그대로 옮깁니다. 반환: ({월: 행 수}, 주문일이 없어 제외된 행 수)
+    """
+    orders = pd.read_csv(data_store.csv_path(source, data_dir), encoding=data_store.CSV_ENCODING,
+                         dtype=str, keep_default_na=False)
+    months = pd.to_datetime(orders[DATE_COL], errors="coerce").dt.strftime("%Y-%m")
+    counts = {}
+    for month, part in orders.groupby(months, sort=True):
+        path = partition_path(month, data_dir)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part.to_csv(path, index=False, encoding=data_store.CSV_ENCODING)
+        counts[month] = len(part)
+    return counts, int(months.isna().sum())
+
+
+def ingest(months=None, data_dir=data_store.DATA_DIR, force=False):
+    """월 파티션 CSV 를 타입이 지정된 Parquet 사본으로 변환합니다. 변환한 월 목록을 반환합니다."""
+    if not data_store.HAS_PYARROW:
+        return []
+    if months is None:
+        months = sorted(path.stem for path in partition_dir(data_dir).glob("????-??.csv"))
+    converted = []
+    for month in months:
+        name = partition_name(month)
+        if not data_store.csv_path(name, data_dir).exists():
+            continue
+        if not force and data_store.is_fresh(name, data_dir):
+            continue
+        target = data_store.columnar_path(name, data_dir)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        data_store.read_csv_typed(name, data_dir).to_parquet(target, engine="pyarrow", index=False)
+        converted.append(month)
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="주문 로그 월 파티션을 만들고 날짜 범위 조회를 확인합니다.")
+    parser.add_argument("--split", action="store_true", help="data_preprocessed.csv 로 파티션 다시 분할")
+    parser.add_argument("--force", action="store_true", help="최신 상태여도 Parquet 사본 다시 변환")
+    parser.add_argument("--start", help="조회 시작일 (YYYY-MM-DD)")
+    parser.add_argument("--end", help="조회 종료일 (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    store = OrderStore()
+    if args.split or not store.months():
+        counts, dropped = split(store.data_dir)
+        print(f"✅ {SOURCE}.csv -> 월 파티션 {len(counts)}개 ({sum(counts.values()):,}행, 주문일 누락 {dropped:,}행 제외)")
+    converted = ingest(data_dir=store.data_dir, force=args.force)
+    for month in converted:
+        print(f"✅ {partition_name(month)}.csv -> {data_store.COLUMNAR_DIR_NAME}/{partition_name(month)}.parquet")
+
+    if args.start or args.end:
+        start = time.perf_counter()
+        orders = store.load(args.start, args.end)
+        elapsed = time.perf_counter() - start
+        touched = store.partitions(args.start, args.end)
+        print(f"✅ {args.start or '처음'} ~ {args.end or '끝'}: 파티션 {len(touched)}/{len(store.months())}개 "
+              f"({', '.join(touched) or '없음'}) 읽음, {len(orders):,}행 ({elapsed * 1000:,.1f} ms)")
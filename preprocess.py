@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+preprocess.py
+주문 원본 내보내기(export) 파일 -> data_preprocessed.csv 증분 전처리 파이프라인
+
+- data/raw/*.csv (data_clustered.csv 와 같은 컬럼의 주문 내보내기) 중 지난 실행 이후
+  새로 생기거나 내용이 바뀐 파일만 읽습니다. 처리 기록은 data/.state/preprocess_manifest.json 에 남습니다.
+- 정제: 주문일 파싱, 키(주문번호/상품코드/주문일) 누락 행 제거, 금액/수량 숫자 변환.
+- 취소 차감: 결제금액(상품별)은 주문취소 금액(상품별)을, 결제금액(통합)은 부분취소금액(통합)을 더한 순액으로
+  바꾸고 주문수량은 순액 비율만큼 줄입니다. 전액 취소된 행은 제외합니다. 취소 금액 컬럼은 원본 기록으로 남깁니다.
+- 중복 제거: 주문번호+상품코드 기준으로 나중에 내보낸 행을 남깁니다 (이전 실행 결과와도 비교).
+- 파생 속성: product_attributes 조회 테이블로 등급/중량/과수/세트/이벤트 속성을 붙이고,
+  cluster 가 없는 내보내기는 저장된 클러스터 모델로 배정합니다.
+- 출력은 주문 월별 파티션(data/preprocessed/YYYY-MM.csv)으로 쓰고, 새 행이 들어온 월만 다시 씁니다.
+  data_preprocessed.csv 는 파티션 파일을 이어 붙여 만들고, 파티션은 order_store.py 가 날짜 범위 조회에 씁니다.
+
+사용법:
+    python preprocess.py                              # data/raw/ 의 새 내보내기만 처리
+    python preprocess.py --input exports/20260115.csv
+    python preprocess.py --full                       # 처리 기록을 무시하고 전체 재처리
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import clustering
+import data_store
+import order_store
+import product_attributes
+import schema
+
+OUTPUT = "data_preprocessed"
+RAW_DIR_NAME = "raw"
+STATE_PATH = data_store.DATA_DIR / ".state" / "preprocess_manifest.json"
+HASH_CHUNK_SIZE = 1 << 20
+
+KEY = ["주문번호", "상품코드"]
+NUMERIC_COLUMNS = schema.MONEY_COLUMNS + schema.QUANTITY_COLUMNS
+UNASSIGNED_CLUSTER = -1  # 클러스터 모델이 없어 배정하지 못한 행
+
+
+# ------------------------------------------------------------------
+# 처리 기록 (manifest)
+# ------------------------------------------------------------------
+def file_digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest(state_path=STATE_PATH):
+    state_path = Path(state_path)
+    if not state_path.exists():
+        return {}
+    return json.loads(state_path.read_text(encoding="utf-8"))
+
+
+def pending_files(paths, manifest):
+    """
+    처리할 파일 목록 [(경로, 해시)]. 크기/mtime 이 기록과 같으면 해시 없이 건너뛰고,
+    다르면 내용을 해시해 실제로 바뀐 파일만 남깁니다 (touch 만 된 파일은 기록만 갱신).
+    """
+    pending = []
+    for path in paths:
+        stat = path.stat()
+        entry = manifest.get(str(path))
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            continue
+        digest = file_digest(path)
+        if entry and entry["digest"] == digest:
+            entry["mtime"] = stat.st_mtime
+            continue
+        pending.append((path, digest))
+    return pending
+
+
+# ------------------------------------------------------------------
+# 정제 / 취소 차감 / 파생 속성
+# ------------------------------------------------------------------
+def read_export(path):
+    """원본 값을 그대로 다시 쓸 수 있도록 문자열로 읽습니다 (연락처 앞자리 0 등 보존)."""
+    return pd.read_csv(path, encoding=data_store.CSV_ENCODING, dtype=str, keep_default_na=False)
+
+
+def clean(orders):
+    """주문일 정규화, 키 누락 행 제거, 금액/수량 숫자 변환 (변환 불가 값은 0)."""
+    orders = orders.copy()
+    for col in orders.columns:
+        orders[col] = orders[col].str.strip()
+    order_date = pd.to_datetime(orders["주문일"], errors="coerce")
+    orders["주문일"] = order_date.dt.strftime("%Y-%m-%d %H:%M:%S")
+    orders = orders[order_date.notna() & (orders[KEY] != "").all(axis=1)]
+    for col in NUMERIC_COLUMNS:
+        if col in orders.columns:
+            orders[col] = pd.to_numeric(orders[col].str.replace(",", ""), errors="coerce").fillna(0).astype(np.int64)
+    return orders
+
+
+def net_cancellations(orders):
+    """
+    취소 금액(음수)을 결제금액에 더해 순액으로 바꿉니다.
+    주문수량은 순액/총액 비율로 줄이되 순액이 남아 있으면 최소 1개로 둡니다.
+    반환 프레임의 "_전액취소" 는 상품별 순액이 0 이하로 떨어진 행입니다.
+    """
+    orders = orders.copy()
+    gross = orders["결제금액(상품별)"]
+    cancel = orders.get("주문취소 금액(상품별)", pd.Series(0, index=orders.index))
+    net = (gross + cancel).clip(lower=0)
+    orders["_전액취소"] = (cancel != 0) & (net <= 0)
+
+    partial = (cancel != 0) & (net > 0) & (gross > 0)
+    if "주문수량" in orders.columns and partial.any():
+        qty = orders.loc[partial, "주문수량"]
+        scaled = np.round(qty * net[partial] / gross[partial]).astype(np.int64)
+        orders.loc[partial, "주문수량"] = np.maximum(scaled, 1)
+    orders["결제금액(상품별)"] = net
+    if {"결제금액(통합)", "부분취소금액(통합)"} <= set(orders.columns):
+        orders["결제금액(통합)"] = (orders["결제금액(통합)"] + orders["부분취소금액(통합)"]).clip(lower=0)
+    return orders
+
+
+def assign_clusters(orders, model_path=clustering.MODEL_PATH):
+    """cluster 컬럼이 없으면 저장된 모델로 배정합니다. 모델이 없으면 UNASSIGNED_CLUSTER. 반환: (프레임, 배정 여부)"""
+    if "cluster" in orders.columns:
+        orders["cluster"] = pd.to_numeric(orders["cluster"], errors="coerce").fillna(UNASSIGNED_CLUSTER).astype(int)
+        return orders, False
+    if not Path(model_path).exists():
+        return orders.assign(cluster=UNASSIGNED_CLUSTER), False
+    model = clustering.ClusterModel.load(model_path)
+    orders = orders.assign(cluster=model.assign(orders))
+    model.save(model_path)  # 고객별 이전 주문 이력 갱신 (이미 반영한 주문번호+상품코드는 다시 세지 않음)
+    return orders, True
+
+
+def prepare(batches):
+    """
+    내보내기 프레임 목록(오래된 순) -> 정제/취소 차감/속성까지 붙인 한 프레임.
+    같은 주문번호+상품코드가 여러 번 나오면 마지막(최신 내보내기) 행을 남깁니다.
+    """
+    orders = pd.concat([clean(batch) for batch in batches], ignore_index=True)
+    orders = orders.drop_duplicates(subset=KEY, keep="last")
+    orders = net_cancellations(orders)
+    catalog = product_attributes.AttributeCatalog.load()
+    orders = catalog.apply(orders)
+    catalog.save()
+    return orders
+
+
+# ------------------------------------------------------------------
+# 월별 파티션 출력
+# ------------------------------------------------------------------
+def merge_partition(month, orders, data_dir=data_store.DATA_DIR):
+    """기존 월 파티션과 새 행을 합쳐 다시 씁니다. 반환: 파티션 행 수."""
+    path = order_store.partition_path(month, data_dir)
+    parts = [read_export(path)] if path.exists() else []
+    parts.append(orders.astype(object).where(orders.notna(), "").astype(str))
+    merged = pd.concat(parts, ignore_index=True).fillna("")
+    merged = merged.drop_duplicates(subset=KEY, keep="last")
+    # 이전 실행에 남은 행이 이번 내보내기에서 전액 취소되었으면 함께 제외
+    cancelled = merged.pop("_전액취소") == "True"
+    merged = merged[~cancelled].sort_values(["주문일", "주문번호"], kind="stable")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    merged.to_csv(tmp, index=False, encoding=data_store.CSV_ENCODING)
+    os.replace(tmp, path)
+    return len(merged)
+
+
+def rebuild_output(data_dir=data_store.DATA_DIR):
+    """
+    월 파티션을 이어 붙여 data_preprocessed.csv 를 만듭니다.
+    헤더가 모두 같으면 파싱 없이 바이트 단위로 복사하고, 컬럼 구성이 다르면 pandas 로 맞춰 씁니다.
+    """
+    paths = sorted(order_store.partition_dir(data_dir).glob("????-??.csv"))
+    output = data_store.csv_path(OUTPUT, data_dir)
+    tmp = output.with_suffix(".tmp")
+    headers = []
+    for path in paths:
+        with open(path, encoding=data_store.CSV_ENCODING) as f:
+            headers.append(f.readline())
+    if len(set(headers)) <= 1:
+        with open(tmp, "wb") as out:
+            for i, path in enumerate(paths):
+                with open(path, "rb") as f:
+                    if i > 0:
+                        f.readline()  # BOM + 헤더는 첫 파티션에서만
+                    shutil.copyfileobj(f, out)
+    else:
+        merged = pd.concat([read_export(path) for path in paths], ignore_index=True).fillna("")
+        merged.to_csv(tmp, index=False, encoding=data_store.CSV_ENCODING)
+    os.replace(tmp, output)
+    return output
+
+
+def run(inputs=None, full=False, data_dir=data_store.DATA_DIR, state_path=STATE_PATH,
+        model_path=clustering.MODEL_PATH):
+    """
+    새 내보내기만 처리합니다.
+    반환: (처리한 파일 목록, 입력 행 수, 다시 쓴 월 {월: 파티션 행 수}, 클러스터 모델 배정 여부)
+    """
+    paths = [Path(p) for p in inputs] if inputs else sorted((Path(data_dir) / RAW_DIR_NAME).glob("*.csv"))
+    manifest = {} if full else load_manifest(state_path)
+    if full:
+        shutil.rmtree(order_store.partition_dir(data_dir), ignore_errors=True)
+        shutil.rmtree(data_store.columnar_path(order_store.partition_name("*"), data_dir).parent, ignore_errors=True)
+    pending = pending_files(paths, manifest)
+    # 나중에 내보낸 파일의 행이 우선하도록 수정 시각 순으로 처리
+    pending.sort(key=lambda item: item[0].stat().st_mtime)
+
+    rows, months, assigned = 0, {}, False
+    if pending:
+        batches = [read_export(path) for path, _ in pending]
+        rows = sum(len(batch) for batch in batches)
+        orders = prepare(batches)
+        orders, assigned = assign_clusters(orders, model_path)
+        month_of = orders["주문일"].str[:7]
+        for month, part in orders.groupby(month_of, sort=True):
+            months[month] = merge_partition(month, part, data_dir)
+        if months:
+            rebuild_output(data_dir)
+            order_store.ingest(list(months), data_dir)  # 바뀐 달만 Parquet 사본 갱신
+
+        processed_at = datetime.now().isoformat(timespec="seconds")
+        for (path, digest), batch in zip(pending, batches):
+            stat = path.stat()
+            batch_months = pd.to_datetime(batch.get("주문일"), errors="coerce").dt.strftime("%Y-%m").dropna()
+            manifest[str(path)] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "digest": digest,
+                "rows": len(batch),
+                "months": sorted(batch_months.unique().tolist()),
+                "processed_at": processed_at,
+            }
+
+    state_path = Path(state_path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return [path for path, _ in pending], rows, months, assigned
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="주문 내보내기 파일을 증분 전처리해 data_preprocessed.csv 를 만듭니다.")
+    parser.add_argument("--input", nargs="+", help="처리할 내보내기 CSV (기본: data/raw/*.csv)")
+    parser.add_argument("--full", action="store_true", help="처리 기록과 파티션을 지우고 전체 재처리")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    processed, rows, months, assigned = run(args.input, args.full)
+    elapsed = time.perf_counter() - start
+    if not processed:
+        print(f"✅ 새 내보내기 없음 ({elapsed:.2f}s)")
+    else:
+        for path in processed:
+            print(f"  📥 {path}")
+        for month, count in months.items():
+            print(f"  🗂️ {month}: {count:,}행")
+        if assigned:
+            print("  🧩 cluster 컬럼이 없는 내보내기를 저장된 모델로 배정했습니다.")
+        print(f"✅ 파일 {len(processed)}개 / {rows:,}행 처리, 월 파티션 {len(months)}개 갱신 "
+              f"-> {data_store.csv_path(OUTPUT)} ({elapsed:.2f}s)")
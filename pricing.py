@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+pricing.py
+상품별 적정 판매가 제안 규칙 (벡터 연산)
+
+규칙: CTR이 기준보다 높고 마진율이 낮은 상품은 가격 인상,
+      CTR이 기준보다 낮고 마진율이 높은 상품은 할인 이벤트를 권고합니다.
+모든 상품을 한 번의 배열 연산으로 판정하므로 SKU 수가 늘어도 선형 비용입니다.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+KEEP_PRICE = "현재가 유지"
+
+
+@dataclass(frozen=True)
+class PricingRules:
+    ctr_threshold: Optional[float] = None  # None이면 CTR 중앙값 사용
+    low_margin: float = 20.0               # 이 값 미만이면 저마진 (%)
+    high_margin: float = 40.0              # 이 값 초과면 고마진 (%)
+    raise_rate: float = 0.10               # 인상 권고 폭
+    discount_rate: float = 0.10            # 할인 권고 폭
+
+
+def build_pricing_table(df_prod_eff, df_orders):
+    """상품 효율 지표에 판매수량을 결합하고 마진액/현재마진율을 계산합니다."""
+    prod_qty = df_orders.groupby('상품코드', observed=True)['주문수량'].sum().reset_index()
+    df_pricing = pd.merge(df_prod_eff, prod_qty, on='상품코드')
+
+    df_pricing['마진액'] = df_pricing['결제금액(상품별)'] - (df_pricing['공급가'] * df_pricing['주문수량'])
+    df_pricing['현재마진율'] = (df_pricing['마진액'] / df_pricing['결제금액(상품별)']) * 100
+    return df_pricing
+
+
+def suggest_prices(df_pricing, rules=PricingRules()):
+    """모든 상품의 제안가격/판단근거를 한 번에 계산해 새 DataFrame으로 반환합니다."""
+    out = df_pricing.copy()
+    ctr = out['CTR'].to_numpy(dtype=float)
+    margin = out['현재마진율'].to_numpy(dtype=float)
+    unit_price = (out['결제금액(상품별)'] / out['주문수량']).to_numpy(dtype=float)
+
+    ctr_cut = out['CTR'].median() if rules.ctr_threshold is None else rules.ctr_threshold
+    raise_mask = (ctr > ctr_cut) & (margin < rules.low_margin)
+    discount_mask = ~raise_mask & (ctr < ctr_cut) & (margin > rules.high_margin)
+
+    out['제안단가'] = np.select(
+        [raise_mask, discount_mask],
+        [unit_price * (1 + rules.raise_rate), unit_price * (1 - rules.discount_rate)],
+        default=np.nan,
+    )
+    out['제안가격'] = KEEP_PRICE
+    out.loc[raise_mask, '제안가격'] = out.loc[raise_mask, '제안단가'].map('{:,.0f}원 (인상 권고)'.format)
+    out.loc[discount_mask, '제안가격'] = out.loc[discount_mask, '제안단가'].map('{:,.0f}원 (할인 권고)'.format)
+    out['판단근거'] = np.select(
+        [raise_mask, discount_mask],
+        ["인기 대비 저마진", "고마진 대비 저조한 유입"],
+        default="안정적 성과",
+    )
+    return out
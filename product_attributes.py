@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+product_attributes.py
+상품명에서 등급 / 중량 / 과수 / 세트(선물) / 이벤트 속성을 추출하는 엔진
+
+- 상품명은 "대표 상품명 ▶ 옵션1 (N개) ▶ 옵션2 (N개)" 형태이며 같은 상품코드라도 옵션에 따라 이름이 다릅니다.
+- 주문 행마다 파싱하지 않고 (상품코드, 상품명) 고유 조합만 미리 컴파일한 정규식으로 한 번씩 파싱해
+  조회 테이블(AttributeCatalog)에 보관한 뒤, 주문 로그에는 조인으로 붙입니다.
+  따라서 비용은 주문 건수가 아니라 상품 옵션 수에 비례합니다.
+- 옵션이 여러 개인 주문에서 옵션끼리 등급/중량/과수가 다르면 "혼합"(수치는 결측)으로 표시합니다.
+
+사용법:
+    python product_attributes.py                        # data_clustered 상품명으로 조회 테이블 생성
+    python product_attributes.py --source data_preprocessed --show 30
+"""
+
+import argparse
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import data_store
+
+KEY = ["상품코드", "상품명"]
+ATTRIBUTE_COLUMNS = ["등급", "중량", "중량_kg", "과수_최소", "과수_최대", "세트여부", "이벤트여부"]
+CATALOG_PATH = data_store.DATA_DIR / ".state" / "product_attributes.parquet"
+DEFAULT_GRADE = "일반"
+MIXED = "혼합"
+
+# ------------------------------------------------------------------
+# 추출 규칙 (모듈 로드 시 한 번만 컴파일)
+# ------------------------------------------------------------------
+OPTION_SPLIT = re.compile(r"▶")
+OPTION_COUNT = re.compile(r"\(\s*\d+\s*개\s*\)\s*$")
+ADDON = re.compile(r"^\s*추가상품")
+STAR_NOTE = re.compile(r"★[^★]*★")
+
+# 과일 크기 등급이 우선, 없으면 특상/특/상/중/대/한입 같은 단일 등급 표기, 그다음 혼합 표기
+GRADE_RULES = [
+    (re.compile(r"로얄과?"), "로얄과"),
+    (re.compile(r"중대과|중소과|대과|중과|소과"), None),  # 찾은 표기를 그대로 등급으로 사용
+    (re.compile(r"(?:^|[\[\s])(특상|특|상|중|대|한입)(?=[\]\s])"), None),
+    (re.compile(r"혼합|사이즈혼합"), MIXED),
+]
+WEIGHT = re.compile(r"(\d+(?:\.\d+)?)\s*(kg|g)(?![A-Za-z])", re.IGNORECASE)
+WEIGHT_TOTAL = re.compile(r"=\s*총?\s*(\d+(?:\.\d+)?)\s*kg", re.IGNORECASE)
+WEIGHT_PLUS = re.compile(r"(\d+(?:\.\d+)?)\s*kg[^+=]*?\+[^+=\d]*?(\d+(?:\.\d+)?)\s*kg", re.IGNORECASE)
+COUNT_RANGE = re.compile(r"(\d+)\s*[~\-]\s*(\d+)\s*(?:수|과|구)")
+COUNT_ABOUT = re.compile(r"(\d+)\s*(?:과|수|구)\s*내외")
+SET_MARKERS = re.compile(r"선물\s*세트|세트|선물|보자기|부직포")
+EVENT_MARKERS = re.compile(r"추가\s*발송|주문\s*시.*?발송|초특가|특가|한정|서비스|증정|사은품|이벤트|1\s*\+\s*1|할인")
+
+
+def split_options(name):
+    """(대표 상품명, [옵션 문자열...]). 옵션 끝의 수량 표기 "(N개)" 는 제거합니다."""
+    parts = OPTION_SPLIT.split(name)
+    return parts[0].strip(), [OPTION_COUNT.sub("", part).strip() for part in parts[1:]]
+
+
+def parse_grade(text):
+    for pattern, label in GRADE_RULES:
+        match = pattern.search(text)
+        if match:
+            return label or match.group(match.lastindex or 0)
+    return None
+
+
+def parse_weight(text):
+    """명목 중량(kg). "A+B=총 C kg" 은 C, "A kg + B kg" 은 합계, 그 외에는 처음 나온 중량."""
+    text = STAR_NOTE.sub(" ", text)
+    match = WEIGHT_TOTAL.search(text)
+    if match:
+        return float(match.group(1))
+    match = WEIGHT_PLUS.search(text)
+    if match:
+        return float(match.group(1)) + float(match.group(2))
+    match = WEIGHT.search(text)
+    if match:
+        value = float(match.group(1))
+        return value / 1000 if match.group(2).lower() == "g" else value
+    return None
+
+
+def parse_count(text):
+    """과수 범위 (최소, 최대). "15~22수", "8-13과", "25과 내외" 형식."""
+    match = COUNT_RANGE.search(text)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    match = COUNT_ABOUT.search(text)
+    if match:
+        return int(match.group(1)), int(match.group(1))
+    return None
+
+
+def _agree(values):
+    """옵션별 값이 모두 같으면 그 값, 다르면 MIXED, 모두 없으면 None."""
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return values[0] if all(v == values[0] for v in values) else MIXED
+
+
+def _weight_label(kg):
+    return f"{kg:g}kg" if kg is not None else None
+
+
+def parse_name(name):
+    """상품명 하나 -> 속성 dict."""
+    title, options = split_options(str(name))
+    # 추가상품(포장 등) 옵션은 세트 여부에만 반영하고 등급/중량 판단에서는 제외
+    main = [opt for opt in options if not ADDON.search(opt)] or ([title] if not options else [])
+    scope = " ".join(options) if options else title
+
+    grade = _agree([parse_grade(opt) for opt in main])
+    weight = _agree([parse_weight(opt) for opt in main])
+    count = _agree([parse_count(opt) for opt in main])
+    weight_kg = weight if weight not in (None, MIXED) else None
+    count_min, count_max = count if count not in (None, MIXED) else (None, None)
+    return {
+        "등급": grade or DEFAULT_GRADE,
+        "중량": MIXED if weight == MIXED else _weight_label(weight_kg),
+        "중량_kg": weight_kg,
+        "과수_최소": count_min,
+        "과수_최대": count_max,
+        "세트여부": int(bool(SET_MARKERS.search(scope))),
+        "이벤트여부": int(bool(EVENT_MARKERS.search(str(name)))),
+    }
+
+
+# ------------------------------------------------------------------
+# 조회 테이블 (상품코드, 상품명) -> 속성
+# ------------------------------------------------------------------
+def _typed(table):
+    table = table.copy()
+    for col in ["상품코드", "상품명", "등급", "중량"]:
+        table[col] = table[col].astype("category")
+    table["중량_kg"] = table["중량_kg"].astype("float32")
+    for col in ["과수_최소", "과수_최대"]:
+        table[col] = table[col].astype("Int16")
+    for col in ["세트여부", "이벤트여부"]:
+        table[col] = table[col].astype(np.int8)
+    return table
+
+
+class AttributeCatalog:
+    """(상품코드, 상품명) 별 파싱 결과를 보관하고, 처음 보는 조합만 새로 파싱합니다."""
+
+    def __init__(self, table=None):
+        self.table = _typed(table) if table is not None else _typed(pd.DataFrame(columns=KEY + ATTRIBUTE_COLUMNS))
+        self.parsed = 0  # 마지막 update 에서 새로 파싱한 조합 수
+
+    def update(self, orders):
+        """주문 로그의 (상품코드, 상품명) 고유 조합 중 처음 보는 것만 파싱해 테이블에 추가합니다."""
+        keys = orders[KEY].astype(str).drop_duplicates()
+        known = pd.MultiIndex.from_frame(self.table[KEY].astype(str))
+        new = keys[~pd.MultiIndex.from_frame(keys).isin(known)]
+        self.parsed = len(new)
+        if not new.empty:
+            parsed = pd.DataFrame([parse_name(name) for name in new["상품명"]], index=new.index)
+            rows = pd.concat([new, parsed], axis=1)
+            table = pd.concat([self.table.astype({"상품코드": str, "상품명": str, "등급": str, "중량": object}), rows],
+                              ignore_index=True)
+            self.table = _typed(table)
+        return self
+
+    def apply(self, orders, overwrite=True):
+        """주문 로그에 속성 컬럼을 조인합니다 (행 순서 유지). overwrite=False 면 이미 있는 속성 컬럼은 유지합니다."""
+        self.update(orders)
+        columns = [col for col in ATTRIBUTE_COLUMNS if overwrite or col not in orders.columns]
+        if not columns:
+            return orders
+        lookup = self.table.set_index(pd.MultiIndex.from_frame(self.table[KEY].astype(str)))[columns]
+        positions = lookup.index.get_indexer(pd.MultiIndex.from_frame(orders[KEY].astype(str)))
+        joined = lookup.iloc[positions].set_axis(orders.index)
+        return pd.concat([orders.drop(columns=columns, errors="ignore"), joined], axis=1)
+
+    def save(self, path=CATALOG_PATH):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.table.to_parquet(path, index=False)
+        return path
+
+    @classmethod
+    def load(cls, path=CATALOG_PATH):
+        path = Path(path)
+        return cls(pd.read_parquet(path)) if path.exists() else cls()
+
+
+def ensure_attributes(orders):
+    """속성 컬럼이 없는 주문 로그(이전 전처리 결과 등)에만 속성을 채웁니다. DatasetSpec.postprocess 용."""
+    if orders.empty or not set(KEY) <= set(orders.columns) or set(ATTRIBUTE_COLUMNS) <= set(orders.columns):
+        return orders
+    return AttributeCatalog().apply(orders, overwrite=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="상품명에서 등급/중량/과수/세트/이벤트 속성 조회 테이블을 만듭니다.")
+    parser.add_argument("--source", default="data_clustered", help="상품명을 읽을 주문 로그 데이터셋")
+    parser.add_argument("--show", type=int, default=20, help="출력할 행 수")
+    args = parser.parse_args()
+
+    orders = pd.read_csv(data_store.csv_path(args.source), encoding=data_store.CSV_ENCODING,
+                         usecols=KEY, dtype=str)
+    catalog = AttributeCatalog.load()
+    catalog.update(orders)
+    path = catalog.save()
+    pd.set_option("display.width", 200)
+    print(catalog.table.head(args.show).to_string(index=False))
+    print(f"✅ 주문 {len(orders):,}행 / 고유 상품명 {orders['상품명'].nunique():,}개 -> "
+          f"새로 파싱 {catalog.parsed:,}개, 조회 테이블 {len(catalog.table):,}행 ({path})")
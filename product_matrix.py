@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+product_matrix.py
+CTR/RPC 4분면 상품 전략 분류기 (벡터 연산)
+
+분할 기준은 중앙값, 임의 분위수, 가중 중앙값(예: 조회수 가중) 중에서 선택할 수 있습니다.
+분류 결과는 원본 상품 효율 테이블을 수정하지 않고 별도의 읽기 전용 테이블과
+분류별 위치 색인으로 반환됩니다.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+STAR = "🌟 Star (주력 모델)"
+OPPORTUNITY = "💡 Opportunity (기회 상품)"
+CASH_COW = "💰 Cash Cow (수익 상품)"
+UNDERPERFORM = "⚠️ Underperform (개선 필요)"
+
+CLASS_COLORS = {
+    STAR: "#2ecc71",
+    OPPORTUNITY: "#3498db",
+    CASH_COW: "#f1c40f",
+    UNDERPERFORM: "#e74c3c",
+}
+
+SPLIT_METHODS = ("median", "quantile", "weighted_median")
+
+
+@dataclass(frozen=True)
+class SplitSettings:
+    method: str = "median"      # "median" | "quantile" | "weighted_median"
+    quantile: float = 0.5       # quantile / weighted_median 에서 사용할 분위
+    weight_col: str = "조회수"  # weighted_median 가중치 컬럼
+
+
+@dataclass(frozen=True)
+class ProductMatrix:
+    labels: pd.Series           # 원본 행 순서와 같은 전략분류 라벨
+    ctr_split: float
+    rpc_split: float
+    members: dict = field(default_factory=dict)  # 분류 -> 위치 배열
+
+    def rows(self, df, label):
+        """선택한 분류에 해당하는 df의 행 (재분류 없이 미리 계산된 색인 사용)."""
+        return df.iloc[self.members.get(label, np.empty(0, dtype=np.int64))]
+
+
+def weighted_quantile(values, weights, q=0.5):
+    """가중 분위수 (q=0.5면 가중 중앙값)."""
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    order = np.argsort(values)
+    cum = np.cumsum(weights[order])
+    if cum.size == 0 or cum[-1] <= 0:
+        return float(np.quantile(values, q)) if values.size else np.nan
+    idx = int(np.searchsorted(cum, q * cum[-1], side="left"))
+    return float(values[order][min(idx, values.size - 1)])
+
+
+def split_point(df, col, settings=SplitSettings()):
+    if settings.method == "median":
+        return float(df[col].median())
+    if settings.method == "quantile":
+        return float(df[col].quantile(settings.quantile))
+    if settings.method == "weighted_median":
+        return weighted_quantile(df[col], df[settings.weight_col].fillna(0), settings.quantile)
+    raise ValueError(f"지원하지 않는 분할 기준입니다: {settings.method}")
+
+
+def classify_products(df_prod_eff, settings=SplitSettings()):
+    """CTR/RPC 4분면 분류를 한 번의 배열 연산으로 계산합니다."""
+    ctr_split = split_point(df_prod_eff, "CTR", settings)
+    rpc_split = split_point(df_prod_eff, "RPC", settings)
+
+    high_ctr = df_prod_eff["CTR"].to_numpy() >= ctr_split
+    high_rpc = df_prod_eff["RPC"].to_numpy() >= rpc_split
+    labels = np.select(
+        [high_ctr & high_rpc, high_ctr & ~high_rpc, ~high_ctr & high_rpc],
+        [STAR, OPPORTUNITY, CASH_COW],
+        default=UNDERPERFORM,
+    )
+
+    members = {}
+    for label in pd.unique(labels):
+        positions = np.flatnonzero(labels == label)
+        positions.setflags(write=False)
+        members[str(label)] = positions
+
+    return ProductMatrix(
+        labels=pd.Series(labels, index=df_prod_eff.index, name="전략분류"),
+        ctr_split=ctr_split,
+        rpc_split=rpc_split,
+        members=members,
+    )
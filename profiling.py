@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+profiling.py
+대시보드 실행(rerun) 단위 구간 계측과 기록
+
+- RunProfile: 한 번의 실행에서 데이터 로딩/집계/차트 생성 구간(section)과
+  페이지 구간 경계(lap) 사이의 소요 시간을 기록합니다. 선택적으로 cProfile 을 함께 수집합니다.
+- Profiler: 세션 간 공유. 최근 실행 기록을 메모리에 보관하고 실행마다 JSONL 로그에 한 줄씩 추가합니다.
+- 로그 요약 CLI 로 구간별 평균/p95 추이를 확인할 수 있습니다.
+
+사용법:
+    python profiling.py                              # logs/rerun_timings.jsonl 구간별 요약
+    python profiling.py --since 2026-10-01 --page "👑 경영 요약"
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import pstats
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+LOG_PATH = Path("logs") / "rerun_timings.jsonl"
+HISTORY = 50          # 메모리에 보관할 최근 실행 수
+PROFILE_LINES = 40    # cProfile 텍스트 요약 줄 수
+
+
+class RunProfile:
+    """한 번의 실행(rerun) 계측 기록."""
+
+    def __init__(self, page=None, cprofile=False):
+        self.page = page
+        self.started_at = datetime.now()
+        self.records = []  # (종류, 이름, 초)
+        self.total = None
+        self._start = time.perf_counter()
+        self._lap = None   # (이름, 시작 시각)
+        self._cprofile = None
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    @contextmanager
+    def section(self, name, kind="작업"):
+        """with 블록 소요 시간을 기록합니다 (데이터 로딩, 집계, 차트 생성 등)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append((kind, name, time.perf_counter() - start))
+
+    def call(self, name, func, *args, kind="작업", **kwargs):
+        """func(*args, **kwargs) 를 name 구간으로 계측해 실행합니다 (lambda 안에서 쓰기 위한 형태)."""
+        with self.section(name, kind):
+            return func(*args, **kwargs)
+
+    def lap(self, name):
+        """이전 구간을 닫고 name 구간을 시작합니다. 구간 시간에는 그 안의 작업 시간이 포함됩니다."""
+        now = time.perf_counter()
+        if self._lap is not None:
+            self.records.append(("구간", self._lap[0], now - self._lap[1]))
+        self._lap = (name, now)
+
+    def finish(self):
+        if self.total is not None:
+            return self
+        self.lap(None)
+        self._lap = None
+        self.total = time.perf_counter() - self._start
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        return self
+
+    # --------------------------------------------------------------
+    # 조회/출력
+    # --------------------------------------------------------------
+    def frame(self):
+        """구간별 소요 시간 표 (종류, 이름, ms)."""
+        return pd.DataFrame(
+            [(kind, name, seconds * 1000) for kind, name, seconds in self.records],
+            columns=["종류", "이름", "ms"],
+        )
+
+    def to_dict(self, **extra):
+        return {
+            "ts": self.started_at.isoformat(timespec="seconds"),
+            "page": self.page,
+            "total_ms": round((self.total or 0.0) * 1000, 3),
+            "sections": [
+                {"kind": kind, "name": name, "ms": round(seconds * 1000, 3)}
+                for kind, name, seconds in self.records
+            ],
+            **extra,
+        }
+
+    @property
+    def profiled(self):
+        return self._cprofile is not None
+
+    def profile_text(self, sort="cumulative", lines=PROFILE_LINES):
+        stream = io.StringIO()
+        pstats.Stats(self._cprofile, stream=stream).sort_stats(sort).print_stats(lines)
+        return stream.getvalue()
+
+    def profile_bytes(self):
+        """pstats 바이너리 (snakeviz, python -m pstats 등으로 열 수 있는 .prof)."""
+        with tempfile.NamedTemporaryFile(suffix=".prof", delete=False) as f:
+            path = Path(f.name)
+        try:
+            self._cprofile.dump_stats(path)
+            return path.read_bytes()
+        finally:
+            path.unlink(missing_ok=True)
+
+
+class Profiler:
+    """세션 간 공유 실행 기록 (최근 실행 + JSONL 로그)."""
+
+    def __init__(self, log_path=LOG_PATH, history=HISTORY):
+        self.log_path = Path(log_path) if log_path else None
+        self._history = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def start(self, page=None, cprofile=False):
+        return RunProfile(page, cprofile)
+
+    def finish(self, run, **extra):
+        """실행을 마치고 기록합니다. extra 는 로그에 함께 남길 값 (재로딩 데이터셋 등)."""
+        record = run.finish().to_dict(**extra)
+        with self._lock:
+            self._history.append(record)
+            if self.log_path is not None:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
+
+    def last(self, page=None):
+        """가장 최근 실행 기록 (page 를 주면 해당 페이지 중 최근)."""
+        with self._lock:
+            for record in reversed(self._history):
+                if page is None or record["page"] == page:
+                    return record
+        return None
+
+    def history(self, page=None):
+        """메모리에 보관된 최근 실행 기록 (page 를 주면 해당 페이지만)."""
+        with self._lock:
+            return [record for record in self._history if page is None or record["page"] == page]
+
+
+# ------------------------------------------------------------------
+# 기록 요약
+# ------------------------------------------------------------------
+def sections_frame(records):
+    """실행 기록 목록 -> 구간 단위 긴 표 (ts, page, 종류, 이름, ms). 전체 시간은 종류 '전체' 로 포함."""
+    rows = []
+    for record in records:
+        rows.append((record["ts"], record["page"], "전체", "전체", record["total_ms"]))
+        rows.extend((record["ts"], record["page"], s["kind"], s["name"], s["ms"]) for s in record["sections"])
+    frame = pd.DataFrame(rows, columns=["ts", "page", "종류", "이름", "ms"])
+    frame["ts"] = pd.to_datetime(frame["ts"])
+    return frame
+
+
+def summarize(frame):
+    """(페이지, 종류, 이름) 별 실행 수 / 평균 / p95 / 최대 (ms)."""
+    if frame.empty:
+        return pd.DataFrame(columns=["page", "종류", "이름", "실행 수", "평균 ms", "p95 ms", "최대 ms"])
+    grouped = frame.groupby(["page", "종류", "이름"], dropna=False)["ms"]
+    summary = pd.DataFrame({
+        "실행 수": grouped.size(),
+        "평균 ms": grouped.mean(),
+        "p95 ms": grouped.quantile(0.95),
+        "최대 ms": grouped.max(),
+    }).reset_index()
+    return summary.sort_values(["page", "평균 ms"], ascending=[True, False]).reset_index(drop=True)
+
+
+def read_log(path=LOG_PATH):
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="대시보드 실행 구간 로그를 요약합니다.")
+    parser.add_argument("--log", default=str(LOG_PATH), help="JSONL 로그 경로")
+    parser.add_argument("--since", help="이 시각 이후 실행만 (YYYY-MM-DD[ HH:MM])")
+    parser.add_argument("--page", help="페이지 라벨")
+    args = parser.parse_args()
+
+    frame = sections_frame(read_log(args.log))
+    if args.since:
+        frame = frame[frame["ts"] >= pd.Timestamp(args.since)]
+    if args.page:
+        frame = frame[frame["page"] == args.page]
+    summary = summarize(frame)
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:,.1f}") if not summary.empty else "기록 없음")
+    runs = int((frame["종류"] == "전체").sum()) if not frame.empty else 0
+    print(f"✅ 실행 {runs:,}회 요약 ({args.log})")
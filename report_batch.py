@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+report_batch.py
+대시보드 산출물 일괄 생성 (Streamlit 서버 없이 실행하는 야간 배치용)
+
+페이지 집계(aggregates.PAGES)와 가격 제안, 전략 매트릭스, 이상 징후, 매출 예측, 엑셀 리포트를
+산출물 단위로 나누어 프로세스 풀에서 병렬로 계산하고 출력 폴더에 저장합니다.
+각 작업은 자신이 쓰는 데이터셋만 읽으며, 페이지 집계는 aggregates.py 디스크 캐시를 함께 채워
+이후 대시보드 접속 시 같은 데이터 버전의 집계를 다시 계산하지 않습니다.
+
+출력 구조 (산출물 ID 별 폴더):
+    <출력 폴더>/<산출물>/<표 이름>.csv     DataFrame / Series
+    <출력 폴더>/<산출물>/kpis.json         수치/목록 지표
+    <출력 폴더>/<산출물>/<차트 이름>.html  Plotly 차트 (plotly.js 는 CDN 참조)
+    <출력 폴더>/Management_Report.xlsx     경영 분석 엑셀 리포트
+
+사용법:
+    python report_batch.py                               # reports/<오늘 날짜>/ 에 전체 생성
+    python report_batch.py --only executive anomaly --workers 2
+    python report_batch.py --output-dir /tmp/nightly --no-charts
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+import aggregates
+import anomaly
+import chart_data
+import data_registry
+import forecasting
+import pricing
+import product_matrix
+import report_export
+
+OUTPUT_DIR = Path("reports")
+CSV_ENCODING = "utf-8-sig"  # 엑셀에서 바로 열 수 있도록 BOM 포함
+EXCEL_NAME = "Management_Report.xlsx"
+
+
+# ------------------------------------------------------------------
+# 페이지 집계 외 산출물 (frames -> 결과 dict)
+# ------------------------------------------------------------------
+def pricing_output(frames):
+    df_pricing = pricing.build_pricing_table(frames["analysis_product_efficiency"], frames["data_clustered"])
+    return {"df_pricing": pricing.suggest_prices(df_pricing, pricing.PricingRules())}
+
+
+def matrix_output(frames):
+    df_prod_eff = frames["analysis_product_efficiency"]
+    matrix = product_matrix.classify_products(df_prod_eff)
+    return {
+        "df_matrix": df_prod_eff.assign(전략분류=matrix.labels),
+        "ctr_split": matrix.ctr_split,
+        "rpc_split": matrix.rpc_split,
+    }
+
+
+def anomaly_output(frames):
+    monitor = anomaly.AnomalyMonitor()
+    for (metric, key), series in anomaly.build_feeds(frames).items():
+        monitor.observe_series(metric, key, series)
+    latest = {
+        metric: monitor.latest(metric)
+        for metric in ["매출", "주문건수", "DAU", "PV"]
+    }
+    return {
+        "latest_status": pd.DataFrame([{"지표": metric, **entry} for metric, entry in latest.items() if entry]),
+        "alerts": monitor.alerts(),
+    }
+
+
+def forecast_output(frames, method="ets"):
+    sales_series = forecasting.daily_series(frames["daily_cube"][["주문일", "결제금액(상품별)"]])
+    return {
+        "df_forecast": forecasting.fit_forecast(sales_series, method),
+        "recent_sales": sales_series.tail(30),
+    }
+
+
+# 산출물 ID -> (라벨, 계산 함수). 페이지 집계는 aggregates.PAGES 를 그대로 사용합니다.
+EXTRA_OUTPUTS = {
+    "pricing": ("💲 가격 제안", pricing_output),
+    "matrix": ("🎯 전략적 상품 매트릭스", matrix_output),
+    "anomaly": ("🚨 이상 징후", anomaly_output),
+    "forecast": ("🔮 매출 예측", forecast_output),
+}
+OUTPUTS = {**{page_id: label for page_id, (label, _) in aggregates.PAGES.items()},
+           **{output_id: label for output_id, (label, _) in EXTRA_OUTPUTS.items()},
+           "excel": "📥 경영 분석 엑셀"}
+
+
+# ------------------------------------------------------------------
+# 차트 (결과 dict -> plotly Figure)
+# ------------------------------------------------------------------
+CHARTS = {
+    "executive": {
+        "daily_sales": lambda r: px.line(r["daily_sales"], x="주문일", y="결제금액(상품별)", title="일별 매출 추이"),
+    },
+    "overview": {
+        "daily_orders": lambda r: px.line(r["daily_orders"], x="날짜", y=["주문건수", "매출액"], title="일별 주문 추이"),
+        "channel_dist": lambda r: px.pie(values=r["channel_dist"].values, names=r["channel_dist"].index,
+                                         title="주문 경로별 비중"),
+    },
+    "eda": {
+        "payment_hist": lambda r: chart_data.histogram_figure(r["payment_hist"], "결제금액 분포", "결제금액(상품별)"),
+        "quantity_box": lambda r: chart_data.box_figure(r["quantity_box"], "주문수량 분포", y_title="주문수량"),
+    },
+    "clustering": {
+        "scatter_bins": lambda r: chart_data.binned_scatter_figure(
+            r["scatter_bins"], "주문수량", "결제금액(상품별)", "cluster", "클러스터별 주문 분포"),
+        "amount_box": lambda r: chart_data.box_figure(r["amount_box"], "클러스터별 결제금액", "cluster", "결제금액(상품별)"),
+    },
+    "marketing": {
+        "pv_vs_sales": lambda r: px.scatter(r["df_marketing_sales"], x="PV", y="매출액", title="PV 대비 매출액"),
+    },
+    "attributes": {
+        "grade_revenue": lambda r: px.bar(r["df_grade"], x="등급", y="결제금액(상품별)", title="등급별 매출"),
+    },
+    "matrix": {
+        "product_matrix": lambda r: px.scatter(
+            r["df_matrix"], x="CTR", y="RPC", color="전략분류", hover_name="상품명",
+            color_discrete_map=product_matrix.CLASS_COLORS, title="CTR/RPC 전략 매트릭스"),
+    },
+    "forecast": {
+        "forecast": lambda r: forecasting.forecast_figure(r["recent_sales"], r["df_forecast"]),
+    },
+}
+
+
+# ------------------------------------------------------------------
+# 저장
+# ------------------------------------------------------------------
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, pd.Period)):
+        return str(value)
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def write_result(result, out_dir):
+    """표는 CSV, 나머지 값은 kpis.json 으로 저장하고 저장한 파일 수를 반환합니다."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    kpis, written = {}, 0
+    for name, value in result.items():
+        if isinstance(value, pd.DataFrame):
+            value.to_csv(out_dir / f"{name}.csv", encoding=CSV_ENCODING,
+                         index=not isinstance(value.index, pd.RangeIndex))
+            written += 1
+        elif isinstance(value, pd.Series):
+            value.to_frame().to_csv(out_dir / f"{name}.csv", encoding=CSV_ENCODING)
+            written += 1
+        elif isinstance(value, (list, tuple)):
+            kpis[name] = [_json_value(v) if not isinstance(v, (list, tuple)) else [_json_value(x) for x in v]
+                          for v in value]
+        elif value is None or np.isscalar(value):
+            kpis[name] = _json_value(value)
+    if kpis:
+        (out_dir / "kpis.json").write_text(json.dumps(kpis, ensure_ascii=False, indent=2), encoding="utf-8")
+        written += 1
+    return written
+
+
+def write_charts(output_id, result, out_dir):
+    written = 0
+    for name, build in CHARTS.get(output_id, {}).items():
+        build(result).write_html(out_dir / f"{name}.html", include_plotlyjs="cdn")
+        written += 1
+    return written
+
+
+# ------------------------------------------------------------------
+# 작업 단위 (프로세스마다 자신의 데이터셋만 읽습니다)
+# ------------------------------------------------------------------
+def page_result(registry, frames, page_id):
+    """aggregates 디스크 캐시에 같은 데이터 버전 집계가 있으면 재사용하고, 없으면 계산해 저장합니다."""
+    cache = aggregates.AggregateCache()
+    version = aggregates.page_version(registry, page_id)
+    result = cache.get(version, page_id)
+    if result is None:
+        result = aggregates.PAGES[page_id][1](frames)
+        cache.put(version, page_id, result, persist=True)
+    return result
+
+
+def render(task):
+    """산출물 하나를 계산/저장하고 (산출물 ID, 소요 시간 또는 예외, 파일 수) 를 반환합니다."""
+    output_id, out_dir, charts, method = task
+    start = time.perf_counter()
+    try:
+        registry = data_registry.DatasetRegistry()
+        frames = aggregates.add_derived(aggregates.load_frames(registry))
+        if output_id == "excel":
+            written = len(report_export.write_report(out_dir / EXCEL_NAME, report_export.default_sheets(frames)))
+        else:
+            if output_id in aggregates.PAGES:
+                result = page_result(registry, frames, output_id)
+            elif output_id == "forecast":
+                result = forecast_output(frames, method)
+            else:
+                result = EXTRA_OUTPUTS[output_id][1](frames)
+            written = write_result(result, out_dir / output_id)
+            if charts and result:
+                written += write_charts(output_id, result, out_dir / output_id)
+    except Exception as exc:  # 데이터 누락 등은 해당 산출물만 실패로 보고
+        return output_id, exc, 0
+    return output_id, time.perf_counter() - start, written
+
+
+def default_output_dir():
+    return OUTPUT_DIR / pd.Timestamp.now().strftime("%Y%m%d")
+
+
+def run(output_ids=None, out_dir=None, workers=None, charts=True, method="ets"):
+    """산출물을 병렬로 생성하고 {산출물 ID: (소요 시간 또는 예외, 파일 수)} 를 반환합니다."""
+    output_ids = list(OUTPUTS) if not output_ids else output_ids
+    out_dir = Path(out_dir) if out_dir else default_output_dir()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [(output_id, out_dir, charts, method) for output_id in output_ids]
+    if workers == 1 or len(tasks) <= 1:
+        outputs = [render(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(render, tasks))
+    return {output_id: (result, written) for output_id, result, written in outputs}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="대시보드 산출물(표, 지표, 차트, 엑셀)을 일괄 생성합니다.")
+    parser.add_argument("--output-dir", help="출력 폴더 (기본: reports/<오늘 날짜>)")
+    parser.add_argument("--only", nargs="+", choices=list(OUTPUTS), help="생성할 산출물 ID")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="프로세스 수 (1이면 순차 실행)")
+    parser.add_argument("--method", choices=forecasting.METHODS, default="ets", help="매출 예측 모델")
+    parser.add_argument("--no-charts", action="store_true", help="HTML 차트 생략")
+    args = parser.parse_args()
+
+    out_dir = Path(args.output_dir) if args.output_dir else default_output_dir()
+    start = time.perf_counter()
+    report = run(args.only, out_dir, args.workers, not args.no_charts, args.method)
+    for output_id, (result, written) in report.items():
+        if isinstance(result, FileNotFoundError):
+            print(f"  🚨 {OUTPUTS[output_id]}: 데이터 파일 누락 ({result})")
+        elif isinstance(result, Exception):
+            print(f"  ⚠️ {OUTPUTS[output_id]}: 실패 ({result!r})")
+        else:
+            print(f"  ✅ {OUTPUTS[output_id]}: 파일 {written}개, {result * 1000:,.1f} ms")
+    print(f"✅ 산출물 {len(report)}개 -> {out_dir} ({time.perf_counter() - start:.2f}s)")
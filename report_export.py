@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+report_export.py
+경영 분석 엑셀 리포트 생성기 (xlsxwriter constant_memory 스트리밍)
+
+- 시트 내용은 {시트 이름: DataFrame 을 반환하는 함수} 로 받아 필요할 때만 계산합니다.
+- 경영 분석 리포트의 시트 구성은 default_sheets 한 곳에서 정의하고, 대시보드 다운로드/CLI/야간 배치가 함께 씁니다.
+- xlsxwriter 의 constant_memory 모드로 행 단위로 기록하므로 워크북 전체를 메모리에 올리지 않습니다.
+- 완성된 파일은 data/.cache/reports/ 에 데이터 버전(+설정) 키로 저장해 두고,
+  같은 버전의 다운로드 요청에는 파일을 그대로 돌려줍니다.
+
+사용법:
+    python report_export.py                          # 기본 가격 규칙으로 리포트 생성
+    python report_export.py --output report.xlsx
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+import aggregates
+import pricing
+
+CACHE_DIR = Path("data") / ".cache" / "reports"
+ROW_CHUNK = 5000       # DataFrame -> Python 값 변환 단위 (행)
+MAX_SHEET_NAME = 31    # 엑셀 시트 이름 최대 길이
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+REPORT_DATASETS = ["data_preprocessed", "data_clustered", "analysis_product_efficiency", "analysis_ltv"]
+
+
+# ------------------------------------------------------------------
+# 경영 분석 리포트 시트 구성
+# ------------------------------------------------------------------
+def default_sheets(frames, rules=None, pricing_table=None, cluster_stats=None):
+    """
+    {시트 이름: DataFrame 을 반환하는 함수}. frames 는 aggregates.add_derived 를 거친 프레임 묶음입니다.
+    pricing_table / cluster_stats 에 인자 없는 함수를 주면 이미 캐시된 가격 제안표 / 클러스터 통계를 씁니다.
+    """
+    rules = rules or pricing.PricingRules()
+    pricing_table = pricing_table or (lambda: pricing.suggest_prices(
+        pricing.build_pricing_table(frames["analysis_product_efficiency"], frames["data_clustered"]), rules))
+    cluster_stats = cluster_stats or (lambda: aggregates.clustering(frames)["cluster_stats"])
+    return {
+        "상품효율및가격제안": pricing_table,
+        "일별매출현황": lambda: frames["daily_cube"][["주문일", "결제금액(상품별)"]],
+        "마케팅효율지표": lambda: frames["analysis_product_efficiency"],
+        "클러스터통계": lambda: cluster_stats().reset_index(),
+        "고객LTV": lambda: frames["analysis_ltv"],
+    }
+
+
+def report_version(registry, rules=None):
+    """ReportCache 키: (리포트 데이터셋 버전, 가격 규칙)"""
+    return registry.version(*REPORT_DATASETS), rules or pricing.PricingRules()
+
+
+def _rows(df):
+    """DataFrame 행을 청크 단위로 Python 값 리스트로 변환 (결측치는 None -> 빈 셀)."""
+    for start in range(0, len(df), ROW_CHUNK):
+        block = df.iloc[start:start + ROW_CHUNK].astype(object)
+        yield from block.where(block.notna(), None).to_numpy().tolist()
+
+
+def write_sheet(workbook, name, df, header_format=None):
+    """DataFrame 하나를 시트로 기록합니다. constant_memory 모드이므로 반드시 위에서 아래로 씁니다."""
+    worksheet = workbook.add_worksheet(name[:MAX_SHEET_NAME])
+    worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+    for row, values in enumerate(_rows(df), start=1):
+        for col, value in enumerate(values):
+            if value is None:
+                continue
+            if isinstance(value, np.generic):
+                value = value.item()
+            if isinstance(value, (str, int, float, pd.Timestamp)):
+                worksheet.write(row, col, value)
+            else:
+                worksheet.write(row, col, str(value))  # 범주형/기타 객체
+    if len(df.columns):
+        worksheet.freeze_panes(1, 0)
+    return worksheet
+
+
+def write_report(target, sheets):
+    """
+    sheets: {시트 이름: DataFrame 또는 DataFrame 을 반환하는 함수}
+    비어 있는 시트(선택 데이터셋 누락 등)는 건너뜁니다. 기록한 시트 이름 목록을 반환합니다.
+    """
+    workbook = xlsxwriter.Workbook(str(target), {
+        "constant_memory": True,
+        "default_date_format": "yyyy-mm-dd",
+        "strings_to_numbers": False,
+    })
+    header_format = workbook.add_format({"bold": True, "bg_color": "#1e3c72", "font_color": "white"})
+    written = []
+    try:
+        for name, source in sheets.items():
+            df = source() if callable(source) else source
+            if df is None or df.empty:
+                continue
+            write_sheet(workbook, name, df, header_format)
+            written.append(name)
+        if not written:
+            workbook.add_worksheet("요약").write(0, 0, "출력할 데이터가 없습니다.")
+    finally:
+        workbook.close()
+    return written
+
+
+class ReportCache:
+    """(데이터 버전, 설정) -> 완성된 xlsx 파일. 오래된 파일은 max_files 개를 넘으면 삭제합니다."""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_files=8):
+        self.cache_dir = Path(cache_dir)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def path(self, version):
+        digest = hashlib.blake2b(repr(version).encode("utf-8"), digest_size=8).hexdigest()
+        return self.cache_dir / f"report_{digest}.xlsx"
+
+    def get_or_build(self, version, sheets):
+        """캐시된 리포트 파일 경로를 반환합니다. 없으면 sheets 로 새로 만듭니다."""
+        path = self.path(version)
+        with self._lock:
+            if path.exists():
+                return path
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # 프로세스/스레드별 임시 파일에 쓰고 교체하므로 여러 워커가 동시에 만들어도 서로 덮어쓰지 않습니다.
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                write_report(tmp, sheets)
+                os.replace(tmp, path)
+            finally:
+                tmp.unlink(missing_ok=True)
+            self._prune()
+        return path
+
+    def read_bytes(self, version, sheets):
+        return self.get_or_build(version, sheets).read_bytes()
+
+    def _prune(self):
+        files = sorted(self.cache_dir.glob("report_*.xlsx"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for old in files[self.max_files:]:
+            old.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    import data_registry
+
+    parser = argparse.ArgumentParser(description="경영 분석 엑셀 리포트를 생성합니다.")
+    parser.add_argument("--output", help="저장할 파일 경로 (기본: 캐시 경로만 출력)")
+    args = parser.parse_args()
+
+    registry = data_registry.DatasetRegistry()
+    frames = aggregates.add_derived(aggregates.load_frames(registry))
+    path = ReportCache().get_or_build(report_version(registry), default_sheets(frames))
+    if args.output:
+        shutil.copyfile(path, args.output)
+        path = Path(args.output)
+    print(f"✅ 리포트 생성 -> {path} ({path.stat().st_size / 2**10:,.1f} KB)")
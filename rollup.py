@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+rollup.py
+주문 로그를 일자 x 주문경로 x 결제방법 x 상품코드 x 클러스터 단위로 미리 집계한 매출 큐브
+
+큐브는 데이터 버전마다 한 번만 만들어지고 모든 페이지가 공유합니다.
+일별/주별/월별 추이나 채널별 합계는 원본 주문 로그 대신 이 작은 테이블에서 다시 집계합니다.
+"""
+
+import pandas as pd
+
+DATE_KEY = "주문일"
+DIMENSIONS = ["주문경로", "결제방법", "상품코드", "cluster"]
+MEASURES = ["결제금액(상품별)", "주문건수", "주문수량"]
+
+
+def build_sales_cube(df_orders):
+    """주문 로그를 일 단위 매출 큐브로 집계합니다."""
+    dims = [col for col in DIMENSIONS if col in df_orders.columns]
+    work = pd.DataFrame({
+        DATE_KEY: df_orders[DATE_KEY].dt.normalize(),
+        **{col: df_orders[col] for col in dims},
+        "결제금액(상품별)": df_orders["결제금액(상품별)"],
+        "주문건수": df_orders["주문번호"].notna().astype("int64"),
+        "주문수량": df_orders["주문수량"],
+    })
+    return (
+        work.groupby([DATE_KEY] + dims, observed=True, dropna=False, sort=True)[MEASURES]
+        .sum()
+        .reset_index()
+    )
+
+
+def slice_cube(cube, start=None, end=None, **filters):
+    """
+    기간(start~end, 양끝 포함)과 차원 값으로 큐브를 잘라냅니다.
+    예: slice_cube(cube, start, end, 주문경로="카카오톡")
+    """
+    mask = pd.Series(True, index=cube.index)
+    if start is not None:
+        mask &= cube[DATE_KEY] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= cube[DATE_KEY] <= pd.Timestamp(end)
+    for col, value in filters.items():
+        if value is not None:
+            mask &= cube[col] == value
+    return cube[mask]
+
+
+def rollup(cube, freq="D", by=None):
+    """
+    큐브를 기간(freq: "D" 일별, "W" 주별, "M" 월별)과 선택한 차원으로 다시 집계합니다.
+    주별/월별은 기존 화면과 같이 Period 값으로 묶입니다.
+    """
+    by = [by] if isinstance(by, str) else list(by or [])
+    period = cube[DATE_KEY] if freq == "D" else cube[DATE_KEY].dt.to_period(freq)
+    return (
+        cube.groupby([period] + by, observed=True, sort=True)[MEASURES]
+        .sum()
+        .reset_index()
+    )
+
+
+def totals(cube, by, measure):
+    """차원별 합계를 내림차순 Series로 반환합니다."""
+    return cube.groupby(by, observed=True)[measure].sum().sort_values(ascending=False)
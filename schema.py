@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+schema.py
+데이터셋 컬럼 타입 선언과 대시보드용 메모리 절감 규칙
+
+- 날짜 컬럼은 datetime64, 상품/채널/셀러/결제수단 등 반복 문자열은 category
+- 수량/금액은 값 범위가 맞으면 int32, 플래그/클러스터 번호는 int8 (결측치가 있는 컬럼은 float 그대로)
+- 개인정보(PII)와 화면에 쓰지 않는 부가 컬럼은 대시보드가 읽지 않습니다.
+  원본 CSV와 Parquet 사본에는 그대로 남아 있어 LTV/클러스터링 파이프라인은 계속 사용할 수 있습니다.
+
+사용법:
+    python schema.py        # 데이터셋별 메모리 사용량 (원본 파싱 vs 스키마 적용) 비교
+"""
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------------
+# 컬럼 타입 선언
+# ------------------------------------------------------------------
+DATE_COLUMNS = ["주문일", "일자", "날짜"]
+CATEGORY_COLUMNS = [
+    "상품코드", "상품명", "상품명_정제", "주문경로", "결제방법", "셀러명", "등급", "중량",
+]
+MONEY_COLUMNS = [
+    "결제금액(상품별)", "결제금액(통합)", "주문취소 금액(상품별)", "공급가",
+    "부분취소금액(통합)", "포인트 사용금액(통합)", "쿠폰 사용금액(통합)",
+]
+QUANTITY_COLUMNS = ["주문수량"]
+FLAG_COLUMNS = ["cluster", "세트여부", "이벤트여부"]
+
+INT_TYPES = {
+    **{col: np.int32 for col in MONEY_COLUMNS + QUANTITY_COLUMNS},
+    **{col: np.int8 for col in FLAG_COLUMNS},
+}
+
+# ------------------------------------------------------------------
+# 대시보드에서 읽지 않는 컬럼
+# ------------------------------------------------------------------
+PII_COLUMNS = ["주문자명", "주문자연락처", "주소", "입금자명"]
+UNUSED_COLUMNS = ["배송준비 처리일", "입금일"]
+DASHBOARD_EXCLUDE = tuple(PII_COLUMNS + UNUSED_COLUMNS)
+
+
+def _downcast_int(values, dtype):
+    """정수 값이고 dtype 범위 안이면 dtype, 범위를 넘으면 int64, 소수가 있으면 그대로 둡니다."""
+    if not np.array_equal(values, np.round(values)):
+        return values
+    info = np.iinfo(dtype)
+    if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+        return values.astype(dtype)
+    return values.astype("int64")
+
+
+def apply_types(df):
+    """날짜 파싱, 범주형 변환, 정수 컬럼 축소를 적용합니다."""
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    for col, dtype in INT_TYPES.items():
+        if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        # 결측치를 0으로 채우면 합계/평균/그룹이 달라지므로 결측 컬럼은 축소하지 않습니다.
+        if df[col].hasnans:
+            continue
+        # 소수점 금액(평균 공급가 등)은 정밀도 손실을 피하기 위해 그대로 둡니다.
+        df[col] = _downcast_int(df[col], dtype)
+    return df
+
+
+# ------------------------------------------------------------------
+# 메모리 보고
+# ------------------------------------------------------------------
+def memory_bytes(df):
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def memory_report(before, after):
+    """데이터셋 이름 -> DataFrame 두 묶음을 받아 데이터셋별 메모리 비교표를 만듭니다."""
+    rows = []
+    for name in before:
+        b, a = memory_bytes(before[name]), memory_bytes(after[name])
+        rows.append({
+            "데이터셋": name,
+            "컬럼 수 (전)": before[name].shape[1],
+            "컬럼 수 (후)": after[name].shape[1],
+            "메모리 MB (전)": b / 2**20,
+            "메모리 MB (후)": a / 2**20,
+            "절감률(%)": (1 - a / b) * 100 if b else 0.0,
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    import data_registry
+    import data_store
+
+    registry = data_registry.DatasetRegistry()
+    before = {
+        name: pd.read_csv(data_store.csv_path(name), encoding=data_store.CSV_ENCODING,
+                          **data_store.READ_OPTIONS.get(name, {}))
+        for name in registry.datasets if data_store.csv_path(name).exists()
+    }
+    after = {name: registry.read(name) for name in before}
+    report = memory_report(before, after)
+    print(report.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+    total_before = report["메모리 MB (전)"].sum()
+    total_after = report["메모리 MB (후)"].sum()
+    print(f"✅ 전체 {total_before:,.2f} MB -> {total_after:,.2f} MB ({(1 - total_after / total_before) * 100:.1f}% 절감)")
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+shared_data.py
+호스트 단위 공유 데이터셋 (Arrow IPC 파일 + memory map)
+
+- 데이터셋을 처음 읽은 프로세스가 (이름, 지문) 별 Arrow IPC 파일을 data/.cache/shared/ 에 한 번 씁니다.
+- 모든 Streamlit 워커는 그 파일을 memory-map 해서 DataFrame 으로 붙입니다(attach).
+  수치/날짜 컬럼과 범주형 코드는 매핑된 버퍼를 그대로 가리키므로(읽기 전용) 복사가 없고,
+  실제 메모리는 OS 페이지 캐시에 한 벌만 올라가 워커를 늘려도 데이터 메모리가 늘지 않습니다.
+- 지문이 바뀌면 새 파일을 쓰고 같은 이름의 이전 파일은 정리합니다 (다른 워커가 매핑 중이면 다음 기회에 정리).
+- pyarrow 가 없으면 로더 결과를 그대로 사용합니다.
+
+사용법:
+    python shared_data.py               # 전체 데이터셋을 공유 파일로 미리 생성 (워커 기동 전 워밍업)
+    python shared_data.py --clear       # 공유 파일 삭제
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+import data_store
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    HAS_PYARROW = True
+except ImportError:  # pyarrow 미설치 시 공유 없이 프로세스별 로딩
+    HAS_PYARROW = False
+
+SHARED_DIR = data_store.DATA_DIR / ".cache" / "shared"
+
+
+class SharedDatasets:
+    """(데이터셋 이름, 지문) -> memory-map 된 읽기 전용 DataFrame."""
+
+    def __init__(self, shared_dir=SHARED_DIR):
+        self.shared_dir = Path(shared_dir)
+        self._lock = threading.Lock()
+
+    def path(self, name, fingerprint):
+        digest = hashlib.blake2b(str(fingerprint).encode("utf-8"), digest_size=8).hexdigest()
+        return self.shared_dir / f"{self._stem(name)}-{digest}.arrow"
+
+    @staticmethod
+    def _stem(name):
+        return name.replace("/", "__")  # 월 파티션 이름 (preprocessed/YYYY-MM)
+
+    def publish(self, name, fingerprint, df):
+        """DataFrame 을 Arrow IPC 파일로 씁니다. 다른 프로세스와 동시에 써도 마지막 교체만 남습니다."""
+        path = self.path(name, fingerprint)
+        table = pa.Table.from_pandas(df, preserve_index=None)
+        self.shared_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        self._prune(name, keep=path)
+        return path
+
+    def attach(self, name, fingerprint):
+        """공유 파일을 memory-map 해 DataFrame 으로 돌려줍니다. 파일이 없으면 None."""
+        path = self.path(name, fingerprint)
+        try:
+            source = pa.memory_map(str(path), "r")
+        except FileNotFoundError:
+            return None
+        table = ipc.open_file(source).read_all()
+        # split_blocks: 컬럼을 하나의 2차원 블록으로 합치지 않아 매핑된 버퍼를 그대로 씁니다.
+        return table.to_pandas(split_blocks=True)
+
+    def get(self, name, fingerprint, loader):
+        """공유 파일이 있으면 붙이고, 없으면 loader() 로 읽어 공유 파일을 만든 뒤 붙입니다."""
+        if not HAS_PYARROW or fingerprint is None:
+            return loader()
+        df = self.attach(name, fingerprint)
+        if df is not None:
+            return df
+        with self._lock:  # 같은 프로세스 안에서는 한 번만 로딩
+            df = self.attach(name, fingerprint)
+            if df is not None:
+                return df
+            df = loader()
+            try:
+                self.publish(name, fingerprint, df)
+            except (pa.ArrowException, TypeError, ValueError):
+                return df  # Arrow 로 옮길 수 없는 컬럼이 있으면 공유하지 않음
+        return self.attach(name, fingerprint)
+
+    def _prune(self, name, keep):
+        for old in self.shared_dir.glob(f"{self._stem(name)}-*.arrow"):
+            if old != keep:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass  # 다른 워커가 매핑 중 (Windows)
+
+    def files(self):
+        """{파일 이름: 크기(bytes)}"""
+        if not self.shared_dir.exists():
+            return {}
+        return {path.name: path.stat().st_size for path in sorted(self.shared_dir.glob("*.arrow"))}
+
+    def clear(self):
+        removed = 0
+        for name in self.files():
+            try:
+                (self.shared_dir / name).unlink()
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+if __name__ == "__main__":
+    import data_registry
+
+    parser = argparse.ArgumentParser(description="데이터셋을 워커 간 공유용 Arrow IPC 파일로 만듭니다.")
+    parser.add_argument("--clear", action="store_true", help="공유 파일 삭제")
+    args = parser.parse_args()
+
+    shared = SharedDatasets()
+    if args.clear:
+        print(f"✅ 공유 파일 {shared.clear()}개 삭제 ({shared.shared_dir})")
+    else:
+        if not HAS_PYARROW:
+            raise SystemExit("공유 데이터셋에는 pyarrow가 필요합니다. `pip install pyarrow`")
+        registry = data_registry.DatasetRegistry()
+        start = time.perf_counter()
+        for name in registry.datasets:
+            fingerprint = registry.fingerprint(name)
+            if fingerprint is None:
+                print(f"  ⚠️ {name}: 파일 없음")
+                continue
+            df = shared.get(name, fingerprint, lambda: registry.read(name))
+            print(f"  ✅ {name}: {len(df):,}행 -> {shared.path(name, fingerprint).name}")
+        total = sum(shared.files().values())
+        print(f"✅ 공유 파일 {len(shared.files())}개, {total / 2**20:,.1f} MB "
+              f"({time.perf_counter() - start:.2f}s) -> {shared.shared_dir}")